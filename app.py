@@ -1,20 +1,51 @@
-﻿import json
+﻿import startup  # first: boot phase timing starts here
+
+import contextvars
+import hmac
+import json
 import os
 import re
 import tempfile
-import requests
 import threading
 import time
 from datetime import datetime, timedelta
+from functools import wraps
 from zoneinfo import ZoneInfo
 
-import pandas as pd
 from flask import Flask, render_template, request, jsonify, session
-from nlp_utils import detect_intent, detect_language, detect_category_from_text
-from openai import OpenAI
+import arabic_text
+import message_analysis
+import llm_cache
+import nlp_utils
+import order_grammar
+import quantity
+import task_graph
+import understanding
+from nlp_utils import correct_typos_advanced, detect_category_from_text
+from menu_build import canonical_category
+from arabic_text import has_arabic
+from menu_index import BUTTON_PAGE_SIZE, MenuIndex
+from message_analysis import MessageAnalysis, analyze, per_message
+from menu_store import (
+    ActiveIndex,
+    ActiveMapping,
+    ActiveSequence,
+    ActiveSet,
+    MenuRegistry,
+    activate,
+    active_snapshot,
+    get_store,
+)
+from config import ABUSE_BLOCKLIST, OPENING_HOURS
+from faq_engine import FaqEngine
+from term_matcher import TermMatcher
 from dotenv import load_dotenv
 
+# Heavy imports are deferred to first use (see startup.py); start_background_threads prefetches them
+requests = startup.LazyModule("requests")
+
 load_dotenv()
+startup.mark("imports")
 
 # =========================================================
 # 🚫 IRRELEVANT & OFFENSIVE TERMS DICTIONARY (1000+ Words Scope)
@@ -214,17 +245,16 @@ IRRELEVANT_TERMS = [
     "بلاستيك", "ورق", "قماش", "قطن", "صوف", "حرير", "جلد", "فرو", "ريش", "عظم",
 ]
 
+# One automaton over every term (+ config.ABUSE_BLOCKLIST), built once; see term_matcher.py.
+# English terms need word boundaries, Arabic terms match by containment.
+IRRELEVANT_MATCHER = TermMatcher(IRRELEVANT_TERMS + ABUSE_BLOCKLIST)
+MessageAnalysis.blocklist = IRRELEVANT_MATCHER
+
 
 
 import re
 def extract_qty_from_text(text: str):
-    if not text:
-        return None
-    m = re.search(r"\b(\d{1,3})\b", text)
-    if not m:
-        return None
-    q = int(m.group(1))
-    return q if q > 0 else None
+    return quantity.first(text, max_value=999)
     
     
         
@@ -289,10 +319,7 @@ def handle_multi_item_text(msg_raw, s, MENU, lang):
         
         if has_wrap_word and not has_sandwich_in_generics and not has_specific_wrap:
              # Extract quantity for wraps
-            wrap_qty = 1
-            match = re.search(r'(\d+)\s*(wrap|wraps|tortilla)', msg_lower)
-            if match:
-                wrap_qty = int(match.group(1))
+            wrap_qty = quantity.near(msg_lower, ["wrap", "wraps", "tortilla"]) or 1
             
             print(f"⚠️ FALLBACK: LLM missed wraps! Adding sandwich(qty={wrap_qty}) to generics")
             generics.append({"kind": "sandwich", "qty": wrap_qty})
@@ -505,6 +532,11 @@ def handle_multi_item_text(msg_raw, s, MENU, lang):
 
     # ✅ If nothing to process, show error (ONLY if no items added AND no generics present)
     if not added_lines and not generics and not s.get("order"):
+        # Arabic questions often land here ("و" inside a word looks like a separator)
+        faq_reply = answer_faq(msg_raw, lang)
+        if faq_reply:
+            session["state"] = s
+            return make_chat_response(faq_reply, lang)
         msg = (
             "I couldn't understand your order. Please type 'menu' to see the menu."
             if lang == "en" else
@@ -528,13 +560,6 @@ def handle_multi_item_text(msg_raw, s, MENU, lang):
 
 
 
-def _normalize_digits(s: str) -> str:
-    if not s:
-        return ""
-    # Arabic-Indic digits -> Western
-    trans = str.maketrans("٠١٢٣٤٥٦٧٨٩", "0123456789")
-    return s.translate(trans)
-
 def extract_generic_qty_any(text: str, forms):
     """
     forms: list of keywords like ["meal", "meals"]
@@ -542,35 +567,8 @@ def extract_generic_qty_any(text: str, forms):
       - "4 meals" / "meals 4"
       - Arabic digits too (after normalize)
     """
-    if not text:
-        return None
-    t = _normalize_digits(text.lower())
-
-    for kw in forms:
-        kw_esc = re.escape(kw)
-
-        # 4 meals
-        m = re.search(rf"\b(\d{{1,3}})\s*{kw_esc}\b", t)
-        if m:
-            q = int(m.group(1))
-            return q if q > 0 else None
-
-        # meals 4
-        m = re.search(rf"\b{kw_esc}\s*(\d{{1,3}})\b", t)
-        if m:
-            q = int(m.group(1))
-            return q if q > 0 else None
-
-    return None
+    return quantity.near(text, forms)
     
-def _norm_text(s: str) -> str:
-    s = (s or "").lower().strip()
-    s = _normalize_digits(s)
-    s = re.sub(r"\s+", " ", s)                  # multi spaces -> one
-    s = re.sub(r"[^\w\s\u0600-\u06FF]", "", s)  # remove punctuation (keep arabic)
-    return s.strip()
-
-
 def detect_food_generic_requests_ordered(text: str):
     """
     Returns list of dicts: [{"kind":"meals","qty":2}, {"kind":"drinks","qty":1}, ...]
@@ -579,7 +577,7 @@ def detect_food_generic_requests_ordered(text: str):
     if not text:
         return []
 
-    t = _normalize_digits(text.lower())
+    t = arabic_text.clean(text.lower())
 
     specs = [
         ("meals",  ["meal", "meals"]),
@@ -599,56 +597,15 @@ def detect_food_generic_requests_ordered(text: str):
     return [h[1] for h in hits]
 
 def _menu_keys_by_category(MENU: dict, cat: str):
-    cat = (cat or "").strip().lower()
-    out = []
-    for k, info in (MENU or {}).items():
-        c = (info.get("category") or "").strip().lower()
-        if c == cat:
-            out.append(k)
-    return out
+    return list(_index_for(MENU).keys_by_category.get((cat or "").strip().lower(), ()))
 
 def _format_category_page(MENU: dict, cat: str, lang: str, page: int = 0, page_size: int = 8, exclude_items: list = None):
     """
     Format a category page, optionally excluding already-ordered items.
     exclude_items: list of menu keys to exclude from display
+    Pages are pre-rendered per menu version (see MenuIndex.category_page).
     """
-    keys = _menu_keys_by_category(MENU, cat)
-    if not keys:
-        return None, None, 0
-
-    # Filter out already-ordered items (case-insensitive comparison)
-    if exclude_items:
-        exclude_lower = [item.lower() for item in exclude_items if item]
-        keys = [k for k in keys if k.lower() not in exclude_lower]
-    
-    if not keys:
-        return None, None, 0
-
-    start = page * page_size
-    chunk = keys[start:start+page_size]
-
-    lines = []
-    for i, key in enumerate(chunk, start=1):
-        info = MENU.get(key, {})
-        nm = (info.get("name_ar") if lang == "ar" else info.get("name_en")) or key
-        price = info.get("price")
-        if price is not None:
-            lines.append(f"{i}) {nm} - {price} SAR")
-        else:
-            lines.append(f"{i}) {nm}")
-
-    has_more = (start + page_size) < len(keys)
-    text = "\n".join(lines)
-
-    if lang == "ar":
-        footer = "\n\nاكتب الرقم أو الاسم. واكتب (more) لعرض المزيد." if has_more else "\n\nاكتب الرقم أو الاسم."
-    else:
-        footer = "\n\nType the number or name. Type (more) for next." if has_more else "\n\nType the number or name."
-
-    return text + footer, chunk, len(keys)
-
-
-
+    return _index_for(MENU).category_page(cat, lang, page=page, page_size=page_size, exclude_items=exclude_items)
 
 
 def _start_next_generic_from_queue(s: dict, MENU: dict, lang: str):
@@ -732,7 +689,7 @@ def _resolve_text_pick_to_menu_key(MENU: dict, keys_page: list, user_text: str,
     if not user_text:
         return None
 
-    t = _normalize_digits(user_text.strip().lower())
+    t = arabic_text.clean(user_text.strip().lower())
 
     # number pick
     m = re.fullmatch(r"\d{1,3}", t)
@@ -760,7 +717,7 @@ def _resolve_text_pick_to_menu_key_any_in_category(MENU: dict, category: str, us
     if not user_text:
         return None
 
-    t = _normalize_digits(user_text.strip().lower())
+    t = arabic_text.clean(user_text.strip().lower())
 
     # Search for exact name match within the category
     for k, info in (MENU or {}).items():
@@ -813,9 +770,6 @@ CANON_MENU_CATS = {
 
 
 
-def _norm(s: str) -> str:
-    return re.sub(r"\s+", " ", (s or "").strip().lower())
-
 def _extract_qty_near_keyword(t: str, keyword: str):
     """
     Matches:
@@ -823,22 +777,7 @@ def _extract_qty_near_keyword(t: str, keyword: str):
       meals 2
       (qty missing -> None)
     """
-    t = _norm(t)
-    kw = re.escape(keyword)
-
-    # 2 meals
-    m = re.search(rf"\b(\d{{1,3}})\s*{kw}\b", t)
-    if m:
-        q = int(m.group(1))
-        return q if q > 0 else None
-
-    # meals 2
-    m = re.search(rf"\b{kw}\s*(\d{{1,3}})\b", t)
-    if m:
-        q = int(m.group(1))
-        return q if q > 0 else None
-
-    return None
+    return quantity.near(t, [keyword])
 
 def detect_food_generic_requests_ordered(text: str):
     """
@@ -846,7 +785,7 @@ def detect_food_generic_requests_ordered(text: str):
       [{"kind":"meals","qty":None}, {"kind":"juices","qty":2}, ...]
     qty=None means: user did NOT provide quantity and we must ask later.
     """
-    t = _norm(text)
+    t = arabic_text.squash(text)
     if not t:
         return []
 
@@ -1081,6 +1020,23 @@ CUSTOMERS_HAS_LAST_SEEN = os.getenv("CUSTOMERS_HAS_LAST_SEEN", "0") == "1"
 # Cron secret
 CRON_SECRET = os.getenv("CRON_SECRET", "joana-cron-secret")
 
+# Menu reload (admin endpoint + background file watcher)
+MENU_ADMIN_TOKEN = os.getenv("MENU_ADMIN_TOKEN")
+MENU_WATCH_INTERVAL = float(os.getenv("MENU_WATCH_INTERVAL", "5"))
+MENU_MAX_TENANTS = int(os.getenv("MENU_MAX_TENANTS", "8"))
+
+# LLM response cache (LLM_CACHE_PATH: optional SQLite file shared by all workers)
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", str(llm_cache.DEFAULT_MAX_ENTRIES)))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(llm_cache.DEFAULT_TTL)))
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH") or None
+
+# One structured "understand message" call instead of classifier + relevance + typos + parser
+LLM_UNDERSTAND = os.getenv("LLM_UNDERSTAND", "1") == "1"
+
+# Threads for the independent steps of a webhook message (customer upsert, logs, echo)
+MESSAGE_TASK_WORKERS = int(os.getenv("MESSAGE_TASK_WORKERS", str(task_graph.DEFAULT_WORKERS)))
+task_graph.configure(MESSAGE_TASK_WORKERS)
+
 
 def _mask(val: str | None) -> str:
     """Return a safe diagnostic string without exposing secrets."""
@@ -1095,30 +1051,68 @@ def _mask(val: str | None) -> str:
 app = Flask(__name__, static_folder="static", template_folder="templates")
 app.secret_key = FLASK_SECRET
 
+def _openai_client(**kwargs):
+    from openai import OpenAI  # ~0.5 s import; only paid on the first LLM call
+    return OpenAI(**kwargs)
+
+
 # Prioritize Groq API (faster, cheaper) over OpenAI
 if GROQ_API_KEY:
     tail = GROQ_API_KEY[-4:] if len(GROQ_API_KEY) >= 4 else "****"
     print(f"GROQ_API_KEY detected (length={len(GROQ_API_KEY)}, masked=***{tail})")
-    client = OpenAI(
+    client = startup.LazyClient(lambda: _openai_client(
         api_key=GROQ_API_KEY,
         base_url="https://api.groq.com/openai/v1"
-    )
+    ))
     LLM_MODEL = "llama-3.3-70b-versatile"  # Groq's fast model
     LLM_PROVIDER = "groq"
     print(f"✅ Using Groq API with model: {LLM_MODEL}")
 elif OPENAI_API_KEY:
     tail = OPENAI_API_KEY[-4:] if len(OPENAI_API_KEY) >= 4 else "****"
     print(f"OPENAI_API_KEY detected (length={len(OPENAI_API_KEY)}, masked=***{tail})")
-    client = OpenAI(api_key=OPENAI_API_KEY)
+    client = startup.LazyClient(lambda: _openai_client(api_key=OPENAI_API_KEY))
     LLM_MODEL = "gpt-4o-mini"
     LLM_PROVIDER = "openai"
     print(f"✅ Using OpenAI API with model: {LLM_MODEL}")
 else:
     print("Warning: No LLM API key set (GROQ_API_KEY or OPENAI_API_KEY). AI features will be disabled.")
-    client = None
+    client = startup.LazyClient()
     LLM_MODEL = None
     LLM_PROVIDER = None
 
+LLM_CACHE = llm_cache.LLMCache(LLM_CACHE_SIZE, LLM_CACHE_TTL, LLM_CACHE_PATH)
+
+
+def llm_complete(site: str, messages: list, temperature: float, max_tokens: int,
+                 cacheable: bool = None, **kwargs) -> str:
+    """Text of one chat completion, served from LLM_CACHE when the call is cacheable.
+
+    Temperature-0 calls are cacheable by default; other deterministic call sites
+    (classifiers, parsers, spelling) opt in. Keys include the site, model and menu
+    version, so a menu reload never serves answers built on the old menu.
+    """
+    if cacheable is None:
+        cacheable = temperature == 0
+    key = None
+    if cacheable:
+        key = llm_cache.cache_key(site, LLM_MODEL, active_snapshot().version, messages,
+                                  temperature=temperature, max_tokens=max_tokens)
+        hit = LLM_CACHE.get(key, site)
+        if hit is not None:
+            print(f"✅ LLM cache hit [{site}]")
+            return hit
+    res = client.chat.completions.create(
+        model=LLM_MODEL,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        **kwargs,
+    )
+    text = (res.choices[0].message.content or "").strip()
+    if key and text:
+        LLM_CACHE.put(key, text, site)
+    return text
+
 
 def log_env_summary():
     print(
@@ -1134,6 +1128,7 @@ def log_env_summary():
 
 # Log key env presence (masked) at startup
 log_env_summary()
+startup.mark("config + env")
 
 # NOTE: In production, change redirect to your domain (not 127.0.0.1)
 PAYMENT_URL = (
@@ -1145,6 +1140,14 @@ CURRENCY_AR = "ريال سعودي"
 
 FEEDBACK_DELAY_MINUTES = 2  # Feedback sent 2 minutes after payment
 
+# Store facts the FAQ answers are rendered from (menu and branches come from the snapshot,
+# hours from config.OPENING_HOURS)
+STORE_TIMEZONE = "Asia/Riyadh"
+FAQ_FACTS = {
+    "en": {"branch_name": "JOANA Fast Food", "payment_methods": "Cash, Online payment"},
+    "ar": {"branch_name": "جوانا", "payment_methods": "كاش، دفع إلكتروني"},
+}
+
 # ---------------------------
 # Paths / Directories
 # ---------------------------
@@ -1152,21 +1155,31 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(BASE_DIR, "data")
 MENU_FILE = os.path.join(DATA_DIR, "Menu.xlsx")
 BRANCHES_FILE = os.path.join(DATA_DIR, "Branches.xlsx")
+FAQ_FILE = os.path.join(DATA_DIR, "faq.json")
+TENANTS_DIR = os.path.join(DATA_DIR, "tenants")   # <phone_number_id>/Menu.xlsx per brand/branch
 
 # Runtime stores
 WHATSAPP_SESSIONS = {}   # phone -> {"state": {...}, "messages": [...], "lang": "en"/"ar"}
 WA_CATEGORY_STATE = {}   # phone -> {"category": str, "index": int}
 FEEDBACK_PENDING = {}    # phone -> {"order_id": int, "rating": str, "awaiting_remarks": bool}
 
+# phone_number_id the current webhook message arrived on; replies go out from the same number
+WA_PHONE_NUMBER_ID = contextvars.ContextVar("wa_phone_number_id", default=None)
+
+
+def _wa_sender_id():
+    return WA_PHONE_NUMBER_ID.get() or WHATSAPP_PHONE_NUMBER_ID
+
 # =========================================================
 # WhatsApp Cloud SEND HELPERS
 # =========================================================
 def send_whatsapp_text(to_number: str, text: str):
-    if not (WHATSAPP_TOKEN and WHATSAPP_PHONE_NUMBER_ID):
+    task_graph.before_send()
+    if not (WHATSAPP_TOKEN and _wa_sender_id()):
         print("WHATSAPP_TOKEN/PHONE_NUMBER_ID missing, cannot send WhatsApp message.")
         return
 
-    url = f"{WHATSAPP_API_BASE}/{WHATSAPP_PHONE_NUMBER_ID}/messages"
+    url = f"{WHATSAPP_API_BASE}/{_wa_sender_id()}/messages"
     headers = {"Authorization": f"Bearer {WHATSAPP_TOKEN}", "Content-Type": "application/json"}
     payload = {
         "messaging_product": "whatsapp",
@@ -1182,11 +1195,12 @@ def send_whatsapp_text(to_number: str, text: str):
 
 
 def send_whatsapp_image(to_number: str, image_url: str, caption: str = ""):
-    if not (WHATSAPP_TOKEN and WHATSAPP_PHONE_NUMBER_ID):
+    task_graph.before_send()
+    if not (WHATSAPP_TOKEN and _wa_sender_id()):
         print("WHATSAPP_TOKEN/PHONE_NUMBER_ID missing, cannot send WhatsApp image.")
         return False
 
-    url = f"{WHATSAPP_API_BASE}/{WHATSAPP_PHONE_NUMBER_ID}/messages"
+    url = f"{WHATSAPP_API_BASE}/{_wa_sender_id()}/messages"
     headers = {"Authorization": f"Bearer {WHATSAPP_TOKEN}", "Content-Type": "application/json"}
     payload = {
         "messaging_product": "whatsapp",
@@ -1204,11 +1218,12 @@ def send_whatsapp_image(to_number: str, image_url: str, caption: str = ""):
 
 
 def send_whatsapp_quick_buttons(to_number: str, body_text: str, buttons: list):
-    if not (WHATSAPP_TOKEN and WHATSAPP_PHONE_NUMBER_ID):
+    task_graph.before_send()
+    if not (WHATSAPP_TOKEN and _wa_sender_id()):
         print("WHATSAPP_TOKEN/PHONE_NUMBER_ID missing, cannot send buttons.")
         return False
 
-    url = f"{WHATSAPP_API_BASE}/{WHATSAPP_PHONE_NUMBER_ID}/messages"
+    url = f"{WHATSAPP_API_BASE}/{_wa_sender_id()}/messages"
     headers = {"Authorization": f"Bearer {WHATSAPP_TOKEN}", "Content-Type": "application/json"}
 
     cloud_buttons = []
@@ -1522,178 +1537,68 @@ def schedule_feedback_after_payment(order_id: int | None) -> None:
 
 
 
-def canonical_category(raw_category: str, name_en: str = "") -> str:
-    c = (raw_category or "").strip().lower()
-    n = (name_en or "").strip().lower()
-
-    # ---------
-    # Direct category from Excel (preferred)
-    # ---------
-    if c in ("meals", "meal"):
-        return "meals"
-    if c in ("juices", "juice"):
-        return "juices"
-    if c in ("drinks", "drink", "beverages", "beverage"):
-        return "drinks"
-
-    # Keep your existing main buckets too (optional)
-    if c in ("burgers_meals", "burger_meals", "burgers", "burger"):
-        return "burgers_meals"
-    if c in ("sandwiches", "sandwich", "wraps", "wrap", "tortilla"):
-        return "sandwiches"
-    if c in ("snacks_sides", "snacks", "snack", "sides", "side"):
-        return "snacks_sides"
-
-    # ---------
-    # Fallback inference from item name (when Excel category missing/wrong)
-    # ---------
-    if any(k in n for k in ("juice", "orange", "mango", "cocktail")):
-        return "juices"
-
-    if any(k in n for k in ("cola", "coke", "pepsi", "sprite", "7up", "water", "coffee", "tea")):
-        return "drinks"
-
-    # If user typed/Excel category says "meal" in name but category missing
-    if " meal" in n or n.endswith("meal"):
-        return "meals"
-
-    # Otherwise keep empty/other
-    return c or ""
-
-
 # =========================================================
-# EXCEL LOADERS
+# MENU DATA (compiled from Excel, see menu_build.py)
 # =========================================================
-ALL_MENU_ITEM_NAMES_LOWER = set()
-NAME_TO_KEY = {}
-
-def load_menu():
-    try:
-        df_raw = pd.read_excel(MENU_FILE, header=None, sheet_name=0)
-
-        header_row_index = None
-        for i, row in df_raw.iterrows():
-            row_text = " ".join([str(x).strip().lower() for x in row.values if str(x) != "nan"])
-            if "name_en" in row_text and "price" in row_text:
-                header_row_index = i
-                break
-
-        if header_row_index is None:
-            print("⚠ Could not find header row containing 'name_en' and 'price'.")
-            return {}
-
-        df = pd.read_excel(MENU_FILE, header=header_row_index, sheet_name=0)
-        df.columns = [str(c).strip().lower() for c in df.columns]
+# One store per process (menu_store.get_store); rebuilt only when Menu.xlsx / Branches.xlsx change on disk.
+MENU_STORE = get_store()
 
-        required = ["name_en", "price"]
-        for col in required:
-            if col not in df.columns:
-                raise Exception(f"Missing required column: {col}. Found: {list(df.columns)}")
+# Extra brands/branches: data/tenants/<phone_number_id>/, built on first message, LRU-bounded.
+MENU_REGISTRY = MenuRegistry(TENANTS_DIR, MENU_STORE, max_tenants=MENU_MAX_TENANTS,
+                             check_interval=MENU_WATCH_INTERVAL)
 
-        cat_col = "category" if "category" in df.columns else None
-        ar_col  = "name_ar"  if "name_ar" in df.columns else None
-        id_col  = "id"       if "id" in df.columns else None
+# These names read the snapshot activated for the current request (menu_store.activate),
+# so all of them always come from the same immutable snapshot and the same tenant.
+MENU = ActiveMapping("menu")
+BRANCHES = ActiveSequence("branches")
+NAME_TO_KEY = ActiveMapping("name_to_key")
+ALL_MENU_ITEM_NAMES_LOWER = ActiveSet("all_names_lower")
+MENU_INDEX = ActiveIndex()
 
-        menu = {}
 
-        for _, row in df.iterrows():
-            en = str(row.get("name_en", "")).strip()
-            if not en or en.lower() == "nan":
-                continue
-
-            en_key = en.strip().lower()
-
-            price = row.get("price", None)
-            try:
-                price = float(price)
-            except Exception:
-                continue
+def _index_for(menu: dict):
+    """The active MenuIndex when `menu` is the current MENU, else a throwaway index over `menu`."""
+    if menu is MENU:
+        return MENU_INDEX
+    snap = active_snapshot()
+    if menu is snap.menu:
+        return snap.index
+    return MenuIndex(menu or {})
 
-            raw_cat = str(row.get(cat_col, "")).strip() if cat_col else ""
-            cat_final = canonical_category(raw_cat, en)
-            cat_final = str(cat_final).strip().lower()
-
-            ar = str(row.get(ar_col, "")).strip() if ar_col else ""
-            if ar.lower() == "nan":
-                ar = ""
-
-            excel_id = None
-            if id_col:
-                v = row.get(id_col, None)
-                try:
-                    if pd.notna(v):
-                        excel_id = int(v)
-                except Exception:
-                    excel_id = None
-
-            menu[en_key] = {
-                "id": excel_id,
-                "price": price,
-                "category": cat_final,
-                "name_en": en,
-                "name_ar": ar or en,
-            }
 
-        # ✅ THIS MUST BE OUTSIDE THE LOOP
-        print(f"✅ Loaded {len(menu)} menu items.")
+def use_menu_snapshot(tenant_id=None, snap=None):
+    """Activate the menu this request reads: `tenant_id`'s snapshot, else the default one."""
+    return activate(snap or MENU_REGISTRY.snapshot_for(tenant_id))
 
-        # ✅ Build global name indexes
-        global ALL_MENU_ITEM_NAMES_LOWER, NAME_TO_KEY
-        ALL_MENU_ITEM_NAMES_LOWER = set()
-        NAME_TO_KEY = {}
 
-        for k, info in menu.items():
-            en = _norm_text(info.get("name_en") or "")
-            ar = _norm_text(info.get("name_ar") or "")
+MENU_STORE.current()
+startup.mark("menu snapshot")
 
-            if en:
-                ALL_MENU_ITEM_NAMES_LOWER.add(en)
-                NAME_TO_KEY[en] = k
-            if ar:
-                ALL_MENU_ITEM_NAMES_LOWER.add(ar)
-                NAME_TO_KEY[ar] = k
+FAQ = FaqEngine.load(FAQ_FILE)
 
-        return menu
 
-    except Exception as e:
-        print("Menu load failed:", repr(e))
-        return {}
+def faq_facts(now=None) -> dict:
+    """FAQ_FACTS plus today's opening hours and open/closed status."""
+    now = now or datetime.now(tz=ZoneInfo(STORE_TIMEZONE))
+    day = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")[now.weekday()]
+    open_time, close_time = OPENING_HOURS.get(day, ("", ""))
+    is_open = bool(open_time) and open_time <= now.strftime("%H:%M") <= close_time
+    facts = {lang: dict(values, open_time=open_time, close_time=close_time) for lang, values in FAQ_FACTS.items()}
+    facts["en"]["open_status"] = "Open now" if is_open else "Closed now"
+    facts["ar"]["open_status_ar"] = "مفتوح الآن" if is_open else "مغلق الآن"
+    return facts
 
 
-def load_branches():
-    try:
-        df_raw = pd.read_excel(BRANCHES_FILE, header=None)
-        header_row_index = None
-        for i, row in df_raw.iterrows():
-            row_l = [str(c).lower() for c in row]
-            if any("branch" in c for c in row_l) and any("address" in c for c in row_l):
-                header_row_index = i
-                break
-        if header_row_index is None:
-            header_row_index = 0
-
-        df = pd.read_excel(BRANCHES_FILE, header=header_row_index)
-
-        name_col = next((c for c in df.columns if "branch" in str(c).lower()), None)
-        addr_col = next((c for c in df.columns if "address" in str(c).lower()), None)
-        phone_col = next((c for c in df.columns if "phone" in str(c).lower() or "number" in str(c).lower()), None)
-
-        branches = []
-        for _, row in df.iterrows():
-            branches.append({
-                "Branch Name": str(row.get(name_col, "")).strip(),
-                "Address / Area": str(row.get(addr_col, "")).strip(),
-                "Phone Number": str(row.get(phone_col, "")).strip(),
-            })
-        branches = [b for b in branches if (b["Branch Name"] or b["Address / Area"] or b["Phone Number"])]
-        print(f"✅ Loaded {len(branches)} branches.")
-        return branches
-    except Exception as e:
-        print("❌ Branch load failed:", repr(e))
-        return []
+def answer_faq(msg: str, lang: str):
+    """Local answer for a faq.json question (HTML, like other replies), or None."""
+    if not FAQ:
+        return None
+    text = FAQ.answer(msg, lang, MENU_INDEX, BRANCHES, faq_facts())
+    if not text:
+        return None
+    text = re.sub(r"\*\*(.+?)\*\*", r"<b>\1</b>", text)
+    return text.replace("\n", "<br>")
 
-MENU = load_menu()
-BRANCHES = load_branches()
 
 # =========================================================
 # UI / MESSAGE HELPERS
@@ -1774,6 +1679,7 @@ WA_GREETINGS = [
     "وش اخبارك", "ايش اخبارك", "شو اخبارك", "كيف صحتك", "عساك بخير",
 ]
 
+@per_message
 def is_wa_greeting(text: str) -> bool:
     """Check if text is a greeting (hi, hello, how are you, etc.)"""
     if not text:
@@ -1818,6 +1724,7 @@ ORDER_INTENT_KEYWORDS = [
     "طلب", "اطلب", "نطلب", "طلب جديد", "ممكن اطلب",
 ]
 
+@per_message
 def is_order_intent(text: str) -> bool:
     """Check if text indicates user wants to order"""
     if not text:
@@ -1831,6 +1738,7 @@ def is_order_intent(text: str) -> bool:
 # =========================================================
 # BASIC UTILITIES
 # =========================================================
+@per_message
 def is_asking_for_categories(text: str) -> bool:
     """Check if the user is asking for categories generally."""
     if not text: return False
@@ -1851,23 +1759,10 @@ CATEGORY_GROUP_MAP = {
 }
 
 
+@per_message
 def has_explicit_quantity(text: str) -> bool:
-    """Check if the text contain digits or number words (English/Arabic)."""
-    if not text: return False
-    t = text.lower()
-    # Digits
-    if re.search(r"\d+", t): return True
-    # English words
-    eng_nums = ["one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten"]
-    if any(re.search(r"\b" + n + r"\b", t) for n in eng_nums): return True
-    # Arabic words
-    ar_nums = [
-        "واحد", "اثنين", "اثنتين", "ثلاثة", "ثلاث", "أربعة", "أربع",
-        "خمسة", "خمس", "ستة", "ست", "سبعة", "سبع", "ثمانية", "ثمان",
-        "تسعة", "تسع", "عشرة", "عشر"
-    ]
-    if any(n in t for n in ar_nums): return True
-    return False
+    """Check if the text contain digits, number words (English/Arabic) or an Arabic dual."""
+    return bool(quantity.scan(text))
 
 
 def polite_check(text):
@@ -1875,85 +1770,33 @@ def polite_check(text):
     return any(w in (text or "").lower() for w in bad)
 
 
-def _normalize_digits(txt: str) -> str:
-    if not txt:
-        return ""
-    arabic_digit_map = {"٠":"0","١":"1","٢":"2","٣":"3","٤":"4","٥":"5","٦":"6","٧":"7","٨":"8","٩":"9"}
-    for ar, en in arabic_digit_map.items():
-        txt = txt.replace(ar, en)
-    return txt
-
-
+@per_message
 def detect_qty(msg: str) -> int:
-    """Smart quantity detection with natural language support"""
-    if not msg:
-        return 1
-    text = msg.lower().strip()
-    text = _normalize_digits(text)
-    
-    # Natural language quantities (English & Arabic)
-    natural_qty = {
-        "a ": 1, "an ": 1, "one ": 1, "واحد": 1,
-        "couple": 2, "two": 2, "اثنين": 2, "اتنين": 2,
-        "few": 3, "some": 3, "several": 3, "بعض": 3,
-        "many": 5, "كثير": 5,
-        "dozen": 12, "دزينة": 12,
-    }
-    
-    for phrase, qty in natural_qty.items():
-        if phrase in text:
-            return qty
-    
-    # Numeric detection
-    m = re.search(r"\b(\d+)\b", text)
-    if m:
-        try:
-            q = int(m.group(1))
-            return q if q > 0 else 1
-        except Exception:
-            pass
+    """Smart quantity detection with natural language support ("2", "two", "ثلاثة", "قهوتين", "a few")"""
+    return quantity.detect(msg)
 
-    number_words_en = {"one":1,"two":2,"three":3,"four":4,"five":5,"six":6,"seven":7,"eight":8,"nine":9,"ten":10}
-    for word, value in number_words_en.items():
-        if re.search(r"\b" + re.escape(word) + r"\b", text):
-            return value
 
-    number_words_ar = {
-        "واحد":1,"واحدة":1,"اثنين":2,"اتنين":2,"ثنين":2,
-        "ثلاثة":3,"ثلاث":3,"اربعة":4,"أربعة":4,"خمسة":5,"ستة":6,"سبعة":7,"ثمانية":8,"تسعة":9,"عشرة":10,
-    }
-    for word, value in number_words_ar.items():
-        if word in text:
-            return value
-
-    return 1
+# Keyword forms a generic quantity can be attached to ("6 sandwiches", "burger 2", "وجبتين")
+GENERIC_QTY_FORMS = {
+    "burger": ["burger", "burgers", "برجر", "برغر"],
+    "sandwich": ["sandwich", "sandwiches", "ساندويتش", "سندويتش", "سندوتش"],
+    "meal": ["meal", "meals", "وجبة", "وجبات"],
+    "juice": ["juice", "juices", "عصير", "عصيرات"],
+    "drink": ["drink", "drinks", "مشروب", "مشروبات"],
+}
 
 
 def extract_qty_for_generic(msg: str, kind: str) -> int:
     if not msg:
         return 1
-
-    text = _normalize_digits(msg.lower())
-
-    if kind == "sandwich":
-        keys = [r"sandwich(?:es)?", r"ساندويتش", r"سندوتش"]
-    else:
-        keys = [r"burger(?:s)?", r"برجر", r"برغر"]
-
-    key_pat = "(" + "|".join(keys) + ")"
-
-    # ✅ FIX: Handle "2beef burger" (no space between number and word)
-    # Pattern 1: "6 sandwich" OR "6sandwich" (with or without space)
-    m1 = re.search(r"\b(\d+)\s*" + key_pat, text)
-    if m1:
-        return max(int(m1.group(1)), 1)
-
-    # Pattern 2: "sandwich 6"
-    m2 = re.search(key_pat + r"\s*\b(\d+)\b", text)
-    if m2:
-        return max(int(m2.group(2)), 1)
-
-    return detect_qty(text) or 1
+    forms = GENERIC_QTY_FORMS.get(kind, [kind, kind + "s"])
+    q = quantity.near(msg, forms)
+    if q:
+        return q
+    # keyword present, but the numbers belong to other items ("2 pepsi and a burger") -> 1
+    if quantity.has_word(msg, forms) and quantity.first(msg):
+        return 1
+    return detect_qty(msg) or 1
 
 
 # ✅ NEW: detect generic burger/sandwich/meals/juices/drinks in text (ordered)
@@ -1967,7 +1810,7 @@ def detect_generic_requests_ordered(msg: str):
         return []
 
     raw = msg
-    t = _normalize_digits(msg.lower())
+    t = arabic_text.clean(msg.lower())
     out = []
 
     def add(kind, pos):
@@ -2206,6 +2049,7 @@ def add_item_to_order_summary(state: dict, item_key: str, qty: int, price: float
 # 3) Avoid false-positive when user sends "2025 12 30" etc.
 # =========================================================
 
+@per_message
 def looks_like_multi_item_text(msg: str) -> bool:
     if not msg:
         return False
@@ -2222,7 +2066,7 @@ def looks_like_multi_item_text(msg: str) -> bool:
     original = re.sub(r"^(and|w|wa|\u0648)\s+", "", original, flags=re.IGNORECASE).strip()
     
     t = original.lower()
-    t = _normalize_digits(t)
+    t = arabic_text.clean(t)
 
     # normalize separators
     t = re.sub(r"[,\n;]+", " , ", t)
@@ -2238,21 +2082,14 @@ def looks_like_multi_item_text(msg: str) -> bool:
     # Arabic "و" (and) might be affected by lower() in some environments
     has_arabic_separator = " و " in original or "و" in original or " و" in original
     
-    # ✅ Count Arabic number words (واحد، اثنين، ثلاثة، أربعة، etc.)
-    # Added English number words check too
-    has_english_num_word = bool(re.search(r"\b(one|two|three|four|five|six|seven|eight|nine|ten)\b", t))
-    has_digit = bool(re.search(r"\d+", t))
-    
     # Explicit "and" check
     if " and " in t or has_arabic_separator:
         return True
         
-    # Number (digit or word) + Text pattern check
-    # e.g. "Five burgers", "2 coffee"
-    if (has_digit or has_english_num_word):
-        # Allow if it looks like typical order: "qty item"
-        if re.search(r"\b(one|two|three|four|five|six|seven|eight|nine|ten|\d+)\s+[a-z\u0600-\u06FF]+", t):
-            return True
+    # Number (digit, number word or Arabic dual) that belongs to a word
+    # e.g. "Five burgers", "2 coffee", "اثنين برجر", "برجرين"
+    if any(q.noun for q in quantity.scan(t)):
+        return True
 
     return False
     arabic_number_words = [
@@ -2373,31 +2210,9 @@ def detect_spicy_nonspicy(msg: str):
     return spicy_flag, nonspicy_flag
 
 
-AR_NUM_WORDS = {
-    "واحد": 1, "واحدة": 1,
-    "اثنان": 2, "اثنين": 2, "اثنتان": 2, "اتنين": 2, "ثنين": 2,
-    "ثلاثة": 3, "ثلاث": 3,
-    "أربعة": 4, "اربعة": 4, "اربع": 4,
-    "خمسة": 5,
-    "ستة": 6,
-    "سبعة": 7,
-    "ثمانية": 8,
-    "تسعة": 9,
-    "عشرة": 10,
-}
-
-def _replace_arabic_number_words(text: str) -> str:
-    if not text:
-        return ""
-    for w, n in AR_NUM_WORDS.items():
-        text = re.sub(rf"(?<!\S){re.escape(w)}(?!\S)", str(n), text)
-    return text
-
-
 def parse_spice_split(msg: str, total_qty: int):
     text = (msg or "").lower().replace("-", " ").replace("_", " ").strip()
-    text = _normalize_digits(text)
-    text = _replace_arabic_number_words(text)
+    text = arabic_text.clean(text)
 
     spicy_words = ["spicy", "hot", "حار", "حارة", "حارين"]
     nonspicy_words = [
@@ -2410,35 +2225,9 @@ def parse_spice_split(msg: str, total_qty: int):
     half_keywords = ["half", "نص", "نصف"]
     has_half = any(h in text for h in half_keywords)
     
-    # ✅ Detect number words (one..ten) and digits
-    # First, find digits
-    nums = [int(x) for x in re.findall(r"\b\d+\b", text)]
-    
-    # Then look for english number words if we don't have enough digits or just to be safe
-    # Map words to ints
-    word_to_num = {
-        "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, 
-        "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10
-    }
-    
-    # Find words in order? Or just find all and append? 
-    # Better to find ALL numbers (digits and words) in appearance order to respect "1 spicy, 2 non" vs "2 spicy 1 non"
-    # Re-scan text for both patterns together
-    
-    all_matches = []
-    # Tokenize by space to preserve order roughly, or use regex for both
-    # Regex for both:
-    pattern = r"\b(\d+|one|two|three|four|five|six|seven|eight|nine|ten)\b"
-    for match in re.finditer(pattern, text):
-        val_str = match.group(1).lower()
-        if val_str.isdigit():
-            all_matches.append(int(val_str))
-        else:
-            all_matches.append(word_to_num.get(val_str, 0))
-            
-    # Use the ordered list if it found anything, otherwise fallback to just digits
-    if all_matches:
-        nums = [n for n in all_matches if n > 0]
+    # ✅ ALL numbers (digits, EN/AR words, duals) in appearance order, to respect
+    # "1 spicy, 2 non" vs "2 spicy 1 non"
+    nums = quantity.values(text)
 
     has_non = any(w in text for w in nonspicy_words)
     has_spicy = any(w in text for w in spicy_words)  # ✅ FIXED: Don't exclude if has_non
@@ -2499,36 +2288,11 @@ def parse_spice_split(msg: str, total_qty: int):
 # =========================================================
 # MENU ITEM FINDING (EN + AR)
 # =========================================================
-def normalize_arabic_variants(s: str) -> str:
-    if not s:
-        return ""
-    s = s.replace("أ", "ا").replace("إ", "ا").replace("آ", "ا")
-    s = s.replace("ة", "ه")
-    s = s.replace("ى", "ي")
-    s = s.replace("برغر", "برجر")
-    return s
-
-
 def fix_common_typos(s: str) -> str:
-    """Fix common English typos for intelligent understanding"""
+    """Fix common English typos for intelligent understanding (nlp_utils.TYPO_ENGINE)"""
     if not s:
         return ""
-    s_lower = s.lower()
-    typo_map = {
-        "burgur": "burger", "burgr": "burger", "burgir": "burger",
-        "cofee": "coffee", "coffe": "coffee", "coffy": "coffee",
-        "sandwitch": "sandwich", "sandwish": "sandwich",
-        "pesi": "pepsi", "pepi": "pepsi",
-        "wrasp": "wraps", "warp": "wrap",
-        "chiken": "chicken", "checken": "chicken",
-        "beff": "beef", "beaf": "beef",
-        "french fry": "french fries",
-        "onon ring": "onion rings",
-    }
-    for typo, correct in typo_map.items():
-        if typo in s_lower:
-            s = re.sub(r'\b' + re.escape(typo) + r'\b', correct, s, flags=re.IGNORECASE)
-    return s
+    return correct_typos_advanced(s)
 
 
 def check_if_irrelevant_question(msg: str, lang: str = "en") -> dict:
@@ -2585,6 +2349,10 @@ def check_if_irrelevant_question(msg: str, lang: str = "en") -> dict:
     # ✅ AI-POWERED DETECTION (Fallback for complex cases)
     if not client:
         return {"is_irrelevant": False, "polite_response": None}
+
+    u = understand_message(msg)
+    if u is not None:
+        return {"is_irrelevant": u["is_irrelevant"], "polite_response": u["polite_response"]}
     
     system_prompt = (
         "You are an intelligent classifier for Joana Fast Food chatbot.\\n\\n"
@@ -2613,19 +2381,18 @@ def check_if_irrelevant_question(msg: str, lang: str = "en") -> dict:
     )
     
     try:
-        res = client.chat.completions.create(
-            model=LLM_MODEL,
-            messages=[
+        response_text = llm_complete(
+            "irrelevant_check",
+            [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": msg}
             ],
             temperature=0.3,
             max_tokens=200,
+            cacheable=True,  # classifier: same question, same verdict
             timeout=5,  # ✅ 5 second timeout to prevent hanging
         )
         
-        response_text = (res.choices[0].message.content or "").strip()
-        
         # Parse JSON response
         import json
         # Extract JSON from markdown code blocks if present
@@ -2644,8 +2411,10 @@ def check_if_irrelevant_question(msg: str, lang: str = "en") -> dict:
         return {"is_irrelevant": False, "polite_response": None}
 
 
+@per_message
 def find_menu_item(msg: str):
-    text_raw = (msg or "").strip().lower()
+    a = analyze(msg)
+    text_raw = a.clean
     if not text_raw:
         return None
 
@@ -2668,36 +2437,20 @@ def find_menu_item(msg: str):
     if text_raw in MENU:
         return text_raw
 
-    def has_arabic(s2: str) -> bool:
-        return any("\u0600" <= ch <= "\u06ff" for ch in s2)
-
-    is_arabic = has_arabic(text_raw)
-    text = normalize_arabic_variants(text_raw) if is_arabic else text_raw
-    candidates = []
-
-    if is_arabic:
-        for name in MENU.keys():
-            name_l = str(name).strip().lower()
-            if not name_l or not has_arabic(name_l):
-                continue
-            name_norm = normalize_arabic_variants(name_l)
-            if name_norm and name_norm in text:
-                candidates.append(name_l)
-    else:
-        for name in MENU.keys():
-            name_l = str(name).strip().lower()
-            if not name_l:
-                continue
-            pattern = r"\b" + re.escape(name_l) + r"s?\b"
-            if re.search(pattern, text):
-                candidates.append(name_l)
-
-    if not candidates:
+    # One automaton pass; Arabic text matches Arabic keys by containment,
+    # English text matches keys (and their plurals) on word boundaries.
+    want_lang = "ar" if a.has_arabic else "en"
+    hits = {
+        m.key for m in a.mentions
+        if m.kind == "key" and m.lang == want_lang
+    }
+    if not hits:
         return None
 
-    candidates.sort(key=len, reverse=True)
-    return candidates[0]
+    best = min(hits, key=lambda k: (-len(k.strip()), MENU_INDEX.position[k]))
+    return best.strip().lower()
     
+@per_message
 def is_non_menu_item_request(msg: str) -> bool:
     """
     Check if user is requesting items NOT on the Joana menu.
@@ -2738,60 +2491,46 @@ def resolve_menu_item(raw: str):
     if not raw:
         return None, 0.0
 
-    t = normalize_arabic_variants(raw.lower().strip())
+    t = arabic_text.normalize(raw.strip())
     t = re.sub(r"\s+", " ", t)
 
     # ✅ STEP 1: Exact match (highest confidence)
     if t in MENU:
         return t, 1.0
 
-    # ✅ STEP 2: Check against both English AND Arabic names
+    # ✅ STEP 2: Exact match on English OR Arabic name (pre-normalized in MENU_INDEX)
+    exact = MENU_INDEX.exact.get(t)
+    if exact:
+        return exact, 1.0
+
     best_match = None
     best_score = 0.0
-    
-    for menu_key, info in MENU.items():
-        name_en = (info.get("name_en") or menu_key).lower().strip()
-        name_ar = (info.get("name_ar") or "").strip()
-        
-        # Normalize for comparison
-        menu_key_norm = normalize_arabic_variants(menu_key.lower())
-        name_en_norm = normalize_arabic_variants(name_en)
-        name_ar_norm = normalize_arabic_variants(name_ar) if name_ar else ""
-        
-        # Exact match on English name
-        if t == name_en_norm:
-            return menu_key, 1.0
-        
-        # Exact match on Arabic name
-        if name_ar_norm and t == name_ar_norm:
-            return menu_key, 1.0
-        
+    user_words = set(t.split())
+
+    for e in MENU_INDEX.entries:
+        menu_key = e.key
+
         # ✅ CRITICAL: Partial word matching (e.g., "popcorn" → "chicken popcorn")
-        # If user's input is a complete word found in the menu item name
-        user_words = set(t.split())
-        en_words = set(name_en_norm.split())
-        ar_words = set(name_ar_norm.split()) if name_ar_norm else set()
-        
         # Check if ALL user words are in menu item (partial match)
-        if user_words and user_words.issubset(en_words | ar_words):
+        if user_words and user_words <= e.words:
             # Score based on word coverage
-            score = len(user_words) / max(len(en_words | ar_words), 1)
+            score = len(user_words) / max(len(e.words), 1)
             if score > best_score:
                 best_match = menu_key
                 best_score = score
         
         # Substring match (lower priority)
-        if menu_key_norm in t and len(menu_key_norm) > len(best_match or ""):
+        if e.key_norm in t and len(e.key_norm) > len(best_match or ""):
             best_match = menu_key
             best_score = 0.85
         
         # Arabic substring match
-        if name_ar_norm and name_ar_norm in t and len(name_ar_norm) > len(best_match or ""):
+        if e.ar_norm and e.ar_norm in t and len(e.ar_norm) > len(best_match or ""):
             best_match = menu_key
             best_score = 0.85
         
         # English name substring in user input
-        if name_en_norm in t and len(name_en_norm) > len(best_match or ""):
+        if e.en_norm in t and len(e.en_norm) > len(best_match or ""):
             best_match = menu_key
             best_score = 0.85
     
@@ -2802,100 +2541,60 @@ def resolve_menu_item(raw: str):
 
 
 def get_items_by_category(category: str):
-    # Mapping from Group ID (used in buttons/UI) -> raw categories in Excel/MENU
-    GROUPS = {
-        "burgers_meals": ["burgers", "meals"],
-        "sandwiches": ["sandwiches"],
-        "snacks_sides": ["sides"],
-        "drinks": ["drinks"],
-        "juices": ["juices"]
-    }
-    target_categories = GROUPS.get(category, [category])
-    
-    items_map = {}
-    for key, info in MENU.items():
-        if info.get("category") in target_categories:
-            en = (info.get("name_en") or key).strip().lower()
-            ar = (info.get("name_ar") or en).strip()
-            items_map[en] = {"en": en, "ar": ar}
-    return list(items_map.values())
+    # Group ID (used in buttons/UI) -> items, precomputed per menu version (CATEGORY_GROUPS)
+    return MENU_INDEX.items_for_group(category)
 
 # =========================================================
 # NON-GENERIC ITEM HELPERS
 # =========================================================
+@per_message
 def has_non_generic_menu_item(msg: str) -> bool:
     if not msg or not MENU:
         return False
 
-    text = _normalize_digits(msg.lower())
-    seen_en = set()
-
-    for _, info in MENU.items():
-        cat = (info.get("category") or "").lower()
-        # REMOVED: cat in ("burgers_meals", "sandwiches") skip to allow detecting these items in generic text
-        # if cat in ("burgers_meals", "sandwiches"):
-        #     continue
-
-        en = (info.get("name_en") or "").strip().lower()
-        ar = (info.get("name_ar") or "").strip().lower()
-
-        if not en or en in seen_en:
-            continue
-        seen_en.add(en)
+    # Burgers/sandwiches are included on purpose, to detect these items in generic text
+    return any(m.kind in ("en", "ar") for m in analyze(msg).mentions)
 
-        if re.search(r"\b" + re.escape(en) + r"s?\b", text):
-            return True
-        if ar and ar != "nan" and ar in text:
-            return True
 
-    return False
+def _qty_before_span(text: str, start: int, need_space: bool = True):
+    """Digits written immediately before text[start:] ("2 pepsi", "2بيبسي"), else None."""
+    i = start
+    while i > 0 and text[i - 1].isspace():
+        i -= 1
+    if need_space and i == start:
+        return None
+    j = i
+    while j > 0 and text[j - 1].isdigit():
+        j -= 1
+    if j == i or (j > 0 and (text[j - 1].isalnum() or text[j - 1] == "_")):
+        return None
+    return int(text[j:i])
 
 
 def add_non_generic_items_to_order(state: dict, msg: str, lang: str):
-    text = _normalize_digits(msg.lower())
+    a = analyze(msg)
+    text = a.clean
     to_add = {}
     added_lines = []
 
-    seen_en = set()
-
-    for _, info in MENU.items():
-        cat = (info.get("category") or "").lower()
-        # REMOVED: category skip
-        # if cat in ("burgers_meals", "sandwiches"):
-        #     continue
-
-        en = (info.get("name_en") or "").strip().lower()
-        ar = (info.get("name_ar") or "").strip().lower()
-
-        if not en or en in seen_en:
+    # English mentions win over Arabic ones for the same item; qty is the
+    # number written right before the first mention that has one.
+    qty_by_lang = {}
+    for m in a.mentions:
+        if m.kind not in ("en", "ar"):
             continue
-        seen_en.add(en)
-
-        matched = False
-        qty = None
+        en = MENU_INDEX.by_key[m.key].en
+        slot = qty_by_lang.setdefault(en, {})
+        if m.lang not in slot or slot[m.lang] is None:
+            slot[m.lang] = _qty_before_span(text, m.start, need_space=(m.lang == "en"))
 
-        if re.search(r"\b" + re.escape(en) + r"s?\b", text):
-            matched = True
-            m = re.search(r"\b(\d+)\b\s+" + re.escape(en), text)
-            qty = int(m.group(1)) if m else 1
-
-        if not matched and ar and ar != "nan" and ar in text:
-            matched = True
-            m = re.search(r"\b(\d+)\b\s*" + re.escape(ar), text)
-            qty = int(m.group(1)) if m else 1
-
-        if matched:
-            to_add[en] = to_add.get(en, 0) + max(1, qty or 1)
+    for en, slot in qty_by_lang.items():
+        qty = slot["en"] if "en" in slot else slot["ar"]
+        to_add[en] = to_add.get(en, 0) + max(1, qty or 1)
 
     for en, qty in to_add.items():
         # ✅ resolve correct MENU key (coffee / pepsi / variants)
-        resolved = en
-        if en.lower() not in MENU:
-            # try to match by name_en
-            for k, info in MENU.items():
-                if (info.get("name_en") or "").lower() == en.lower():
-                    resolved = k
-                    break
+        resolved = en if en in MENU else MENU_INDEX.key_by_en.get(en, en)
 
         price, _ = get_price_and_category(resolved)
         if price is None or price <= 0:
@@ -2919,12 +2618,14 @@ def add_non_generic_items_to_order(state: dict, msg: str, lang: str):
 # =========================================================
 # GENERIC BURGER/SANDWICH HELPERS
 # =========================================================
+@per_message
 def msg_has_generic_burger_word(msg: str) -> bool:
     if not msg:
         return False
     t = msg.lower()
     return bool(re.search(r"\b(burger|burgers)\b", t) or "برجر" in t or "برغر" in t)
 
+@per_message
 def msg_has_specific_burger(msg: str) -> bool:
     if not msg or not MENU:
         return False
@@ -2936,12 +2637,14 @@ def msg_has_specific_burger(msg: str) -> bool:
                 return True
     return False
 
+@per_message
 def msg_has_generic_sandwich_word(msg: str) -> bool:
     if not msg:
         return False
     t = msg.lower()
     return bool(re.search(r"\b(sandwich|sandwiches|wrap|wraps|tortilla|tortillas)\b", t) or "ساندويتش" in msg or "سندوتش" in msg)
 
+@per_message
 def msg_has_specific_sandwich(msg: str) -> bool:
     if not msg or not MENU:
         return False
@@ -2954,86 +2657,49 @@ def msg_has_specific_sandwich(msg: str) -> bool:
     return False
 
 def _unique_menu_items_by_category(category: str):
-    items = []
-    seen = set()
-    for k, info in MENU.items():
-        if info.get("category") != category:
-            continue
-        en = (info.get("name_en") or k).strip().lower()
-        if not en or en in seen:
-            continue
-        seen.add(en)
-        ar = (info.get("name_ar") or en).strip()
-        items.append({"en": en, "ar": ar})
-    return items
+    return MENU_INDEX.items_in_category(category)
 
 
-def send_specific_burger_buttons(user_number: str, lang: str):
+def _picker_page(user_number: str, kind: str, category: str, page_field: str, lang: str):
+    """Pre-rendered button page (2 items + More) for the session's page; wraps to page 0 past the end."""
     ctx = WHATSAPP_SESSIONS.get(user_number, {})
     s = ctx.get("state") or {}
-    page = int(s.get("burger_page") or 0)
-
-    items = _unique_menu_items_by_category("burgers_meals")
-    if not items:
-        send_whatsapp_text(user_number, "No burgers found." if lang != "ar" else "لا توجد أصناف برجر حالياً.")
-        return
+    page = int(s.get(page_field) or 0)
 
-    start = page * 2
-    slice_items = items[start:start + 2]
-    if not slice_items:
-        s["burger_page"] = 0
+    btn_page = MENU_INDEX.button_page(kind, category, lang, start=page * BUTTON_PAGE_SIZE)
+    if btn_page is None:
+        return None, s
+    if btn_page.start != page * BUTTON_PAGE_SIZE:
+        s[page_field] = 0
         ctx["state"] = s
         WHATSAPP_SESSIONS[user_number] = ctx
-        start = 0
-        slice_items = items[0:2]
+    return btn_page, s
 
-    buttons = []
-    for it in slice_items:
-        title = it["ar"] if lang == "ar" else it["en"].title()
-        buttons.append({"id": f"pick_burger_{it['en']}", "title": title})
 
-    if start + 2 < len(items):
-        buttons.append({"id": "burger_more", "title": "المزيد" if lang == "ar" else "More"})
+def send_specific_burger_buttons(user_number: str, lang: str):
+    btn_page, s = _picker_page(user_number, "burger", "burgers_meals", "burger_page", lang)
+    if btn_page is None:
+        send_whatsapp_text(user_number, "No burgers found." if lang != "ar" else "لا توجد أصناف برجر حالياً.")
+        return
 
     qty = int(s.get("last_qty", 1) or 1)
     body = (f"لديك {qty} برجر. اختر نوع البرجر:" if lang == "ar"
             else f"You ordered {qty} burger(s). Please choose which burger:")
 
-    send_whatsapp_quick_buttons(user_number, body, buttons)
+    send_whatsapp_quick_buttons(user_number, body, list(btn_page.buttons))
 
 
 def send_specific_sandwich_buttons(user_number: str, lang: str):
-    ctx = WHATSAPP_SESSIONS.get(user_number, {})
-    s = ctx.get("state") or {}
-    page = int(s.get("sand_page") or 0)
-
-    items = _unique_menu_items_by_category("sandwiches")
-    if not items:
+    btn_page, s = _picker_page(user_number, "sandwich", "sandwiches", "sand_page", lang)
+    if btn_page is None:
         send_whatsapp_text(user_number, "No sandwiches found." if lang != "ar" else "لا توجد أصناف ساندويتش حالياً.")
         return
 
-    start = page * 2
-    slice_items = items[start:start + 2]
-    if not slice_items:
-        s["sand_page"] = 0
-        ctx["state"] = s
-        WHATSAPP_SESSIONS[user_number] = ctx
-        start = 0
-        slice_items = items[0:2]
-
-    buttons = []
-    for it in slice_items:
-        title = it["ar"] if lang == "ar" else it["en"].title()
-        buttons.append({"id": f"pick_sandwich_{it['en']}", "title": title})
-
-    if start + 2 < len(items):
-        buttons.append({"id": "sand_more", "title": "المزيد" if lang == "ar" else "More"})
-
     qty = int(s.get("last_qty", 1) or 1)
     body = (f"لديك {qty} ساندويتش. اختر نوع الساندويتش:" if lang == "ar"
             else f"You ordered {qty} sandwich(es). Please choose which sandwich:")
 
-    send_whatsapp_quick_buttons(user_number, body, buttons)
+    send_whatsapp_quick_buttons(user_number, body, list(btn_page.buttons))
 
 # =========================================================
 # MULTI-INTENT ROUTER HELPERS
@@ -3081,8 +2747,9 @@ def merge_replies(*parts):
 CANCEL_KEYWORDS_EN = ["cancel", "remove", "delete", "drop"]
 CANCEL_KEYWORDS_AR = ["إلغاء", "الغاء", "احذف", "حذف", "شيل", "الغِ", "الغ", "كنسل"]
 
+@per_message
 def is_cancel_text(msg: str) -> bool:
-    t = (msg or "").lower()
+    t = analyze(msg).lower
     if any(k in t for k in CANCEL_KEYWORDS_EN):
         return True
     return any(k in (msg or "") for k in CANCEL_KEYWORDS_AR)
@@ -3143,6 +2810,7 @@ def split_cancel_parts(text: str):
 # PRICE / TOTAL INTENT HELPERS
 # =========================
 
+@per_message
 def is_price_query(msg: str) -> bool:
     t = (msg or "").lower()
     return any(k in t for k in [
@@ -3152,6 +2820,7 @@ def is_price_query(msg: str) -> bool:
     ])
 
 
+@per_message
 def is_total_bill_query(msg: str) -> bool:
     t = (msg or "").lower()
     return any(k in t for k in [
@@ -3161,7 +2830,7 @@ def is_total_bill_query(msg: str) -> bool:
 
 
 def extract_item_for_price_query(msg: str) -> str:
-    t = _normalize_digits((msg or "").lower())
+    t = arabic_text.clean((msg or "").lower())
     t = re.sub(r"\b(price|cost|rate|how\s*much|total|bill|amount)\b", " ", t)
     t = re.sub(r"\b(kitna|kitni|daam|dam)\b", " ", t)
     t = re.sub(r"\b\d+\b", " ", t)
@@ -3180,7 +2849,7 @@ def compute_order_total(state: dict) -> float:
 
 def extract_cancel_requests_from_text(msg_raw: str):
     text = (msg_raw or "").lower()
-    text = _normalize_digits(text)
+    text = arabic_text.clean(text)
 
     # remove cancel keywords
     text = re.sub(r"\b(cancel|remove|delete|drop)\b", " ", text)
@@ -3194,6 +2863,8 @@ def extract_cancel_requests_from_text(msg_raw: str):
     text = re.sub(r"[,+/;]+", " ", text)
     text = re.sub(r"\s+", " ", text).strip()
 
+    # "cancel two burgers" / "الغي برجرين" -> "2 burgers" / "2 برجر"
+    text = quantity.as_digits(text)
     pairs = re.findall(r"(\d+)\s+(.+?)(?=\s+\d+\s+|$)", text)
 
     out = []
@@ -3222,14 +2893,7 @@ def parse_cancel_request(msg: str, lang: str):
 
     qty = None
     q = detect_qty(text)
-    has_digit = bool(re.search(r"\d+", _normalize_digits(text)))
-    has_word_en = bool(re.search(r"\b(one|two|three|four|five|six|seven|eight|nine|ten)\b", text.lower()))
-    has_word_ar = any(w in text for w in [
-        "واحد","واحدة","اثنين","اتنين","ثنين",
-        "ثلاثة","ثلاث","اربعة","أربعة","خمسة",
-        "ستة","سبعة","ثمانية","تسعة","عشرة"
-    ])
-    if has_digit or has_word_en or has_word_ar:
+    if has_explicit_quantity(text):
         qty = max(int(q), 1) if q else 1
 
     lines = re.split(r"[\n,]+", text.lower())
@@ -3479,27 +3143,18 @@ def send_category_buttons(user_number: str, lang: str = "en", show_image: bool =
 
 
 def send_items_for_category(user_number: str, category: str, lang: str = "en"):
-    items = get_items_by_category(category)
-    if not items:
-        send_whatsapp_text(user_number, "No items found in this category yet." if lang != "ar" else "لا توجد أصناف في هذه الفئة حالياً.")
-        return
-
     state = WA_CATEGORY_STATE.get(user_number, {"category": category, "index": 0})
     index = state.get("index", 0)
     if state.get("category") != category:
         index = 0
 
-    slice_items = items[index : index + 2]
-    buttons = []
-    for item in slice_items:
-        en_name = item["en"]
-        ar_name = item["ar"]
-        title = ar_name if lang == "ar" else en_name.title()
-        buttons.append({"id": f"item_{en_name}", "title": title})
-
-    if index + 2 < len(items):
-        more_title = "المزيد من الأصناف" if lang == "ar" else "More items"
-        buttons.append({"id": "more_items", "title": more_title})
+    # Pre-rendered page lookup; no MENU scan per tap
+    btn_page = MENU_INDEX.button_page("item", category, lang, start=index)
+    if btn_page is None:
+        send_whatsapp_text(user_number, "No items found in this category yet." if lang != "ar" else "لا توجد أصناف في هذه الفئة حالياً.")
+        return
+    index = btn_page.start
+    buttons = list(btn_page.buttons)
 
     body = (
         "اختر الصنف ثم اكتب الكمية المطلوبة (مثال: 12)."
@@ -3594,12 +3249,19 @@ def send_cancel_item_buttons(user_number: str, lang: str):
 
 # =========================================================
 # LLM HELPERS
+#    Menu-derived prompt blocks are built once per menu snapshot
+#    (MenuSnapshot.derived): every call sends the same bytes, so the
+#    provider's prompt-prefix cache can hit, and MENU is not walked per call
 # =========================================================
 def build_menu_context():
-    if not MENU:
+    return active_snapshot().derived("menu_context", _menu_context)
+
+
+def _menu_context(snap):
+    if not snap.menu:
         return "Current restaurant menu is empty."
     lines = []
-    for name, info in MENU.items():
+    for name, info in snap.menu.items():
         if not re.search(r"[A-Za-z]", name):
             continue
         price = info.get("price", 0.0)
@@ -3645,42 +3307,58 @@ def get_llm_reply(msg, lang="en"):
     messages.append({"role": "user", "content": msg})
 
     try:
-        res = client.chat.completions.create(
-            model=LLM_MODEL,
-            messages=messages,
-            temperature=0.5,
-            max_tokens=250,
-        )
-        return (res.choices[0].message.content or "").strip()
+        # Conversational (history + temperature 0.5): never cached
+        return llm_complete("chat_reply", messages, temperature=0.5, max_tokens=250)
     except Exception as e:
         print("LLM error:", repr(e))
         return "Sorry, something went wrong." if lang == "en" else "عذراً، حدث خطأ ما."
 
 
 def build_llm_menu_list() -> str:
-    if not MENU:
+    return active_snapshot().derived("llm_menu_list", _llm_menu_list)
+
+
+def _llm_menu_list(snap) -> str:
+    if not snap.menu:
         return ""
     names = set()
-    for _key, info in MENU.items():
+    for _key, info in snap.menu.items():
         nm = (info.get("name_en") or "").strip()
         if nm:
             names.add(nm)
     return ", ".join(sorted(names))
 
 
+@per_message
 def correct_arabic_typos_with_ai(msg: str) -> str:
+    """Arabic typo correction, at most once per distinct text per inbound message.
+
+    The webhook, chat() and handle_multi_item_text all ask for it; the corrected
+    text is remembered as already correct, so only the first call can reach the LLM.
+    """
+    corrected = _correct_arabic_typos(msg)
+    mark_corrected(corrected)
+    return corrected
+
+
+def mark_corrected(text: str):
+    """`text` is already corrected: correct_arabic_typos_with_ai(text) returns it as is (this request)."""
+    message_analysis.remember(correct_arabic_typos_with_ai, text, text)
+
+
+def _correct_arabic_typos(msg: str) -> str:
     """
     ✅ AI-POWERED ARABIC TYPO CORRECTION
     Uses GPT to intelligently fix Arabic spelling mistakes and map to menu items.
     This makes the system extremely tolerant of Arabic typos!
     
     Examples:
-    - "تورتيلا" → "تورتيا" (menu spelling)
+    - "تورتيا" → "تورتيلا" (menu spelling)
     - "فشار" → "بوفك دجاج" (popcorn → chicken popcorn)
     - "شكشوكه" → "شكشوكة" (typo fix)
     - "كبابب دجاج" → "كباب دجاج" (extra letter)
     """
-    if not msg or not client:
+    if not msg:
         return msg
     
     # Only process if contains Arabic
@@ -3688,9 +3366,50 @@ def correct_arabic_typos_with_ai(msg: str) -> str:
     if not has_arabic:
         return msg
     
+    # Local SymSpell pass first: only messages with unknown/ambiguous words go to the LLM
+    local = nlp_utils.arabic_speller().correct(msg)
+    if local.confident:
+        if local.fixes:
+            print(f"✅ Arabic typo corrected locally: '{msg}' → '{local.text}' {local.fixes}")
+        return local.text
+    if not client:
+        return msg  # unsure and no LLM: keep the user's words
+    print(f"ℹ Local speller unsure about {local.unsure}; asking LLM")
+
+    u = understand_message(msg)
+    if u is not None:
+        return u["corrected_text"]
+    
+    system_prompt = arabic_typos_prompt()
+    
+    try:
+        corrected = llm_complete(
+            "arabic_typos",
+            [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": msg}
+            ],
+            temperature=0.2,  # Low temp for consistent corrections
+            max_tokens=200,
+            cacheable=True,
+        )
+        
+        return checked_arabic_correction(msg, corrected)
+            
+    except Exception as e:
+        print(f"❌ Arabic correction error: {repr(e)}")
+        return msg  # Fail gracefully, return original
+
+
+def arabic_typos_prompt() -> str:
+    """System prompt of the Arabic typo correction (built once per menu snapshot)."""
+    return active_snapshot().derived("arabic_typos_prompt", _arabic_typos_prompt)
+
+
+def _arabic_typos_prompt(snap) -> str:
     # Build menu context for Arabic correction
     arabic_menu_items = []
-    for key, info in MENU.items():
+    for key, info in snap.menu.items():
         name_ar = (info.get("name_ar") or "").strip()
         name_en = (info.get("name_en") or key).strip()
         if name_ar:
@@ -3698,7 +3417,7 @@ def correct_arabic_typos_with_ai(msg: str) -> str:
     
     menu_context = "\n".join(arabic_menu_items[:40])  # First 40 items
     
-    system_prompt = (
+    return (
         "You are a spelling correction expert for Arabic food orders. Your ONLY job is to fix spelling mistakes.\n\n"
         "CRITICAL RULES - MUST FOLLOW:\n"
         "1. ONLY fix obvious typos and spelling errors\n"
@@ -3732,51 +3451,42 @@ def correct_arabic_typos_with_ai(msg: str) -> str:
         "❌ 'This item is not available' (NO availability comments!)\n\n"
         "Return ONLY the corrected Arabic text from the user's input."
     )
+
+
+def checked_arabic_correction(msg: str, corrected: str) -> str:
+    """`corrected` if it passes the safety checks, else the original `msg`."""
+    # ✅ STRONG Safety checks - reject invalid AI outputs
+    # 1. Check for "لا توجد" (there is no), "غير متوفر" (not available), "Sorry", etc.
+    invalid_phrases = [
+        "لا توجد", "لا يوجد", "غير متوفر", "غير موجود", "not available", 
+        "sorry", "عذراً", "آسف", "لا أستطيع", "cannot", "can't"
+    ]
+    has_invalid = any(phrase in corrected.lower() for phrase in invalid_phrases)
     
-    try:
-        res = client.chat.completions.create(
-            model=LLM_MODEL,  # Fast model for typo correction
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": msg}
-            ],
-            temperature=0.2,  # Low temp for consistent corrections
-            max_tokens=200,
-        )
-        
-        corrected = (res.choices[0].message.content or "").strip()
-        
-        # ✅ STRONG Safety checks - reject invalid AI outputs
-        # 1. Check for "لا توجد" (there is no), "غير متوفر" (not available), "Sorry", etc.
-        invalid_phrases = [
-            "لا توجد", "لا يوجد", "غير متوفر", "غير موجود", "not available", 
-            "sorry", "عذراً", "آسف", "لا أستطيع", "cannot", "can't"
-        ]
-        has_invalid = any(phrase in corrected.lower() for phrase in invalid_phrases)
-        
-        # 2. Check length is reasonable (not too different from original)
-        length_ok = len(corrected) >= len(msg) * 0.5 and len(corrected) <= len(msg) * 2.5
-        
-        # 3. Check it's not empty and has Arabic content
-        has_content = bool(corrected and any('\u0600' <= ch <= '\u06ff' for ch in corrected))
-        
-        # 4. Use correction ONLY if all checks pass
-        if has_content and length_ok and not has_invalid:
+    # 2. Check length is reasonable (not too different from original)
+    length_ok = len(corrected) >= len(msg) * 0.5 and len(corrected) <= len(msg) * 2.5
+    
+    # 3. Check it's not empty and has Arabic content
+    has_content = bool(corrected and any('\u0600' <= ch <= '\u06ff' for ch in corrected))
+    
+    # 4. Use correction ONLY if all checks pass
+    if has_content and length_ok and not has_invalid:
+        if corrected != msg:
             print(f"✅ Arabic typo corrected: '{msg}' → '{corrected}'")
-            return corrected
-        else:
-            reason = "empty" if not has_content else "invalid phrase" if has_invalid else "unreasonable length"
-            print(f"⚠️ Arabic correction rejected ({reason}): '{corrected}' | Using original: '{msg}'")
-            return msg
-            
-    except Exception as e:
-        print(f"❌ Arabic correction error: {repr(e)}")
-        return msg  # Fail gracefully, return original
+        return corrected
+    reason = "empty" if not has_content else "invalid phrase" if has_invalid else "unreasonable length"
+    print(f"⚠️ Arabic correction rejected ({reason}): '{corrected}' | Using original: '{msg}'")
+    return msg
+
+
+# Local grammar parses at or above this confidence skip the LLM
+LOCAL_ORDER_MIN_CONFIDENCE = 0.95
 
 
 def parse_intelligent_order(msg: str, lang: str = "en") -> dict:
     """
-    Smart LLM-based order parser that handles:
+    Structured orders ("2 beef burger and 1 pepsi") are parsed locally by
+    order_grammar; only ambiguous ones go to the LLM parser, which handles:
     - Wrong spellings (cofee → coffee, burgur → burger)
     - Generic vs specific items ("burger" vs "beef burger")
     - Multiple items in one sentence
@@ -3790,287 +3500,35 @@ def parse_intelligent_order(msg: str, lang: str = "en") -> dict:
         ]
     }
     """
-    if not msg or not MENU or not client:
+    if not msg or not MENU:
+        return {"items": []}
+
+    local = order_grammar.parse(msg, MENU_INDEX)
+    if local["confidence"] >= LOCAL_ORDER_MIN_CONFIDENCE:
+        print(f"✅ Local order parse (confidence {local['confidence']}):", local["items"])
+        return local
+    if not client:
         return {"items": []}
+    print(f"ℹ Local order parse ambiguous (confidence {local['confidence']}); asking LLM")
+
+    u = understand_message(msg)
+    if u is not None:
+        print("✅ Order items from message understanding:", u["items"])
+        return {"items": [dict(it) for it in u["items"]]}
     
     try:
-        # Build comprehensive menu context with categories (INCLUDING Arabic names!)
-        menu_by_category = {}
-        for key, info in MENU.items():
-            cat = (info.get("category") or "").strip().lower()
-            name_en = (info.get("name_en") or key).strip()
-            name_ar = (info.get("name_ar") or "").strip()
-            
-            # ✅ Include BOTH English and Arabic names for better matching
-            display_name = f"{name_en} ({name_ar})" if name_ar else name_en
-            
-            if cat not in menu_by_category:
-                menu_by_category[cat] = []
-            menu_by_category[cat].append(display_name)
+        system_prompt = order_parse_prompt()
         
-        menu_context = "\n".join([
-            f"- {cat}: {', '.join(items[:15])}"
-            for cat, items in menu_by_category.items() if items
-        ])
-        
-        system_prompt = (
-            "You are an intelligent restaurant order parser for JOANA Fast Food.\n\n"
-            "MENU BY CATEGORY:\n"
-            f"{menu_context}\n\n"
-            "TASK: Parse customer's natural language order (may have typos, ARABIC or ENGLISH or mixed).\n\n"
-            "⚠️ CRITICAL RULES (FOLLOW EXACTLY - DO NOT SKIP ANY ITEMS!):\n"
-            "\n"
-            "RULE 1 - WRAPS = SANDWICHES (MANDATORY!):\n"
-            "When user says: wrap, wraps, tortilla, tortillas → MUST use category=\"sandwich\"\n"
-            "⚠️ EXCEPTION: If the user names a SPECIFIC wrap (e.g. 'Tortilla Chicken'), extract it as 'specific' item.\n"
-            "   DO NOT extract a generic 'sandwich' in addition to the specific wrap unless the user said 'and a sandwich'.\n"
-            "   Example: '1 Tortilla Chicken' → 1 Specific Item (NO generic sandwich).\n"
-            "   Example: '2 wraps' → 2 Generic Sandwich.\n"
-            "\n"
-            "RULE 2 - SIDES/SNACKS:\n"
-            "'sides', 'snacks', 'side' → category=\"snacks_sides\"\n"
-            "\n"
-            "RULE 3 - ARABIC SUPPORT & TYPO TOLERANCE:\n"
-            "⚠️ Be EXTREMELY tolerant of Arabic spelling variations!\n"
-            "Convert Arabic numerals (١٢٣٤٥) to English (12345)\n"
-            "MATCH similar Arabic words even with slight differences:\n"
-            "  - 'تورتيلا' should match 'تورتيا' (tortilla variations)\n"
-            "  - 'بوفك' should match 'فشار' (popcorn variations)\n"
-            "  - 'برغر' should match 'برجر' (burger variations)\n"
-            "Generic categories (English OR Arabic):\n"
-            "  - burger/burgers/برجر/برغر → category=\"burger\"\n"
-            "  - sandwich/ساندويتش/wrap/wraps/تورتيلا/تورتيا → category=\"sandwich\"\n"
-            "  - drink/مشروب/juice/عصير/meal/وجبة → respective categories\n"
-            "⚠️ When user mentions Arabic item name, find closest match in menu context above!\n"
-            "Example: 'ساندويتش شكشوكة' → match 'Sandwiches Shashukah'\n"
-            "\n"
-            "RULE 4 - SPECIFIC ITEMS:\n"
-            "If user mentions specific item name → type=\"specific\"\n"
-            "⚠️ SMART MAPPING (use EXACT menu names):\n"
-            "  - 'فشار' OR 'popcorn' OR 'بوفك' → \"Chicken Popcorn\" (NOT just \"Popcorn\")\n"
-            "  - 'تورتيلا دجاج' OR 'tortilla chicken' → \"Tortilla Chicken Jambo\"\n"
-            "  - 'شكشوكة' OR 'shashukah' → \"Sandwiches Shashukah\"\n"
-            "  - 'كباب دجاج' OR 'kabab chicken' → \"Kabab Chicken Jambo\"\n"
-            "Examples: 'chicken'/'دجاج' → \"Chicken Burger\", 'sweet corn'/'ذرة حلوة' → \"Sweet Corn\"\n"
-            "Coffee/Tea/Water/Pepsi are SPECIFIC items under drinks category\n"
-            "\n"
-            "RULE 5 - QUANTITY INTELLIGENCE:\n"
-            "⚠️ ALWAYS extract quantity when explicitly mentioned!\n"
-            "'2 burgers' → qty=2, '5 coffee' → qty=5, '10 drinks' → qty=10\n"
-            "If NO quantity mentioned, use qty=1 as default\n"
-            "Be precise with numbers: '10 burgers and 5 wraps' → burger qty=10, sandwich qty=5\n"
-            "\n"
-            "RULE 6 - MENU HIERARCHY AWARENESS:\n"
-            "⚠️ Coffee is a SPECIFIC drink, not a separate category!\n"
-            "When user says '3 coffees and 2 drinks':\n"
-            "  → Extract Coffee as specific item (qty=3, category=drinks)\n"
-            "  → Extract drinks as generic (qty=2) for OTHER drinks (NOT coffee again!)\n"
-            "This prevents duplicate counting of the same item.\n"
-            "\n"
-            "RULE 7 - EXTRACT ALL ITEMS:\n"
-            "Multi-item orders: Extract EVERY item mentioned (DO NOT DROP ANY!)\n"
-            "\n"
-            "RULE 8 - PRESERVE QUANTITIES:\n"
-            "Keep exact quantities from user input\n"
-            "\n"
-            "RULE 9 - SPICE PREFERENCES:\n"
-            "Detect: spicy/non-spicy/حار/بدون حار for burgers\n"
-            "\n"
-            "═══════════════════════════════════════════════════════════\n"
-            "FEW-SHOT EXAMPLES (FOLLOW THESE PATTERNS EXACTLY!):\n"
-            "═══════════════════════════════════════════════════════════\n"
-            "\n"
-            "EXAMPLE 1:\n"
-            "Input: \"3 burgers and 2 wraps and 4 coffee\"\n"
-            "Output:\n"
-            "{\n"
-            "  \"items\": [\n"
-            "    {\"type\": \"generic\", \"category\": \"burger\", \"qty\": 3},\n"
-            "    {\"type\": \"generic\", \"category\": \"sandwich\", \"qty\": 2},\n"
-            "    {\"type\": \"specific\", \"name\": \"Coffee\", \"qty\": 4, \"category\": \"drinks\"}\n"
-            "  ]\n"
-            "}\n"
-            "✅ Correct: THREE items extracted (wraps → sandwich!)\n"
-            "\n"
-            "EXAMPLE 2:\n"
-            "Input: \"10 burgers and 5 wraps and 3 coffee\"\n"
-            "Output:\n"
-            "{\n"
-            "  \"items\": [\n"
-            "    {\"type\": \"generic\", \"category\": \"burger\", \"qty\": 10},\n"
-            "    {\"type\": \"generic\", \"category\": \"sandwich\", \"qty\": 5},\n"
-            "    {\"type\": \"specific\", \"name\": \"Coffee\", \"qty\": 3, \"category\": \"drinks\"}\n"
-            "  ]\n"
-            "}\n"
-            "✅ Correct: THREE items, wraps → sandwich with qty=5\n"
-            "\n"
-            "EXAMPLE 3 (Coffee + Drinks hierarchy):\n"
-            "Input: \"2 burgers, 3 coffees, and 2 drinks\"\n"
-            "Output:\n"
-            "{\n"
-            "  \"items\": [\n"
-            "    {\"type\": \"generic\", \"category\": \"burger\", \"qty\": 2},\n"
-            "    {\"type\": \"specific\", \"name\": \"Coffee\", \"qty\": 3, \"category\": \"drinks\"},\n"
-            "    {\"type\": \"generic\", \"category\": \"drinks\", \"qty\": 2}\n"
-            "  ]\n"
-            "}\n"
-            "✅ Correct: Coffee is specific, drinks is generic (for selecting OTHER drinks)\n"
-            "\n"
-            "EXAMPLE 4 (Natural language quantities):\n"
-            "Input: \"a burger, few coffees, and some water\"\n"
-            "Output:\n"
-            "{\n"
-            "  \"items\": [\n"
-            "    {\"type\": \"generic\", \"category\": \"burger\", \"qty\": 1},\n"
-            "    {\"type\": \"specific\", \"name\": \"Coffee\", \"qty\": 3, \"category\": \"drinks\"},\n"
-            "    {\"type\": \"specific\", \"name\": \"Water\", \"qty\": 3, \"category\": \"drinks\"}\n"
-            "  ]\n"
-            "}\n"
-            "✅ Correct: 'a'=1, 'few'=3, 'some'=3 (smart quantity detection)\n"
-            "\n"
-            "EXAMPLE 5 (Arabic with typo tolerance):\n"
-            "Input: \"١ تورتيلا دجاج جامبو\"\n"
-            "Output:\n"
-            "{\n"
-            "  \"items\": [\n"
-            "    {\"type\": \"specific\", \"name\": \"Tortilla Chicken Jambo\", \"qty\": 1, \"category\": \"burgers_meals\"}\n"
-            "  ]\n"
-            "}\n"
-            "✅ Correct: Matched 'تورتيلا' (typo) to 'تورتيا' in menu, converted ١ to 1\n"
-            "\n"
-            "EXAMPLE 6 (Arabic multi-item):\n"
-            "Input: \"٤ ساندويتش شكشوكة و ٥ قهوة\"\n"
-            "Output:\n"
-            "{\n"
-            "  \"items\": [\n"
-            "    {\"type\": \"specific\", \"name\": \"Sandwiches Shashukah\", \"qty\": 4, \"category\": \"sandwiches\"},\n"
-            "    {\"type\": \"specific\", \"name\": \"Coffee\", \"qty\": 5, \"category\": \"drinks\"}\n"
-            "  ]\n"
-            "}\n"
-            "✅ Correct: Arabic numbers converted, TWO items extracted\n"
-            "\n"
-            "EXAMPLE 7 (Popcorn mapping):\n"
-            "Input: \"٦ فشار و ٨ بطاطس مقلية\"\n"
-            "Output:\n"
-            "{\n"
-            "  \"items\": [\n"
-            "    {\"type\": \"specific\", \"name\": \"Chicken Popcorn\", \"qty\": 6, \"category\": \"snacks_sides\"},\n"
-            "    {\"type\": \"specific\", \"name\": \"French Fries\", \"qty\": 8, \"category\": \"snacks_sides\"}\n"
-            "  ]\n"
-            "}\n"
-            "✅ Correct: 'فشار' (popcorn) → \"Chicken Popcorn\" (actual menu item)\n"
-            "\n"
-            "EXAMPLE 8 (Typos and informal):\n"
-            "Input: \"2 burgurs and cofee plz\"\n"
-            "Output:\n"
-            "{\n"
-            "  \"items\": [\n"
-            "    {\"type\": \"generic\", \"category\": \"burger\", \"qty\": 2},\n"
-            "    {\"type\": \"specific\", \"name\": \"Coffee\", \"qty\": 1, \"category\": \"drinks\"}\n"
-            "  ]\n"
-            "}\n"
-            "✅ Correct: Fixed typos (burgurs→burger, cofee→coffee), ignored 'plz'\n"
-            "\n"
-            "EXAMPLE 8:\n"
-            "Input: \"2 burgers, 3 coffees, and 2 drinks\"\n"
-            "Output:\n"
-            "{\n"
-            "  \"items\": [\n"
-            "    {\"type\": \"generic\", \"category\": \"burger\", \"qty\": 2},\n"
-            "    {\"type\": \"specific\", \"name\": \"Coffee\", \"qty\": 3, \"category\": \"drinks\"},\n"
-            "    {\"type\": \"generic\", \"category\": \"drinks\", \"qty\": 2}\n"
-            "  ]\n"
-            "}\n"
-            "✅ Correct: Coffee is specific, drinks is generic (for selecting OTHER drinks)\n"
-            "\n"
-            "EXAMPLE 9:\n"
-            "Input: \"5 burgers and 5 sides\"\n"
-            "Output:\n"
-            "{\n"
-            "  \"items\": [\n"
-            "    {\"type\": \"generic\", \"category\": \"burger\", \"qty\": 5},\n"
-            "    {\"type\": \"generic\", \"category\": \"snacks_sides\", \"qty\": 5}\n"
-            "  ]\n"
-            "}\n"
-            "✅ Correct: TWO items extracted\n"
-            "\n"
-            "EXAMPLE 10:\n"
-            "Input: \"2 wraps\"\n"
-            "Output:\n"
-            "{\n"
-            "  \"items\": [\n"
-            "    {\"type\": \"generic\", \"category\": \"sandwich\", \"qty\": 2}\n"
-            "  ]\n"
-            "}\n"
-            "✅ Correct: wraps → sandwich category\n"
-            "\n"
-            "EXAMPLE 11 (Specific Sides):\n"
-            "Input: \"One sweet potato and one sweet corn\"\n"
-            "Output:\n"
-            "{\n"
-            "  \"items\": [\n"
-            "    {\"type\": \"specific\", \"name\": \"Sweet Potato\", \"qty\": 1, \"category\": \"snacks_sides\"},\n"
-            "    {\"type\": \"specific\", \"name\": \"Sweet Corn\", \"qty\": 1, \"category\": \"snacks_sides\"}\n"
-            "  ]\n"
-            "}\n"
-            "✅ Correct: Specific sides matched exactly\n"
-            "\n"
-            "EXAMPLE 12 (Specific Wraps - NO GENERIC):\n"
-            "Input: \"One spicy tortilla and one regular\"\n"
-            "Output:\n"
-            "{\n"
-            "  \"items\": [\n"
-            "    {\"type\": \"specific\", \"name\": \"Tortilla Chicken Jambo\", \"qty\": 1, \"category\": \"sandwiches\", \"spicy\": \"spicy\"},\n"
-            "    {\"type\": \"specific\", \"name\": \"Tortilla Chicken Jambo\", \"qty\": 1, \"category\": \"sandwiches\", \"spicy\": \"non-spicy\"}\n"
-            "  ]\n"
-            "}\n"
-            "✅ Correct: Specific items only. NO generic 'sandwich' item added.\n"
-            "\n"
-            "EXAMPLE 11 (Arabic):\n"
-            "Input: \"٤ برجر و ٥ ساندويتش و ٣ ذرة\"\n"
-            "Output:\n"
-            "{\n"
-            "  \"items\": [\n"
-            "    {\"type\": \"generic\", \"category\": \"burger\", \"qty\": 4},\n"
-            "    {\"type\": \"generic\", \"category\": \"sandwich\", \"qty\": 5},\n"
-            "    {\"type\": \"specific\", \"name\": \"Sweet Corn\", \"qty\": 3, \"category\": \"snacks_sides\"}\n"
-            "  ]\n"
-            "}\n"
-            "✅ Correct: Arabic numbers converted, THREE items\n"
-            "\n"
-            "═══════════════════════════════════════════════════════════\n\n"
-            "OUTPUT FORMAT (JSON ONLY - NO EXPLANATIONS!):\n"
-            "{\n"
-            "  \"items\": [\n"
-            "    {\"type\": \"generic\", \"category\": \"sandwich\", \"qty\": 5},\n"
-            "    {\"type\": \"specific\", \"name\": \"Coffee\", \"qty\": 3, \"category\": \"drinks\"},\n"
-            "    {\"type\": \"specific\", \"name\": \"Beef Burger\", \"qty\": 1, \"spicy\": \"spicy\", \"category\": \"burgers_meals\"}\n"
-            "  ]\n"
-            "}\n\n"
-            "VALID category VALUES:\n"
-            "- burgers_meals, sandwiches, drinks, meals, juices, snacks_sides\n"
-            "\n"
-            "VALIDATION CHECKLIST (verify before returning):\n"
-            "✓ Count items in input (by 'and' or 'و') → output must have same count\n"
-            "✓ If input contains 'wrap' or 'wraps' → output MUST include sandwich category\n"
-            "✓ All quantities preserved exactly\n"
-            "✓ Arabic numbers converted to English\n"
-            "✓ Valid JSON syntax\n"
-            "\n"
-            "Return ONLY the JSON object. No explanations, no comments."
-        )
-        
-        res = client.chat.completions.create(
-            model=LLM_MODEL,  # Using configured LLM provider
-            messages=[
+        raw = llm_complete(
+            "order_parse",
+            [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": msg}
             ],
             temperature=0.1,  # ✅ Lower temp for more consistent extraction
             max_tokens=500,   # ✅ Increased for complex orders
+            cacheable=True,
         )
-        
-        raw = (res.choices[0].message.content or "").strip()
         print("LLM order parse raw:", raw[:200])
         
         first = raw.find("{")
@@ -4084,84 +3542,7 @@ def parse_intelligent_order(msg: str, lang: str = "en") -> dict:
         # ✅ DEBUG: Log extracted items before cleaning
         print("LLM extracted items (before normalization):", items)
         
-        # Validate and normalize
-        cleaned = []
-        for it in items:
-            item_type = (it.get("type") or "").strip().lower()
-            qty = max(int(it.get("qty") or 1), 1)
-            
-            if item_type == "generic":
-                category = (it.get("category") or "").strip().lower()
-                
-                # Normalize category names
-                if category in ["burger", "burgers", "برجر"]:
-                    category = "burger"
-                elif category in ["sandwich", "sandwiches", "wrap", "wraps", "tortilla", "tortillas", "ساندويتش"]:
-                    category = "sandwich"  # ✅ CRITICAL: wraps → sandwich
-                elif category in ["meal", "meals", "وجبة"]:
-                    category = "meals"
-                elif category in ["juice", "juices", "عصير"]:
-                    category = "juices"
-                elif category in ["drink", "drinks", "beverage", "مشروب"]:
-                    category = "drinks"
-                elif category in ["snack", "snacks", "side", "sides", "snacks_sides"]:
-                    category = "snacks_sides"
-                
-                cleaned.append({
-                    "type": "generic",
-                    "category": category,
-                    "qty": qty
-                })
-            
-            elif item_type == "specific":
-                name = str(it.get("name") or "").strip()
-                if not name:
-                    continue
-                
-                # ✅ SMART NAME MAPPING: Handle common user terms → actual menu items
-                # This helps when LLM extracts generic terms that need to map to specific menu items
-                name_lower = name.lower()
-                
-                # Popcorn variants → Chicken Popcorn
-                if name_lower in ["popcorn", "pop corn", "فشار", "بوفك"]:
-                    name = "Chicken Popcorn"
-                
-                # Tortilla variants → look for closest match
-                if "tortilla" in name_lower or "تورتيلا" in name_lower or "تورتيا" in name_lower:
-                    # If it mentions chicken/دجاج → Tortilla Chicken
-                    if "chicken" in name_lower or "دجاج" in name_lower:
-                        if "jambo" in name_lower or "جامبو" in name_lower:
-                            name = "Tortilla Chicken Jambo"
-                        else:
-                            name = "Tortilla Chicken Jambo"  # Default to Jambo
-                    # If it mentions zinger/زنجر
-                    elif "zinger" in name_lower or "زنجر" in name_lower:
-                        if "spicy" in name_lower or "حار" in name_lower:
-                            name = "Spicy Tortilla Zinger"
-                        else:
-                            name = "Regular Tortilla Zinger"
-                
-                # Shashukah variants
-                if "shashukah" in name_lower or "شكشوكة" in name_lower or "shakshuka" in name_lower:
-                    name = "Sandwiches Shashukah"
-                
-                # Kabab variants
-                if ("kabab" in name_lower or "كباب" in name_lower) and ("chicken" in name_lower or "دجاج" in name_lower):
-                    if "jambo" in name_lower or "جامبو" in name_lower:
-                        name = "Kabab Chicken Jambo"
-                    else:
-                        name = "Kabab Chicken Jambo"  # Default to Jambo
-                
-                category = (it.get("category") or "").strip().lower()
-                spicy = (it.get("spicy") or "any").strip().lower()
-                
-                cleaned.append({
-                    "type": "specific",
-                    "name": name,
-                    "qty": qty,
-                    "category": category,
-                    "spicy": spicy
-                })
+        cleaned = clean_parsed_items(items)
         
         # ✅ DEBUG: Log cleaned items
         print("LLM cleaned items:", cleaned)
@@ -4172,6 +3553,444 @@ def parse_intelligent_order(msg: str, lang: str = "en") -> dict:
         return {"items": []}
 
 
+def order_parse_prompt() -> str:
+    """System prompt of the LLM order parser (built once per menu snapshot)."""
+    return active_snapshot().derived("order_parse_prompt", _order_parse_prompt)
+
+
+def _order_parse_prompt(snap) -> str:
+    menu_context = _order_menu_context(snap)
+    
+    return (
+        "You are an intelligent restaurant order parser for JOANA Fast Food.\n\n"
+        "MENU BY CATEGORY:\n"
+        f"{menu_context}\n\n"
+        "TASK: Parse customer's natural language order (may have typos, ARABIC or ENGLISH or mixed).\n\n"
+        "⚠️ CRITICAL RULES (FOLLOW EXACTLY - DO NOT SKIP ANY ITEMS!):\n"
+        "\n"
+        "RULE 1 - WRAPS = SANDWICHES (MANDATORY!):\n"
+        "When user says: wrap, wraps, tortilla, tortillas → MUST use category=\"sandwich\"\n"
+        "⚠️ EXCEPTION: If the user names a SPECIFIC wrap (e.g. 'Tortilla Chicken'), extract it as 'specific' item.\n"
+        "   DO NOT extract a generic 'sandwich' in addition to the specific wrap unless the user said 'and a sandwich'.\n"
+        "   Example: '1 Tortilla Chicken' → 1 Specific Item (NO generic sandwich).\n"
+        "   Example: '2 wraps' → 2 Generic Sandwich.\n"
+        "\n"
+        "RULE 2 - SIDES/SNACKS:\n"
+        "'sides', 'snacks', 'side' → category=\"snacks_sides\"\n"
+        "\n"
+        "RULE 3 - ARABIC SUPPORT & TYPO TOLERANCE:\n"
+        "⚠️ Be EXTREMELY tolerant of Arabic spelling variations!\n"
+        "Convert Arabic numerals (١٢٣٤٥) to English (12345)\n"
+        "MATCH similar Arabic words even with slight differences:\n"
+        "  - 'تورتيلا' should match 'تورتيا' (tortilla variations)\n"
+        "  - 'بوفك' should match 'فشار' (popcorn variations)\n"
+        "  - 'برغر' should match 'برجر' (burger variations)\n"
+        "Generic categories (English OR Arabic):\n"
+        "  - burger/burgers/برجر/برغر → category=\"burger\"\n"
+        "  - sandwich/ساندويتش/wrap/wraps/تورتيلا/تورتيا → category=\"sandwich\"\n"
+        "  - drink/مشروب/juice/عصير/meal/وجبة → respective categories\n"
+        "⚠️ When user mentions Arabic item name, find closest match in menu context above!\n"
+        "Example: 'ساندويتش شكشوكة' → match 'Sandwiches Shashukah'\n"
+        "\n"
+        "RULE 4 - SPECIFIC ITEMS:\n"
+        "If user mentions specific item name → type=\"specific\"\n"
+        "⚠️ SMART MAPPING (use EXACT menu names):\n"
+        "  - 'فشار' OR 'popcorn' OR 'بوفك' → \"Chicken Popcorn\" (NOT just \"Popcorn\")\n"
+        "  - 'تورتيلا دجاج' OR 'tortilla chicken' → \"Tortilla Chicken Jambo\"\n"
+        "  - 'شكشوكة' OR 'shashukah' → \"Sandwiches Shashukah\"\n"
+        "  - 'كباب دجاج' OR 'kabab chicken' → \"Kabab Chicken Jambo\"\n"
+        "Examples: 'chicken'/'دجاج' → \"Chicken Burger\", 'sweet corn'/'ذرة حلوة' → \"Sweet Corn\"\n"
+        "Coffee/Tea/Water/Pepsi are SPECIFIC items under drinks category\n"
+        "\n"
+        "RULE 5 - QUANTITY INTELLIGENCE:\n"
+        "⚠️ ALWAYS extract quantity when explicitly mentioned!\n"
+        "'2 burgers' → qty=2, '5 coffee' → qty=5, '10 drinks' → qty=10\n"
+        "If NO quantity mentioned, use qty=1 as default\n"
+        "Be precise with numbers: '10 burgers and 5 wraps' → burger qty=10, sandwich qty=5\n"
+        "\n"
+        "RULE 6 - MENU HIERARCHY AWARENESS:\n"
+        "⚠️ Coffee is a SPECIFIC drink, not a separate category!\n"
+        "When user says '3 coffees and 2 drinks':\n"
+        "  → Extract Coffee as specific item (qty=3, category=drinks)\n"
+        "  → Extract drinks as generic (qty=2) for OTHER drinks (NOT coffee again!)\n"
+        "This prevents duplicate counting of the same item.\n"
+        "\n"
+        "RULE 7 - EXTRACT ALL ITEMS:\n"
+        "Multi-item orders: Extract EVERY item mentioned (DO NOT DROP ANY!)\n"
+        "\n"
+        "RULE 8 - PRESERVE QUANTITIES:\n"
+        "Keep exact quantities from user input\n"
+        "\n"
+        "RULE 9 - SPICE PREFERENCES:\n"
+        "Detect: spicy/non-spicy/حار/بدون حار for burgers\n"
+        "\n"
+        "═══════════════════════════════════════════════════════════\n"
+        "FEW-SHOT EXAMPLES (FOLLOW THESE PATTERNS EXACTLY!):\n"
+        "═══════════════════════════════════════════════════════════\n"
+        "\n"
+        "EXAMPLE 1:\n"
+        "Input: \"3 burgers and 2 wraps and 4 coffee\"\n"
+        "Output:\n"
+        "{\n"
+        "  \"items\": [\n"
+        "    {\"type\": \"generic\", \"category\": \"burger\", \"qty\": 3},\n"
+        "    {\"type\": \"generic\", \"category\": \"sandwich\", \"qty\": 2},\n"
+        "    {\"type\": \"specific\", \"name\": \"Coffee\", \"qty\": 4, \"category\": \"drinks\"}\n"
+        "  ]\n"
+        "}\n"
+        "✅ Correct: THREE items extracted (wraps → sandwich!)\n"
+        "\n"
+        "EXAMPLE 2:\n"
+        "Input: \"10 burgers and 5 wraps and 3 coffee\"\n"
+        "Output:\n"
+        "{\n"
+        "  \"items\": [\n"
+        "    {\"type\": \"generic\", \"category\": \"burger\", \"qty\": 10},\n"
+        "    {\"type\": \"generic\", \"category\": \"sandwich\", \"qty\": 5},\n"
+        "    {\"type\": \"specific\", \"name\": \"Coffee\", \"qty\": 3, \"category\": \"drinks\"}\n"
+        "  ]\n"
+        "}\n"
+        "✅ Correct: THREE items, wraps → sandwich with qty=5\n"
+        "\n"
+        "EXAMPLE 3 (Coffee + Drinks hierarchy):\n"
+        "Input: \"2 burgers, 3 coffees, and 2 drinks\"\n"
+        "Output:\n"
+        "{\n"
+        "  \"items\": [\n"
+        "    {\"type\": \"generic\", \"category\": \"burger\", \"qty\": 2},\n"
+        "    {\"type\": \"specific\", \"name\": \"Coffee\", \"qty\": 3, \"category\": \"drinks\"},\n"
+        "    {\"type\": \"generic\", \"category\": \"drinks\", \"qty\": 2}\n"
+        "  ]\n"
+        "}\n"
+        "✅ Correct: Coffee is specific, drinks is generic (for selecting OTHER drinks)\n"
+        "\n"
+        "EXAMPLE 4 (Natural language quantities):\n"
+        "Input: \"a burger, few coffees, and some water\"\n"
+        "Output:\n"
+        "{\n"
+        "  \"items\": [\n"
+        "    {\"type\": \"generic\", \"category\": \"burger\", \"qty\": 1},\n"
+        "    {\"type\": \"specific\", \"name\": \"Coffee\", \"qty\": 3, \"category\": \"drinks\"},\n"
+        "    {\"type\": \"specific\", \"name\": \"Water\", \"qty\": 3, \"category\": \"drinks\"}\n"
+        "  ]\n"
+        "}\n"
+        "✅ Correct: 'a'=1, 'few'=3, 'some'=3 (smart quantity detection)\n"
+        "\n"
+        "EXAMPLE 5 (Arabic with typo tolerance):\n"
+        "Input: \"١ تورتيلا دجاج جامبو\"\n"
+        "Output:\n"
+        "{\n"
+        "  \"items\": [\n"
+        "    {\"type\": \"specific\", \"name\": \"Tortilla Chicken Jambo\", \"qty\": 1, \"category\": \"burgers_meals\"}\n"
+        "  ]\n"
+        "}\n"
+        "✅ Correct: Matched 'تورتيلا' (typo) to 'تورتيا' in menu, converted ١ to 1\n"
+        "\n"
+        "EXAMPLE 6 (Arabic multi-item):\n"
+        "Input: \"٤ ساندويتش شكشوكة و ٥ قهوة\"\n"
+        "Output:\n"
+        "{\n"
+        "  \"items\": [\n"
+        "    {\"type\": \"specific\", \"name\": \"Sandwiches Shashukah\", \"qty\": 4, \"category\": \"sandwiches\"},\n"
+        "    {\"type\": \"specific\", \"name\": \"Coffee\", \"qty\": 5, \"category\": \"drinks\"}\n"
+        "  ]\n"
+        "}\n"
+        "✅ Correct: Arabic numbers converted, TWO items extracted\n"
+        "\n"
+        "EXAMPLE 7 (Popcorn mapping):\n"
+        "Input: \"٦ فشار و ٨ بطاطس مقلية\"\n"
+        "Output:\n"
+        "{\n"
+        "  \"items\": [\n"
+        "    {\"type\": \"specific\", \"name\": \"Chicken Popcorn\", \"qty\": 6, \"category\": \"snacks_sides\"},\n"
+        "    {\"type\": \"specific\", \"name\": \"French Fries\", \"qty\": 8, \"category\": \"snacks_sides\"}\n"
+        "  ]\n"
+        "}\n"
+        "✅ Correct: 'فشار' (popcorn) → \"Chicken Popcorn\" (actual menu item)\n"
+        "\n"
+        "EXAMPLE 8 (Typos and informal):\n"
+        "Input: \"2 burgurs and cofee plz\"\n"
+        "Output:\n"
+        "{\n"
+        "  \"items\": [\n"
+        "    {\"type\": \"generic\", \"category\": \"burger\", \"qty\": 2},\n"
+        "    {\"type\": \"specific\", \"name\": \"Coffee\", \"qty\": 1, \"category\": \"drinks\"}\n"
+        "  ]\n"
+        "}\n"
+        "✅ Correct: Fixed typos (burgurs→burger, cofee→coffee), ignored 'plz'\n"
+        "\n"
+        "EXAMPLE 8:\n"
+        "Input: \"2 burgers, 3 coffees, and 2 drinks\"\n"
+        "Output:\n"
+        "{\n"
+        "  \"items\": [\n"
+        "    {\"type\": \"generic\", \"category\": \"burger\", \"qty\": 2},\n"
+        "    {\"type\": \"specific\", \"name\": \"Coffee\", \"qty\": 3, \"category\": \"drinks\"},\n"
+        "    {\"type\": \"generic\", \"category\": \"drinks\", \"qty\": 2}\n"
+        "  ]\n"
+        "}\n"
+        "✅ Correct: Coffee is specific, drinks is generic (for selecting OTHER drinks)\n"
+        "\n"
+        "EXAMPLE 9:\n"
+        "Input: \"5 burgers and 5 sides\"\n"
+        "Output:\n"
+        "{\n"
+        "  \"items\": [\n"
+        "    {\"type\": \"generic\", \"category\": \"burger\", \"qty\": 5},\n"
+        "    {\"type\": \"generic\", \"category\": \"snacks_sides\", \"qty\": 5}\n"
+        "  ]\n"
+        "}\n"
+        "✅ Correct: TWO items extracted\n"
+        "\n"
+        "EXAMPLE 10:\n"
+        "Input: \"2 wraps\"\n"
+        "Output:\n"
+        "{\n"
+        "  \"items\": [\n"
+        "    {\"type\": \"generic\", \"category\": \"sandwich\", \"qty\": 2}\n"
+        "  ]\n"
+        "}\n"
+        "✅ Correct: wraps → sandwich category\n"
+        "\n"
+        "EXAMPLE 11 (Specific Sides):\n"
+        "Input: \"One sweet potato and one sweet corn\"\n"
+        "Output:\n"
+        "{\n"
+        "  \"items\": [\n"
+        "    {\"type\": \"specific\", \"name\": \"Sweet Potato\", \"qty\": 1, \"category\": \"snacks_sides\"},\n"
+        "    {\"type\": \"specific\", \"name\": \"Sweet Corn\", \"qty\": 1, \"category\": \"snacks_sides\"}\n"
+        "  ]\n"
+        "}\n"
+        "✅ Correct: Specific sides matched exactly\n"
+        "\n"
+        "EXAMPLE 12 (Specific Wraps - NO GENERIC):\n"
+        "Input: \"One spicy tortilla and one regular\"\n"
+        "Output:\n"
+        "{\n"
+        "  \"items\": [\n"
+        "    {\"type\": \"specific\", \"name\": \"Tortilla Chicken Jambo\", \"qty\": 1, \"category\": \"sandwiches\", \"spicy\": \"spicy\"},\n"
+        "    {\"type\": \"specific\", \"name\": \"Tortilla Chicken Jambo\", \"qty\": 1, \"category\": \"sandwiches\", \"spicy\": \"non-spicy\"}\n"
+        "  ]\n"
+        "}\n"
+        "✅ Correct: Specific items only. NO generic 'sandwich' item added.\n"
+        "\n"
+        "EXAMPLE 11 (Arabic):\n"
+        "Input: \"٤ برجر و ٥ ساندويتش و ٣ ذرة\"\n"
+        "Output:\n"
+        "{\n"
+        "  \"items\": [\n"
+        "    {\"type\": \"generic\", \"category\": \"burger\", \"qty\": 4},\n"
+        "    {\"type\": \"generic\", \"category\": \"sandwich\", \"qty\": 5},\n"
+        "    {\"type\": \"specific\", \"name\": \"Sweet Corn\", \"qty\": 3, \"category\": \"snacks_sides\"}\n"
+        "  ]\n"
+        "}\n"
+        "✅ Correct: Arabic numbers converted, THREE items\n"
+        "\n"
+        "═══════════════════════════════════════════════════════════\n\n"
+        "OUTPUT FORMAT (JSON ONLY - NO EXPLANATIONS!):\n"
+        "{\n"
+        "  \"items\": [\n"
+        "    {\"type\": \"generic\", \"category\": \"sandwich\", \"qty\": 5},\n"
+        "    {\"type\": \"specific\", \"name\": \"Coffee\", \"qty\": 3, \"category\": \"drinks\"},\n"
+        "    {\"type\": \"specific\", \"name\": \"Beef Burger\", \"qty\": 1, \"spicy\": \"spicy\", \"category\": \"burgers_meals\"}\n"
+        "  ]\n"
+        "}\n\n"
+        "VALID category VALUES:\n"
+        "- burgers_meals, sandwiches, drinks, meals, juices, snacks_sides\n"
+        "\n"
+        "VALIDATION CHECKLIST (verify before returning):\n"
+        "✓ Count items in input (by 'and' or 'و') → output must have same count\n"
+        "✓ If input contains 'wrap' or 'wraps' → output MUST include sandwich category\n"
+        "✓ All quantities preserved exactly\n"
+        "✓ Arabic numbers converted to English\n"
+        "✓ Valid JSON syntax\n"
+        "\n"
+        "Return ONLY the JSON object. No explanations, no comments."
+    )
+
+
+def _order_menu_context(snap) -> str:
+    """Menu by category, English (Arabic) names, as given to the order parsers."""
+    # Build comprehensive menu context with categories (INCLUDING Arabic names!)
+    menu_by_category = {}
+    for key, info in snap.menu.items():
+        cat = (info.get("category") or "").strip().lower()
+        name_en = (info.get("name_en") or key).strip()
+        name_ar = (info.get("name_ar") or "").strip()
+        
+        # ✅ Include BOTH English and Arabic names for better matching
+        display_name = f"{name_en} ({name_ar})" if name_ar else name_en
+        
+        if cat not in menu_by_category:
+            menu_by_category[cat] = []
+        menu_by_category[cat].append(display_name)
+    
+    return "\n".join([
+        f"- {cat}: {', '.join(items[:15])}"
+        for cat, items in menu_by_category.items() if items
+    ])
+
+
+def clean_parsed_items(items: list) -> list:
+    """Validate and normalize LLM-extracted items (category aliases, menu name mapping)."""
+    cleaned = []
+    for it in items:
+        item_type = (it.get("type") or "").strip().lower()
+        qty = max(int(it.get("qty") or 1), 1)
+        
+        if item_type == "generic":
+            category = (it.get("category") or "").strip().lower()
+            
+            # Normalize category names
+            if category in ["burger", "burgers", "برجر"]:
+                category = "burger"
+            elif category in ["sandwich", "sandwiches", "wrap", "wraps", "tortilla", "tortillas", "ساندويتش"]:
+                category = "sandwich"  # ✅ CRITICAL: wraps → sandwich
+            elif category in ["meal", "meals", "وجبة"]:
+                category = "meals"
+            elif category in ["juice", "juices", "عصير"]:
+                category = "juices"
+            elif category in ["drink", "drinks", "beverage", "مشروب"]:
+                category = "drinks"
+            elif category in ["snack", "snacks", "side", "sides", "snacks_sides"]:
+                category = "snacks_sides"
+            
+            cleaned.append({
+                "type": "generic",
+                "category": category,
+                "qty": qty
+            })
+        
+        elif item_type == "specific":
+            name = str(it.get("name") or "").strip()
+            if not name:
+                continue
+            
+            # ✅ SMART NAME MAPPING: Handle common user terms → actual menu items
+            # This helps when LLM extracts generic terms that need to map to specific menu items
+            name_lower = name.lower()
+            
+            # Popcorn variants → Chicken Popcorn
+            if name_lower in ["popcorn", "pop corn", "فشار", "بوفك"]:
+                name = "Chicken Popcorn"
+            
+            # Tortilla variants → look for closest match
+            if "tortilla" in name_lower or "تورتيلا" in name_lower or "تورتيا" in name_lower:
+                # If it mentions chicken/دجاج → Tortilla Chicken
+                if "chicken" in name_lower or "دجاج" in name_lower:
+                    if "jambo" in name_lower or "جامبو" in name_lower:
+                        name = "Tortilla Chicken Jambo"
+                    else:
+                        name = "Tortilla Chicken Jambo"  # Default to Jambo
+                # If it mentions zinger/زنجر
+                elif "zinger" in name_lower or "زنجر" in name_lower:
+                    if "spicy" in name_lower or "حار" in name_lower:
+                        name = "Spicy Tortilla Zinger"
+                    else:
+                        name = "Regular Tortilla Zinger"
+            
+            # Shashukah variants
+            if "shashukah" in name_lower or "شكشوكة" in name_lower or "shakshuka" in name_lower:
+                name = "Sandwiches Shashukah"
+            
+            # Kabab variants
+            if ("kabab" in name_lower or "كباب" in name_lower) and ("chicken" in name_lower or "دجاج" in name_lower):
+                if "jambo" in name_lower or "جامبو" in name_lower:
+                    name = "Kabab Chicken Jambo"
+                else:
+                    name = "Kabab Chicken Jambo"  # Default to Jambo
+            
+            category = (it.get("category") or "").strip().lower()
+            spicy = (it.get("spicy") or "any").strip().lower()
+            
+            cleaned.append({
+                "type": "specific",
+                "name": name,
+                "qty": qty,
+                "category": category,
+                "spicy": spicy
+            })
+    return cleaned
+
+
+# =========================================================
+# ✅ ONE-SHOT MESSAGE UNDERSTANDING
+#    Intent, relevance, Arabic correction and order items in one
+#    JSON-schema-constrained call; every consumer falls back to its
+#    own prompt when this returns None
+# =========================================================
+UNDERSTAND_PROMPT = (
+    "You are the message understanding step of the JOANA Fast Food ordering chatbot.\n"
+    "Read ONE customer message (Arabic, English or mixed, may have typos) and return ONE JSON object.\n\n"
+    "MENU BY CATEGORY:\n"
+    "{menu}\n\n"
+    "FIELDS:\n"
+    "- intent: \"food_order\" if the message orders or names food/drinks (on the menu or not, with or without quantities),\n"
+    "  \"menu_question\" for questions about menu, prices, hours, branches, delivery or payment,\n"
+    "  \"greeting\" for greetings, thanks and small talk, \"other\" for anything else.\n"
+    "- is_irrelevant: true ONLY for topics unrelated to the restaurant (technical problems, weather, news, politics,\n"
+    "  health, career, harmful or illegal requests). Greetings, thanks and food/restaurant questions are relevant.\n"
+    "- polite_response: if irrelevant, a very sweet, warm message in the customer's language that kindly says you\n"
+    "  can only help with food orders and invites them to explore the menu (use 😊 🍔 ☕); otherwise null.\n"
+    "- corrected_text: the message with ONLY spelling mistakes fixed, using the menu spelling for menu items\n"
+    "  ('تورتيلا' → 'تورتيا', 'برغر' → 'برجر', 'قهوه' → 'قهوة', 'فشار' → 'بوفك دجاج'). Keep every word and number\n"
+    "  as written, add nothing, never comment on availability.\n"
+    "- items: every item ordered, in order (empty unless intent is food_order):\n"
+    "  - specific menu item → {{\"type\": \"specific\", \"name\": exact English menu name, \"category\": its category,\n"
+    "    \"qty\": n, \"spicy\": \"spicy\" | \"non-spicy\" | \"any\"}}\n"
+    "  - category only ('2 burgers', '3 drinks') → {{\"type\": \"generic\", \"name\": null, \"category\": one of\n"
+    "    burger, sandwich, meals, juices, drinks, snacks_sides, \"qty\": n, \"spicy\": \"any\"}}\n"
+    "  - wraps/tortillas are sandwiches; sides/snacks are snacks_sides; coffee, tea, water and pepsi are specific drinks\n"
+    "  - qty: the quantity as written (Arabic numerals to digits, 'a'=1, 'few'/'some'=3), 1 if none\n\n"
+    "Return ONLY the JSON object."
+)
+
+
+def understand_prompt() -> str:
+    """UNDERSTAND_PROMPT with the menu filled in (built once per menu snapshot)."""
+    return active_snapshot().derived(
+        "understand_prompt", lambda snap: UNDERSTAND_PROMPT.format(menu=_order_menu_context(snap))
+    )
+
+
+@per_message
+def understand_message(msg: str):
+    """Intent, relevance, corrected text and order items of one message, or None.
+
+    One LLM call per distinct text per inbound message: the result is also
+    remembered for the corrected text, which is what the later steps see.
+    """
+    if not LLM_UNDERSTAND or not client or not msg or not MENU:
+        return None
+    try:
+        raw = llm_complete(
+            "understand",
+            [
+                {"role": "system", "content": understand_prompt()},
+                {"role": "user", "content": msg}
+            ],
+            temperature=0,
+            max_tokens=600,
+            response_format=understanding.response_format(LLM_PROVIDER),
+        )
+    except Exception as e:
+        print(f"❌ Message understanding error: {repr(e)}")
+        return None
+    u = understanding.parse(raw, msg)
+    if u is None:
+        print(f"⚠ Message understanding unusable: {raw[:200]!r}")
+        return None
+    if has_arabic(msg):
+        u["corrected_text"] = checked_arabic_correction(msg, u["corrected_text"])
+    else:
+        u["corrected_text"] = msg
+    u["items"] = clean_parsed_items(u["items"])
+    print(f"🤖 Message understanding: intent={u['intent']} irrelevant={u['is_irrelevant']} items={u['items']}")
+    if u["corrected_text"] != msg:
+        message_analysis.remember(understand_message, u["corrected_text"], u)
+    return u
+
+
 def extract_items_with_llm(msg: str, lang: str = "en") -> list:
     """Legacy wrapper - converts new format to old format for compatibility"""
     result = parse_intelligent_order(msg, lang)
@@ -4345,7 +4164,12 @@ def transcribe_audio_from_cloud(media_id: str, priority_lang=None) -> str:
 # DB: CREATE ORDER + ITEMS
 # =========================================================
 def create_order_in_db(customer_id: int, state: dict, lang: str, branch_name: str | None = None) -> int | None:
-    if customer_id is None or not SUPABASE_REST_URL:
+    if not SUPABASE_REST_URL:
+        return None
+    if customer_id is None:
+        # WhatsApp: the webhook's customer upsert runs on the task pool
+        customer_id = task_graph.result("customer")
+    if customer_id is None:
         return None
     order_items_state = state.get("order") or []
     total = state.get("total", 0)
@@ -4573,6 +4397,78 @@ def cron_send_feedback_reminders():
     return "no pending", 200
 
 
+def admin_only(view):
+    """/admin/* guard: the X-Admin-Token header must equal MENU_ADMIN_TOKEN (never a query arg)."""
+    @wraps(view)
+    def guarded(*args, **kwargs):
+        token = request.headers.get("X-Admin-Token") or ""
+        if not MENU_ADMIN_TOKEN or not hmac.compare_digest(token.encode(), MENU_ADMIN_TOKEN.encode()):
+            return "Forbidden", 403
+        return view(*args, **kwargs)
+    return guarded
+
+
+@app.route("/admin/menu/reload", methods=["POST"])
+@admin_only
+def admin_menu_reload():
+    """Validate + rebuild the menu from data/*.xlsx now (admin only).
+
+    Other workers pick the new version up through their file watcher.
+    """
+    store = MENU_REGISTRY.store_for(request.args.get("tenant"))
+    old_version = store.current().version
+    snap = store.reload(force=request.args.get("force") == "1")
+    use_menu_snapshot(snap=snap)
+    ok = store.last_error is None
+    return jsonify({
+        "ok": ok,
+        "menu_version": snap.version,
+        "previous_version": old_version,
+        "items": len(snap.menu),
+        "branches": len(snap.branches),
+        "error": store.last_error,
+    }), (200 if ok else 422)
+
+
+@app.route("/admin/menu/version")
+@admin_only
+def admin_menu_version():
+    snap = use_menu_snapshot(request.args.get("tenant"))
+    return jsonify({
+        "menu_version": snap.version,
+        "digest": snap.digest,
+        "built_at": snap.built_at,
+        "tenants_loaded": MENU_REGISTRY.loaded(),
+    })
+
+
+@app.route("/admin/llm-cache")
+@admin_only
+def admin_llm_cache():
+    """LLM cache hit/miss counters per call site (admin only; ?clear=1 empties it)."""
+    if request.args.get("clear") == "1":
+        LLM_CACHE.clear()
+    return jsonify(LLM_CACHE.metrics())
+
+
+@app.before_request
+def reset_menu_tenant():
+    # Worker threads are reused between requests; start each one on the default number and
+    # pinned to the default menu's current snapshot (chat/webhook re-pin to the tenant's),
+    # so a reload mid-request never mixes two menu versions
+    activate(get_store().current())
+    WA_PHONE_NUMBER_ID.set(None)
+    message_analysis.begin()
+    task_graph.begin()
+
+
+@app.after_request
+def add_menu_version_header(resp):
+    # Lets ops check that every worker converged on the same menu
+    resp.headers["X-Menu-Version"] = str(active_snapshot().version)
+    return resp
+
+
 # =========================================================
 # BACKGROUND FEEDBACK SCHEDULER
 # =========================================================
@@ -4595,8 +4491,58 @@ def start_feedback_scheduler():
     thread.start()
 
 
-# Start the background scheduler when app initializes
-start_feedback_scheduler()
+_SCHEDULER_LOCK = None
+
+
+def _own_scheduler_lock() -> bool:
+    """True in exactly one process per machine (non-blocking flock, held for the process lifetime)."""
+    global _SCHEDULER_LOCK
+    if _SCHEDULER_LOCK is not None:
+        return True
+    try:
+        import fcntl
+    except ImportError:
+        return True  # no flock (Windows dev box): single process anyway
+    f = open(os.path.join(tempfile.gettempdir(), "joana-feedback-scheduler.lock"), "a")
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        return False
+    _SCHEDULER_LOCK = f
+    return True
+
+
+def start_background_threads():
+    """Per-process threads: the menu watcher in every worker, the feedback scheduler in one.
+
+    Threads do not survive fork, so under gunicorn's preload_app this runs from
+    the post_fork hook (gunicorn.conf.py) instead of at import.
+    """
+    # Pick up Menu.xlsx / Branches.xlsx edits in the background; requests keep the old
+    # snapshot until the new one is fully built.
+    MENU_STORE.start_watcher(MENU_WATCH_INTERVAL)
+    startup.prefetch(requests, client)
+    if _own_scheduler_lock():
+        print(f"🔄 Feedback scheduler runs in pid {os.getpid()}")
+        start_feedback_scheduler()
+
+
+def warm_up():
+    """Build every read-only structure up front: menu snapshot + index pages, intent tables.
+
+    Called in the gunicorn master before forking, so workers share these pages
+    copy-on-write instead of each building its own.
+    """
+    t0 = time.perf_counter()
+    MENU_STORE.current().index.warm()
+    nlp_utils.warm_up()
+    print(f"✅ Warm-up done in {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+
+# gunicorn.conf.py sets APP_PRELOAD=1 and starts the threads after fork instead
+if os.getenv("APP_PRELOAD") != "1":
+    start_background_threads()
 
 # =========================================================
 # WHATSAPP CLOUD WEBHOOK
@@ -4621,6 +4567,12 @@ def whatsapp_webhook():
         return "ok", 200
     value = changes[0].get("value") or {}
 
+    # The business number the message was sent to selects the brand/branch menu
+    tenant_id = (value.get("metadata") or {}).get("phone_number_id")
+    if tenant_id:
+        WA_PHONE_NUMBER_ID.set(str(tenant_id))
+    use_menu_snapshot(tenant_id)
+
     if value.get("statuses"):
         return "ok", 200
 
@@ -4696,7 +4648,7 @@ def whatsapp_webhook():
         if not txt:
             return False
         t = txt.strip()
-        return _normalize_digits(t).replace(".", "").isdigit()
+        return arabic_text.clean(t).replace(".", "").isdigit()
 
     lang_probe_text = user_text
     if from_button:
@@ -4710,34 +4662,45 @@ def whatsapp_webhook():
         elif is_number_only(lang_probe_text) and stored_lang in ("en", "ar"):
             lang = stored_lang
         else:
-            lang = detect_language(lang_probe_text or "") or "en"
+            lang = analyze(lang_probe_text).language or "en"
+
+    # Customer upsert (GET + PATCH) overlaps with correction and parsing;
+    # joined only where the id is needed (message logs, order creation)
+    tasks = task_graph.current()
+    tasks.start("customer", upsert_customer, user_number, whatsapp_name=wa_name, lang=lang)
 
     # ✅ AI-POWERED ARABIC TYPO CORRECTION (WhatsApp)
     # Apply intelligent correction AFTER language detection, BEFORE processing
+    # (chat() calls it again on the same text: a memo hit in this request's scope)
     if lang == "ar" and user_text and not from_button:
         user_text = correct_arabic_typos_with_ai(user_text)
+        mark_corrected(user_text.strip())
 
     ctx["lang"] = lang
     WHATSAPP_SESSIONS[user_number] = ctx
 
-    # Customer + message log
-    customer_id = upsert_customer(user_number, whatsapp_name=wa_name, lang=lang)
-    save_message(
-        customer_id=customer_id,
-        order_id=None,
-        direction="user_to_bot",
-        message_type="audio" if is_voice else "text",
-        text=(button_id if from_button else user_text),
-        audio_url=None,
-        is_voice=is_voice,
-        language=lang,
-        raw_payload=data,
+    # Message log, once the customer id is known
+    tasks.start(
+        "log_in",
+        lambda text=(button_id if from_button else user_text): save_message(
+            customer_id=tasks.result("customer"),
+            order_id=None,
+            direction="user_to_bot",
+            message_type="audio" if is_voice else "text",
+            text=text,
+            audio_url=None,
+            is_voice=is_voice,
+            language=lang,
+            raw_payload=data,
+        ),
+        after=("customer",),
     )
 
     # ✅ ECHO TRANSCRIPTION TO USER (Requested Feature)
+    # Sent from the pool; later sends of this message wait for it (task_graph.before_send)
     if is_voice:
         echo_msg = f"🎤 You said: {user_text}" if lang != "ar" else f"🎤 قلت: {user_text}"
-        send_whatsapp_text(user_number, echo_msg)
+        tasks.start("echo", send_whatsapp_text, user_number, echo_msg, outbound=True)
 
     # ✅ NEW ORDER REQUEST - Check FIRST before any other processing
     # This catches "I want to order more", "new order", etc. at ANY stage
@@ -4998,7 +4961,7 @@ def whatsapp_webhook():
     # This catches requests like "1 pizza", "2 pasta", etc. BEFORE greeting logic
     if not from_button and is_first_interaction and user_text and len(user_text.strip()) > 2:
         # Quick check: has numbers or food-related words
-        has_numbers = any(char.isdigit() for char in user_text)
+        has_numbers = has_explicit_quantity(user_text)
         # Enhanced greeting detection - includes "how are you" variations
         common_greetings = [
             "hi", "hello", "hey", "hii", "hiii", "salam", "مرحبا", "السلام", "اهلا", "هلا",
@@ -5021,13 +4984,16 @@ def whatsapp_webhook():
                     f"Respond with ONLY one word: FOOD_ORDER or GREETING"
                 )
                 
-                classify_res = client.chat.completions.create(
-                    model=LLM_MODEL,
-                    messages=[{"role": "user", "content": classify_prompt}],
-                    temperature=0,
-                    max_tokens=10
-                )
-                classification = (classify_res.choices[0].message.content or "").strip().upper()
+                u = understand_message(user_text)
+                if u is not None:
+                    classification = "FOOD_ORDER" if u["intent"] == "food_order" else "GREETING"
+                else:
+                    classification = llm_complete(
+                        "wa_intent",
+                        [{"role": "user", "content": classify_prompt}],
+                        temperature=0,
+                        max_tokens=10
+                    ).upper()
                 
                 if "FOOD_ORDER" in classification:
                     # It's a food order attempt - let LLM handle it with full context
@@ -5068,19 +5034,12 @@ def whatsapp_webhook():
         ]
         has_arabic_intent = any(intent in text for intent in arabic_order_intents)
         
-        # ✅ Check for Arabic number words (واحد، اثنين، ثلاثة، etc.)
-        arabic_number_words = [
-            "واحد", "اثنين", "اثنتين", "ثلاثة", "ثلاث", "أربعة", "أربع",
-            "خمسة", "خمس", "ستة", "ست", "سبعة", "سبع", "ثمانية", "ثمان",
-            "تسعة", "تسع", "عشرة", "عشر"
-        ]
-        has_arabic_number = any(num in text for num in arabic_number_words)
-        
-        # ✅ Check for Arabic dual form endings (ان، ين، تان، تين) - indicates quantity
-        has_dual_form = bool(re.search(r'\w+(ان|ين|تان|تين)\b', text))
-        
-        # Has numbers (quantity indicator)
-        has_numbers = any(char.isdigit() for char in text)
+        # ✅ Quantities: digits, Arabic number words (واحد، اثنين، ثلاثة...) and dual forms (قهوتين)
+        scanned = quantity.normalize_for_scan(text)
+        qtys = quantity.scan(text)
+        has_arabic_number = any(q.kind == "word" and has_arabic(scanned[q.start:q.end]) for q in qtys)
+        has_dual_form = any(q.kind == "dual" for q in qtys)
+        has_numbers = any(q.kind == "digit" for q in qtys)
         
         # Has food keywords
         food_keywords = [
@@ -5165,22 +5124,16 @@ def whatsapp_webhook():
     COMMAND_ALLOWLIST = ["finish", "cancel", "complete", "stop", "end", "done", "menu", "order", "items", "add more"]
     is_command = any(cmd in clean for cmd in COMMAND_ALLOWLIST)
 
-    # DEBUG: Find which term matches (using word boundaries for English to avoid partial matches)
-    def check_irrelevant(t, text_to_check):
-        # For English, use word boundaries
-        if re.search(r'[a-zA-Z]', t):
-            return bool(re.search(rf"\b{re.escape(t)}\b", text_to_check))
-        # For Arabic, keep simple containment or improve if needed
-        return t in text_to_check
-
-    matched_term = next((k for k in IRRELEVANT_TERMS if check_irrelevant(k, clean)), None)
+    # DEBUG: Find which term matches (word boundaries for English to avoid partial matches)
+    irrelevant_hit = analyze(user_text).blocklist_hit
+    matched_term = irrelevant_hit.term if irrelevant_hit else None
     
     # Safety override: If it looks like food, don't block it
     has_food_safe = any(f in clean for f in ["burger", "sandwich", "coffee", "tea", "meal", "juice", "برجر", "ساندويتش", "قهوة", "شاي", "وجبة", "عصير", "potato", "بطاطس"])
     is_irrelevant_guard = bool(matched_term) and not is_command and not has_food_safe
     
     if matched_term and is_irrelevant_guard:
-        print(f"🔍 DEBUG: Irrelevant term match: '{matched_term}' in '{clean}'")
+        print(f"🔍 DEBUG: Irrelevant term match: '{matched_term}' at {irrelevant_hit.start}-{irrelevant_hit.end} in '{clean}'")
     
     if not from_button and (is_first_interaction or is_wa_greeting(user_text)):
         # If it looks like an order/menu request OR irrelevant, DON'T show welcome - let it be processed
@@ -5303,7 +5256,7 @@ def whatsapp_webhook():
             lang,
             is_voice=is_voice,
             from_button=from_button,
-            customer_id=customer_id,
+            tenant_id=tenant_id,
         )
 
         # ✅ Handle open_category action (from order_start intent)
@@ -5398,16 +5351,20 @@ def whatsapp_webhook():
         # This allows the receipt to be displayed first, then feedback comes later
 
         send_whatsapp_text(user_number, reply_text)
-        save_message(
-            customer_id=customer_id,
-            order_id=None,
-            direction="bot_to_user",
-            message_type="text",
-            text=reply_text,
-            audio_url=None,
-            is_voice=False,
-            language=lang,
-            raw_payload=None,
+        tasks.start(
+            "log_out",
+            lambda: save_message(
+                customer_id=tasks.result("customer"),
+                order_id=None,
+                direction="bot_to_user",
+                message_type="text",
+                text=reply_text,
+                audio_url=None,
+                is_voice=False,
+                language=lang,
+                raw_payload=None,
+            ),
+            after=("log_in",),
         )
         return "ok", 200
 
@@ -5429,6 +5386,7 @@ def process_whatsapp_message(
     is_voice: bool = False,
     from_button: bool = False,
     customer_id: int | None = None,
+    tenant_id: str | None = None,
 ) -> dict:
     ctx = WHATSAPP_SESSIONS.get(user_number, {})
     prev_state = ctx.get("state")
@@ -5445,6 +5403,9 @@ def process_whatsapp_message(
             "customer_id": customer_id,
         },
     ):
+        # chat() picks the tenant menu from WA_PHONE_NUMBER_ID (test_request_context skips before_request)
+        if tenant_id:
+            WA_PHONE_NUMBER_ID.set(str(tenant_id))
         if prev_state is not None:
             session["state"] = prev_state
         if prev_messages is not None:
@@ -5481,6 +5442,7 @@ def make_chat_response(reply, lang, menu=None):
         "stage": s.get("stage"),
         "order": s.get("order"),
         "total": s.get("total", 0),
+        "menu_version": active_snapshot().version,
     }
     if menu:
         payload["menu"] = menu
@@ -5491,10 +5453,10 @@ def make_chat_response(reply, lang, menu=None):
 # =========================================================
 @app.route("/api/chat", methods=["POST"])
 def chat():
-    global MENU, BRANCHES
-
-    MENU = load_menu()
-    BRANCHES = load_branches()
+    # Serve this request from the tenant's current menu snapshot (no Excel I/O unless it changed).
+    # The tenant is the WhatsApp number set by the webhook, never taken from the request body:
+    # before_request clears it, so a web client always gets the default menu.
+    use_menu_snapshot(WA_PHONE_NUMBER_ID.get())
 
     s = session.get("state") or {"stage": None, "order": [], "total": 0}
     s.setdefault("order", [])
@@ -5515,18 +5477,22 @@ def chat():
     from_button = bool(data.get("from_button", False))
     customer_id = data.get("customer_id")
 
-    lang = detect_language(msg_raw)
-    if any("\u0600" <= ch <= "\u06ff" for ch in msg_raw):
+    lang = analyze(msg_raw).language
+    if analyze(msg_raw).has_arabic:
         lang = "ar"
     if lang_hint in ("en", "ar"):
         lang = lang_hint
 
     # ✅ STEP 0: AI-POWERED ARABIC TYPO CORRECTION (before normalization)
     # This intelligently fixes Arabic spelling mistakes using GPT
+    # (text the WhatsApp webhook already corrected is a memo hit, not a second call;
+    #  whether a text is corrected is only ever known server-side)
     if lang == "ar":
         msg_raw = correct_arabic_typos_with_ai(msg_raw)
 
     msg_norm, msg_norm_l, typed_button_like = normalize_user_text(msg_raw)
+    if lang == "ar":
+        mark_corrected(msg_norm)   # handle_multi_item_text gets the normalized text
     if typed_button_like and msg_norm_l.startswith("item_"):
         from_button = True
 
@@ -5534,7 +5500,7 @@ def chat():
     msg = msg_norm
     msg_l = msg_norm_l
 
-    intent = detect_intent(msg)
+    intent = analyze(msg).intent
     session["messages"].append({"role": "user", "content": msg})
 
     # =========================================================
@@ -5546,12 +5512,8 @@ def chat():
     is_irrelevant = False
 
     # 1. Direct match or containment of bad words (using word boundaries for English)
-    def is_bad_word(w, text_to_check):
-        if re.search(r'[a-zA-Z]', w):
-            return bool(re.search(rf"\b{re.escape(w)}\b", text_to_check))
-        return w in text_to_check
-
-    matched = next((k for k in IRRELEVANT_TERMS if is_bad_word(k, msg_low)), None)
+    bad_hit = analyze(msg).blocklist_hit
+    matched = bad_hit.term if bad_hit else None
     if matched:
         is_irrelevant = True
         
@@ -5692,7 +5654,7 @@ def chat():
 
             # Try to find a burger in the text
             picked_key = None
-            t = _norm_text(msg_raw)
+            t = arabic_text.norm_text(msg_raw)
             
             # 1. Search by exact name in MENU
             for k, info in MENU.items():
@@ -5747,7 +5709,7 @@ def chat():
 
             # Try to find a sandwich in the text
             picked_key = None
-            t = _norm_text(msg_raw)
+            t = arabic_text.norm_text(msg_raw)
             
             for k, info in MENU.items():
                 if (info.get("category") or "") == "sandwiches":
@@ -5820,7 +5782,7 @@ def chat():
             return make_chat_response(f"{title}\n{body}", lang)
 
         # detect a MEALS item name inside a long sentence
-        t = _norm_text(msg_raw or "")
+        t = arabic_text.norm_text(msg_raw or "")
         for name, key in (NAME_TO_KEY or {}).items():
             if name and (name in t):
                 info = MENU.get(key) or {}
@@ -5917,7 +5879,7 @@ def chat():
             return make_chat_response(f"{title}\n{body}", lang)
 
         # detect a JUICES item name inside a long sentence
-        t = _norm_text(msg_raw or "")
+        t = arabic_text.norm_text(msg_raw or "")
         for name, key in (NAME_TO_KEY or {}).items():
             if name and (name in t):
                 info = MENU.get(key) or {}
@@ -6014,7 +5976,7 @@ def chat():
             return make_chat_response(f"{title}\n{body}", lang)
 
         # detect a DRINKS item name inside a long sentence
-        t = _norm_text(msg_raw or "")
+        t = arabic_text.norm_text(msg_raw or "")
         for name, key in (NAME_TO_KEY or {}).items():
             if name and (name in t):
                 info = MENU.get(key) or {}
@@ -6111,7 +6073,7 @@ def chat():
             return make_chat_response(f"{title}\n{body}", lang)
 
         # detect a SIDES item name inside a long sentence
-        t = _norm_text(msg_raw or "")
+        t = arabic_text.norm_text(msg_raw or "")
         for name, key in (NAME_TO_KEY or {}).items():
             if name and (name in t):
                 info = MENU.get(key) or {}
@@ -6334,6 +6296,9 @@ def chat():
         mi = find_menu_item(item_q)
 
         if not mi:
+            faq_reply = answer_faq(msg_txt, lang)
+            if faq_reply:
+                return make_chat_response(faq_reply, lang)
             return make_chat_response(
                 "Please type the exact item name to check price."
                 if lang != "ar"
@@ -6476,9 +6441,6 @@ def chat():
     if intent in ("order_start", "browse_category"):
         # 1. Analyze the message structure
         is_multi_item = looks_like_multi_item_text(msg_raw)
-        has_digits = any(c.isdigit() for c in msg_raw)
-        # Check for number words (one, two, etc) logic could be added here if needed, 
-        # but looks_like_multi_item_text partially handles that or we rely on digits.
         
         detected_cat = detect_category_from_text(msg)
 
@@ -6938,8 +6900,8 @@ def chat():
         txt = (msg_raw or "").strip()
 
         # 1) number-only => treat as index from list (1-based)
-        if re.fullmatch(r"\d+", _normalize_digits(txt)) and order:
-            idx = int(_normalize_digits(txt)) - 1
+        if re.fullmatch(r"\d+", arabic_text.clean(txt)) and order:
+            idx = int(arabic_text.clean(txt)) - 1
             if 0 <= idx < len(order):
                 item = order[idx]
                 cancel_req = {
@@ -7736,6 +7698,12 @@ def chat():
             print(f"⚠️ Arabic fallback parser error: {e}")
             # Continue to conversational fallback
 
+    # ✅ FAQ questions (prices, hours, payment...) answered from menu/branch data, no LLM
+    faq_reply = answer_faq(msg, lang)
+    if faq_reply:
+        print(f"✅ FAQ answered locally: '{msg[:50]}'")
+        return make_chat_response(faq_reply, lang)
+
     # Smart LLM with context (only reached if not Arabic add_more, or parsing failed)
     reply = get_llm_reply(msg, lang)
     
@@ -7760,6 +7728,9 @@ def chat():
     reply = merge_replies(reply, guide)
     return make_chat_response(reply, lang)
 
+startup.mark("routes + handlers")
+startup.report()
+
 # =========================================================
 # RUN (LOCAL)
 # =========================================================
@@ -0,0 +1,96 @@
+"""Arabic / Eastern-digit text normalization shared by every matcher.
+
+Each step is a precomputed `str.translate` table instead of a chain of
+`.replace()` calls. Short inputs (words, menu names, button replies) repeat
+across helpers and messages, so their results are kept in an LRU cache.
+"""
+import re
+from functools import lru_cache, wraps
+
+# =========================================================
+# TRANSLATE TABLES
+# =========================================================
+# Eastern Arabic (٠-٩) and Persian (۰-۹) digits -> Western
+DIGITS = str.maketrans("٠١٢٣٤٥٦٧٨٩۰۱۲۳۴۵۶۷۸۹", "0123456789" * 2)
+# Letter variants, one char for one char so spans stay valid: أ/إ/آ/ٱ -> ا, ة -> ه, ى -> ي
+LETTERS = str.maketrans("أإآٱةى", "ااااهي")
+# Tatweel and harakat (tanween .. sukun, dagger alef) are dropped
+MARKS = str.maketrans("", "", "\u0640" + "".join(chr(c) for c in range(0x064B, 0x0653)) + "\u0670")
+
+CLEAN = {**DIGITS, **MARKS}
+FULL = {**CLEAN, **LETTERS}
+
+# Same-length spellings folded to the one the menu uses
+SPELLINGS = {"برغر": "برجر"}
+
+_SPACES_RE = re.compile(r"\s+")
+_PUNCT_RE = re.compile(r"[^\w\s\u0600-\u06FF]")
+
+# Longer inputs (whole messages) are normalized directly instead of filling the cache
+CACHE_MAX_LEN = 64
+
+
+def _cached(fn):
+    memo = lru_cache(maxsize=8192)(fn)
+
+    @wraps(fn)
+    def wrapper(s: str) -> str:
+        if not s:
+            return ""
+        return memo(s) if len(s) <= CACHE_MAX_LEN else fn(s)
+
+    wrapper.cache_info = memo.cache_info
+    wrapper.cache_clear = memo.cache_clear
+    return wrapper
+
+
+def _spellings(s: str) -> str:
+    for wrong, right in SPELLINGS.items():
+        if wrong in s:
+            s = s.replace(wrong, right)
+    return s
+
+
+# =========================================================
+# NORMALIZERS
+# =========================================================
+def has_arabic(s: str) -> bool:
+    return any("\u0600" <= ch <= "\u06ff" for ch in (s or ""))
+
+
+@_cached
+def digits(s: str) -> str:
+    """Eastern Arabic / Persian digits -> Western. Same length as `s`."""
+    return s.translate(DIGITS)
+
+
+@_cached
+def clean(s: str) -> str:
+    """Western digits, tatweel and diacritics removed (letters untouched)."""
+    return s.translate(CLEAN)
+
+
+@_cached
+def fold(s: str) -> str:
+    """Letter-variant folding (أ/إ/آ→ا, ة→ه, ى→ي, برغر→برجر). Same length as `s`,
+    so match spans on the folded string are valid on the original."""
+    return _spellings(s.translate(LETTERS))
+
+
+@_cached
+def normalize(s: str) -> str:
+    """Full matcher form: lowercase, digits, marks stripped, letters folded."""
+    return _spellings(s.lower().translate(FULL))
+
+
+@_cached
+def squash(s: str) -> str:
+    """Lowercase, digits and marks cleaned, whitespace collapsed."""
+    return _SPACES_RE.sub(" ", s.lower().translate(CLEAN)).strip()
+
+
+@_cached
+def norm_text(s: str) -> str:
+    """squash() with punctuation removed (Arabic letters kept)."""
+    return _PUNCT_RE.sub("", squash(s)).strip()
+
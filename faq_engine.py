@@ -0,0 +1,268 @@
+"""Local answers for the FAQ intents in data/faq.json.
+
+Every pattern ("How much is {item_name}?", "كم سعر {item_name}؟") is compiled
+once into an anchored regex over normalized text (lowercase, Western digits,
+folded Arabic letters, no punctuation), with one lazy group per placeholder.
+Patterns are indexed by their literal words, so a message is only tried
+against the patterns whose words it contains.
+
+Slots are resolved against data, not trusted as text: {item_name} must be a
+menu item of the active MenuIndex, {branch_name} one of the branches. Answers
+are rendered from the menu, the branches and a small dict of store facts
+(hours, payment methods); an answer with a placeholder nothing can fill is
+not given, so the caller falls back to the LLM.
+"""
+import json
+import os
+import re
+from dataclasses import dataclass
+
+import arabic_text
+
+_SLOT_RE = re.compile(r"\{(\w+)\}")
+_PUNCT_RE = re.compile(r"[^\w\s]")
+
+# Words around a question that do not change it ("please how much is pepsi")
+POLITE_WORDS = ["please", "pls", "plz", "hi", "hello", "لو سمحت", "من فضلك", "ممكن"]
+
+# Articles allowed in front of an item name ("how much is the beef burger")
+ITEM_ARTICLES = ["the", "a", "an", "one", "حبة"]
+
+# Category titles, as on the category buttons
+CATEGORY_LABELS = {
+    "burgers_meals": ("Burgers", "برجر"),
+    "meals": ("Meals", "وجبات"),
+    "sandwiches": ("Sandwiches & Wraps", "ساندويتش"),
+    "snacks_sides": ("Snacks & Sides", "وجبات خفيفة"),
+    "juices": ("Juices", "عصائر"),
+    "drinks": ("Drinks", "مشروبات"),
+}
+
+
+def normalize(text: str) -> str:
+    """Lowercase, Western digits, folded Arabic, punctuation to spaces, single spaces."""
+    t = arabic_text.normalize(text or "")
+    return " ".join(_PUNCT_RE.sub(" ", t).split())
+
+
+_POLITE = [normalize(w) for w in POLITE_WORDS]
+_ARTICLES = [normalize(w) for w in ITEM_ARTICLES]
+
+
+def _strip_polite(t: str) -> str:
+    changed = True
+    while changed and t:
+        changed = False
+        for w in _POLITE:
+            if t.startswith(w + " "):
+                t, changed = t[len(w) + 1:], True
+            elif t.endswith(" " + w):
+                t, changed = t[:-len(w) - 1], True
+    return t
+
+
+@dataclass(frozen=True)
+class FaqPattern:
+    intent: str
+    lang: str
+    text: str           # the template as written in faq.json
+    regex: object
+    words: frozenset    # literal words; all must appear in the message
+    slots: tuple
+
+
+@dataclass(frozen=True)
+class FaqMatch:
+    intent: str
+    pattern: str
+    slots: dict         # slot -> resolved value (menu key / branch dict / raw text)
+
+
+def _compile(intent: str, lang: str, text: str):
+    parts = _SLOT_RE.split(text)
+    regex, words, slots = [], [], []
+    for i, part in enumerate(parts):
+        if i % 2:
+            if part in slots:
+                return None             # repeated placeholder
+            slots.append(part)
+            regex.append(f"(?P<{part}>.+?)")
+            continue
+        lit = normalize(part).split()
+        words.extend(lit)
+        regex.extend(re.escape(w) for w in lit)
+    if not words:
+        return None                     # "{item_name}" alone would match anything
+    return FaqPattern(
+        intent=intent,
+        lang=lang,
+        text=text,
+        regex=re.compile("^" + r"\s+".join(regex) + "$"),
+        words=frozenset(words),
+        slots=tuple(slots),
+    )
+
+
+class FaqEngine:
+    """Compiled faq.json: match() a question, answer() it from menu/branch data."""
+
+    def __init__(self, data: dict):
+        self.intents = {}
+        self.patterns = []
+        self.by_word = {}
+        for intent in data.get("intents") or []:
+            iid = intent.get("id")
+            if not iid:
+                continue
+            self.intents[iid] = intent
+            for p in intent.get("patterns") or []:
+                fp = _compile(iid, p.get("lang") or "en", p.get("text") or "")
+                if fp is None:
+                    continue
+                self.by_word.setdefault(min(fp.words), []).append(len(self.patterns))
+                self.patterns.append(fp)
+
+    @classmethod
+    def load(cls, path: str):
+        """The engine for `path`, or None when the file is missing or invalid."""
+        if not os.path.exists(path):
+            print(f"⚠ FAQ file not found: {path}")
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                engine = cls(json.load(f))
+        except Exception as e:
+            print(f"❌ FAQ load error: {e}")
+            return None
+        print(f"✅ FAQ engine ready ({len(engine.intents)} intents, {len(engine.patterns)} patterns)")
+        return engine
+
+    # =========================================================
+    # MATCHING
+    # =========================================================
+    def match(self, text: str, index=None, branches=()):
+        """Best FaqMatch for `text` (most literal words wins), or None."""
+        t = _strip_polite(normalize(text))
+        if not t:
+            return None
+        tokens = set(t.split())
+        candidates = sorted({i for w in tokens for i in self.by_word.get(w, ())})
+        best = None
+        for i in candidates:
+            p = self.patterns[i]
+            if not p.words <= tokens:
+                continue
+            if best is not None and len(p.words) <= len(best[0].words):
+                continue
+            m = p.regex.match(t)
+            if not m:
+                continue
+            slots = self._resolve(m.groupdict(), index, branches)
+            if slots is not None:
+                best = (p, slots)
+        if best is None:
+            return None
+        return FaqMatch(best[0].intent, best[0].text, best[1])
+
+    def _resolve(self, groups: dict, index, branches):
+        slots = {}
+        for name, raw in groups.items():
+            if name == "item_name":
+                key = _resolve_item(raw, index)
+                if key is None:
+                    return None
+                slots[name] = key
+            elif name == "branch_name":
+                branch = _resolve_branch(raw, branches)
+                if branch is None:
+                    return None
+                slots[name] = branch
+            else:
+                slots[name] = raw
+        return slots
+
+    # =========================================================
+    # ANSWERS
+    # =========================================================
+    def answer(self, text: str, lang: str, index=None, branches=(), facts=None):
+        """Rendered answer (plain text with **bold**), or None when no FAQ fits."""
+        m = self.match(text, index, branches)
+        if m is None:
+            return None
+        lang = "ar" if lang == "ar" else "en"
+        template = (self.intents[m.intent].get("answer") or {}).get(lang)
+        if not template:
+            return None
+        values = _values(m, lang, index, (facts or {}).get(lang) or {})
+        try:
+            out = template.format_map(values)
+        except (KeyError, IndexError, ValueError):
+            return None                 # a placeholder we have no data for
+        return re.sub(r"\n{2,}", "\n", out).strip()
+
+
+def _resolve_item(raw: str, index):
+    if index is None:
+        return None
+    t = raw.strip()
+    for a in _ARTICLES:
+        if t.startswith(a + " "):
+            t = t[len(a) + 1:]
+            break
+    if t in index.by_key:
+        return t
+    key = index.exact.get(t)
+    if key:
+        return key
+    for m in index.mentions(t):
+        if m.start == 0 and m.end == len(t):
+            return m.key
+    return None
+
+
+def _resolve_branch(raw: str, branches):
+    t = raw.strip()
+    for b in branches or ():
+        name = normalize(b.get("Branch Name") or "")
+        if name and (t == name or t == normalize("branch " + name) or t == normalize("فرع " + name)):
+            return b
+    return None
+
+
+def _values(m: FaqMatch, lang: str, index, facts: dict) -> dict:
+    """Placeholder values for one match; placeholders without data stay missing."""
+    values = dict(facts)
+    menu = index.menu if index is not None else {}
+    key = m.slots.get("item_name")
+    if key:
+        info = menu.get(key) or {}
+        name = info.get("name_ar") if lang == "ar" else info.get("name_en")
+        category = (info.get("category") or "").strip().lower()
+        values["item_name"] = name or key
+        if info.get("price") is not None:
+            values["price"] = info.get("price")
+        values["size_note"] = ""
+        values["spice_note"] = ""
+        if category == "burgers_meals":
+            values["spice_note"] = "متوفر حار أو بدون حار." if lang == "ar" else "Available spicy or non-spicy."
+            values["spice_supported"] = "Spicy / Non-spicy"
+            values["spice_supported_ar"] = "حار / غير حار"
+        values["availability_status"] = "available"
+        values["availability_status_ar"] = "متوفر"
+        base = key[:-len(" meal")] if key.endswith(" meal") else key
+        single, meal = menu.get(base), menu.get(base + " meal")
+        if single and meal:
+            values["single_price"] = single.get("price")
+            values["meal_price"] = meal.get("price")
+    branch = m.slots.get("branch_name")
+    if branch:
+        values["branch_name"] = branch.get("Branch Name")
+    if index is not None:
+        labels = []
+        for cat in index.by_category:
+            en, ar = CATEGORY_LABELS.get(cat, (str(cat).replace("_", " ").title(), str(cat)))
+            label = ar if lang == "ar" else en
+            if label not in labels:
+                labels.append(label)
+        values["categories_list"] = "، ".join(labels) if lang == "ar" else ", ".join(labels)
+    return {k: v for k, v in values.items() if v is not None}
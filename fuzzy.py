@@ -0,0 +1,225 @@
+"""Bounded fuzzy matching for intent detection.
+
+Similarity is the same as nlp_utils' original `1 - levenshtein / max_len`, but
+each comparison stops as soon as the threshold is out of reach:
+
+  1. length gap  -> at least |len(a) - len(b)| edits
+  2. char bag    -> at least max(chars of a missing in b, chars of b missing in a) edits
+  3. banded DP   -> only cells within `max_dist` of the diagonal, abort when a whole row exceeds it
+
+`close_matches` is difflib.get_close_matches with its quick_ratio filter run for
+all candidates at once in NumPy (when available); survivors are scored by difflib
+itself, so results are identical.
+"""
+from collections import Counter
+from difflib import SequenceMatcher, get_close_matches
+from functools import lru_cache
+from heapq import nlargest
+
+# Below this many candidates the per-string path beats NumPy's setup cost
+BATCH_MIN = 32
+
+
+def max_distance(max_len: int, threshold: float) -> int:
+    """Largest edit distance d with `1 - d / max_len >= threshold` (-1 if none)."""
+    if max_len == 0:
+        return 0 if threshold <= 1 else -1
+    d = min(max_len, int((1 - threshold) * max_len) + 1)
+    while d >= 0 and 1 - (d / max_len) < threshold:
+        d -= 1
+    return d
+
+
+def bag_gap(a_counts: Counter, b_counts: Counter) -> int:
+    """Lower bound on the edit distance from character counts alone."""
+    return max(sum((a_counts - b_counts).values()), sum((b_counts - a_counts).values()))
+
+
+def bounded_levenshtein(a: str, b: str, max_dist: int) -> int:
+    """Levenshtein distance if it is <= max_dist, else max_dist + 1 (stops early)."""
+    if a == b:
+        return 0
+    if len(a) > len(b):
+        a, b = b, a
+    la, lb = len(a), len(b)
+    over = max_dist + 1
+    if lb - la > max_dist:
+        return over
+    if la == 0:
+        return lb
+
+    prev = [j if j <= max_dist else over for j in range(lb + 1)]
+    for i in range(1, la + 1):
+        lo = max(1, i - max_dist)
+        hi = min(lb, i + max_dist)
+        cur = [over] * (lb + 1)
+        cur[0] = i if i <= max_dist else over
+        row_min = cur[0]
+        ca = a[i - 1]
+        for j in range(lo, hi + 1):
+            v = prev[j - 1] + (ca != b[j - 1])
+            x = prev[j] + 1
+            if x < v:
+                v = x
+            x = cur[j - 1] + 1
+            if x < v:
+                v = x
+            if v > over:
+                v = over
+            cur[j] = v
+            if v < row_min:
+                row_min = v
+        if row_min > max_dist:
+            return over
+        prev = cur
+    return prev[lb] if prev[lb] <= max_dist else over
+
+
+def similar(a: str, b: str, threshold: float, a_counts: Counter = None, b_counts: Counter = None) -> bool:
+    """`1 - levenshtein(a, b) / max(len) >= threshold`, with the cheap bounds tried first."""
+    max_len = max(len(a), len(b))
+    if max_len == 0:
+        return threshold <= 1
+    max_dist = max_distance(max_len, threshold)
+    if max_dist < 0 or abs(len(a) - len(b)) > max_dist:
+        return False
+    if max_dist < max_len:
+        if bag_gap(a_counts or Counter(a), b_counts or Counter(b)) > max_dist:
+            return False
+    return bounded_levenshtein(a, b, max_dist) <= max_dist
+
+
+# =========================================================
+# NUMPY BATCH
+# =========================================================
+def _numpy():
+    try:
+        import numpy
+        return numpy
+    except ImportError:
+        return None
+
+
+def levenshtein_many(text: str, candidates) -> list:
+    """Exact Levenshtein distance from `text` to every candidate, one NumPy pass per char of `text`.
+
+    Rows are updated for all candidates at once; the left-to-right insertion
+    chain inside a row is resolved with a cumulative minimum.
+    """
+    np = _numpy()
+    if np is None or not candidates:
+        return [bounded_levenshtein(text, c, max(len(text), len(c))) for c in candidates]
+
+    lens = np.array([len(c) for c in candidates])
+    width = int(lens.max()) + 1
+    codes = np.full((len(candidates), width - 1), -1, dtype=np.int64)
+    for r, c in enumerate(candidates):
+        if c:
+            codes[r, :len(c)] = [ord(ch) for ch in c]
+
+    cols = np.arange(width)
+    row = np.broadcast_to(cols, (len(candidates), width)).copy()
+    for i, ch in enumerate(text, start=1):
+        cost = (codes != ord(ch)).astype(np.int64)
+        tmp = np.empty_like(row)
+        tmp[:, 0] = i
+        tmp[:, 1:] = np.minimum(row[:, 1:] + 1, row[:, :-1] + cost)
+        # cur[j] = min_k<=j (tmp[k] + j - k)
+        row = np.minimum.accumulate(tmp - cols, axis=1) + cols
+    return row[np.arange(len(candidates)), lens].tolist()
+
+
+# =========================================================
+# DROP-IN MATCHERS
+# =========================================================
+class FuzzyMatcher:
+    """fuzzy_match over a fixed pattern list, with per-pattern prep done once."""
+
+    def __init__(self, patterns):
+        self.patterns = tuple(p.lower().strip() for p in patterns)
+        self.counts = tuple(Counter(p) for p in self.patterns)
+
+    def match(self, text: str, threshold: float = 0.7) -> bool:
+        text_lower = text.lower().strip()
+        for p in self.patterns:
+            if text_lower == p or p in text_lower:
+                return True
+        if len(text_lower) <= 2:
+            return False
+
+        fuzzy = [(p, c) for p, c in zip(self.patterns, self.counts) if len(p) > 2]
+        if len(fuzzy) >= BATCH_MIN and _numpy() is not None:
+            dists = levenshtein_many(text_lower, [p for p, _ in fuzzy])
+            return any(1 - (d / max(len(text_lower), len(p))) >= threshold
+                       for d, (p, _) in zip(dists, fuzzy))
+
+        text_counts = Counter(text_lower)
+        return any(similar(text_lower, p, threshold, text_counts, c) for p, c in fuzzy)
+
+
+@lru_cache(maxsize=64)
+def _matcher(patterns: tuple) -> FuzzyMatcher:
+    return FuzzyMatcher(patterns)
+
+
+def fuzzy_match(text: str, patterns, threshold: float = 0.7) -> bool:
+    """Same answer as nlp_utils' original fuzzy_match."""
+    return _matcher(tuple(patterns)).match(text, threshold)
+
+
+class _CloseMatchIndex:
+    """Character-count matrix of the candidates, for difflib's quick_ratio in one NumPy call."""
+
+    def __init__(self, possibilities: tuple, np):
+        self.np = np
+        self.possibilities = possibilities
+        self.vocab = {}
+        for s in possibilities:
+            for ch in s:
+                self.vocab.setdefault(ch, len(self.vocab))
+        self.lens = np.array([len(s) for s in possibilities])
+        self.counts = np.zeros((len(possibilities), max(1, len(self.vocab))), dtype=np.int64)
+        for r, s in enumerate(possibilities):
+            for ch, n in Counter(s).items():
+                self.counts[r, self.vocab[ch]] = n
+
+    def candidates(self, word: str, cutoff: float) -> list:
+        np = self.np
+        w = np.zeros(self.counts.shape[1], dtype=np.int64)
+        for ch, n in Counter(word).items():
+            i = self.vocab.get(ch)
+            if i is not None:
+                w[i] = n
+        total = self.lens + len(word)
+        common = np.minimum(self.counts, w).sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            quick = np.where(total > 0, 2.0 * common / total, 1.0)
+        # small slack: difflib re-checks the exact quick_ratio for every survivor
+        return np.nonzero(quick >= cutoff - 1e-9)[0].tolist()
+
+
+@lru_cache(maxsize=16)
+def _close_index(possibilities: tuple):
+    np = _numpy()
+    return _CloseMatchIndex(possibilities, np) if np is not None else None
+
+
+def close_matches(word: str, possibilities, n: int = 3, cutoff: float = 0.6) -> list:
+    """difflib.get_close_matches with the quick_ratio prefilter batched over all candidates."""
+    possibilities = tuple(possibilities)
+    if len(possibilities) < BATCH_MIN or not 0.0 <= cutoff <= 1.0 or n <= 0:
+        return get_close_matches(word, possibilities, n=n, cutoff=cutoff)
+    index = _close_index(possibilities)
+    if index is None:
+        return get_close_matches(word, possibilities, n=n, cutoff=cutoff)
+
+    result = []
+    s = SequenceMatcher()
+    s.set_seq2(word)
+    for i in index.candidates(word, cutoff):
+        x = possibilities[i]
+        s.set_seq1(x)
+        if s.real_quick_ratio() >= cutoff and s.quick_ratio() >= cutoff and s.ratio() >= cutoff:
+            result.append((s.ratio(), x))
+    result = nlargest(n, result)
+    return [x for score, x in result]
@@ -0,0 +1,27 @@
+# Gunicorn settings for `web: gunicorn app:app -c gunicorn.conf.py` (see Procfile).
+#
+# The app is imported and warmed once in the master; workers are forked from it
+# and share the menu index, intent tables etc. copy-on-write. Threads do not
+# survive fork, so they are started per worker in post_fork.
+import gc
+import os
+
+preload_app = True
+
+# Tell app.py not to start its background threads at import (we do it post-fork)
+os.environ["APP_PRELOAD"] = "1"
+
+
+def when_ready(server):
+    import app
+
+    app.warm_up()
+    # Move everything built so far out of the GC's reach: collections in the
+    # workers then no longer write to (and un-share) these pages.
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    import app
+
+    app.start_background_threads()
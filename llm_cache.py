@@ -0,0 +1,183 @@
+"""Content-addressed cache for LLM completions.
+
+A key is the SHA-256 of (call site, model, menu version, messages, sampling
+params), with the user text normalized (lowercase, Western digits, no
+diacritics, single spaces) so "2 Burgers" and "2  burgers" share an entry.
+A new menu version or prompt change gives new keys; nothing is invalidated.
+
+Two tiers:
+  - in-process LRU, bounded by entry count, with a TTL per entry
+  - optional SQLite file (LLM_CACHE_PATH) shared by all gunicorn workers;
+    a disk hit is promoted to memory
+
+Hit/miss counters are kept per call site (see `metrics()`).
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import arabic_text
+
+DEFAULT_MAX_ENTRIES = 2048
+DEFAULT_TTL = 6 * 3600          # seconds
+
+# Expired rows are deleted from the disk tier every this many writes
+DISK_PRUNE_EVERY = 256
+
+
+def normalize_input(text: str) -> str:
+    return arabic_text.squash(text or "")
+
+
+def cache_key(site: str, model: str, menu_version, messages, **params) -> str:
+    """Stable key for one completion request; user messages are normalized."""
+    msgs = [
+        [m.get("role"), normalize_input(m.get("content")) if m.get("role") == "user" else m.get("content")]
+        for m in messages
+    ]
+    blob = json.dumps(
+        [site, model, menu_version, msgs, sorted(params.items())],
+        ensure_ascii=False, separators=(",", ":"),
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """Two-tier (memory LRU + optional SQLite) cache of completion texts."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl: float = DEFAULT_TTL, path: str = None):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = float(ttl)
+        self.path = path or None
+        self._mem = OrderedDict()           # key -> (expires_at, text)
+        self._lock = threading.Lock()
+        self._conn = threading.local()      # one SQLite connection per thread (and pid)
+        self._writes = 0
+        self._stats = {}                    # site -> {"hits", "disk_hits", "misses", "stores"}
+        if self.path:
+            try:
+                self._db()
+            except Exception as e:
+                print(f"⚠ LLM cache disk tier disabled ({self.path}): {e}")
+                self.path = None
+
+    # =========================================================
+    # DISK TIER
+    # =========================================================
+    def _db(self):
+        conn = getattr(self._conn, "db", None)
+        if conn is not None and self._conn.pid == os.getpid():
+            return conn
+        conn = sqlite3.connect(self.path, timeout=2.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        conn.commit()
+        self._conn.db, self._conn.pid = conn, os.getpid()
+        return conn
+
+    def _disk_get(self, key: str):
+        try:
+            row = self._db().execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+        except Exception as e:
+            print(f"⚠ LLM cache disk read error: {e}")
+            return None
+        if row is None or row[1] < time.time():
+            return None
+        return row[0], row[1]
+
+    def _disk_put(self, key: str, value: str, expires_at: float):
+        try:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at),
+            )
+            self._writes += 1
+            if self._writes % DISK_PRUNE_EVERY == 0:
+                db.execute("DELETE FROM llm_cache WHERE expires_at < ?", (time.time(),))
+            db.commit()
+        except Exception as e:
+            print(f"⚠ LLM cache disk write error: {e}")
+
+    # =========================================================
+    # PUBLIC API
+    # =========================================================
+    def _count(self, site: str, field: str):
+        counters = self._stats.setdefault(site, {"hits": 0, "disk_hits": 0, "misses": 0, "stores": 0})
+        counters[field] += 1
+
+    def get(self, key: str, site: str = ""):
+        """Cached text for `key`, or None (counted as a miss)."""
+        now = time.time()
+        with self._lock:
+            hit = self._mem.get(key)
+            if hit is not None:
+                if hit[0] >= now:
+                    self._mem.move_to_end(key)
+                    self._count(site, "hits")
+                    return hit[1]
+                del self._mem[key]
+        disk = self._disk_get(key) if self.path else None
+        with self._lock:
+            if disk is None:
+                self._count(site, "misses")
+                return None
+            self._count(site, "disk_hits")
+            self._remember(key, disk[1], disk[0])
+        return disk[0]
+
+    def put(self, key: str, value: str, site: str = ""):
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, expires_at, value)
+            self._count(site, "stores")
+        if self.path:
+            self._disk_put(key, value, expires_at)
+
+    def _remember(self, key: str, expires_at: float, value: str):
+        self._mem[key] = (expires_at, value)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._mem.clear()
+            self._stats.clear()
+        if self.path:
+            try:
+                db = self._db()
+                db.execute("DELETE FROM llm_cache")
+                db.commit()
+            except Exception as e:
+                print(f"⚠ LLM cache disk clear error: {e}")
+
+    def metrics(self) -> dict:
+        """Counters per call site plus totals and hit ratio (memory + disk hits)."""
+        with self._lock:
+            sites = {s: dict(c) for s, c in self._stats.items()}
+            entries = len(self._mem)
+        total = {"hits": 0, "disk_hits": 0, "misses": 0, "stores": 0}
+        for c in sites.values():
+            for k in total:
+                total[k] += c[k]
+        lookups = total["hits"] + total["disk_hits"] + total["misses"]
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "disk": self.path,
+            "hit_ratio": round((total["hits"] + total["disk_hits"]) / lookups, 3) if lookups else 0.0,
+            "total": total,
+            "sites": sites,
+        }
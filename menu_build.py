@@ -0,0 +1,385 @@
+"""
+Compile data/Menu.xlsx + data/Branches.xlsx into data/menu.compiled.json.
+
+The runtime only reads the compiled JSON (milliseconds, no Excel parsing).
+openpyxl is imported only when the artifact is missing or stale, and then
+streams each sheet once in read-only mode.
+
+    python menu_build.py            # rebuild if stale
+    python menu_build.py --force    # always rebuild
+"""
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from dataclasses import dataclass, field
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+MENU_FILE = os.path.join(DATA_DIR, "Menu.xlsx")
+BRANCHES_FILE = os.path.join(DATA_DIR, "Branches.xlsx")
+COMPILED_FILE = os.path.join(DATA_DIR, "menu.compiled.json")
+
+SCHEMA_VERSION = 1
+CURRENCY = "SAR"
+
+
+class MenuArtifactError(ValueError):
+    pass
+
+
+# =========================================================
+# CATEGORY NORMALIZATION
+# =========================================================
+def canonical_category(raw_category: str, name_en: str = "") -> str:
+    c = (raw_category or "").strip().lower()
+    n = (name_en or "").strip().lower()
+
+    # ---------
+    # Direct category from Excel (preferred)
+    # ---------
+    if c in ("meals", "meal"):
+        return "meals"
+    if c in ("juices", "juice"):
+        return "juices"
+    if c in ("drinks", "drink", "beverages", "beverage"):
+        return "drinks"
+
+    # Keep your existing main buckets too (optional)
+    if c in ("burgers_meals", "burger_meals", "burgers", "burger"):
+        return "burgers_meals"
+    if c in ("sandwiches", "sandwich", "wraps", "wrap", "tortilla"):
+        return "sandwiches"
+    if c in ("snacks_sides", "snacks", "snack", "sides", "side"):
+        return "snacks_sides"
+
+    # ---------
+    # Fallback inference from item name (when Excel category missing/wrong)
+    # ---------
+    if any(k in n for k in ("juice", "orange", "mango", "cocktail")):
+        return "juices"
+
+    if any(k in n for k in ("cola", "coke", "pepsi", "sprite", "7up", "water", "coffee", "tea")):
+        return "drinks"
+
+    # If user typed/Excel category says "meal" in name but category missing
+    if " meal" in n or n.endswith("meal"):
+        return "meals"
+
+    # Otherwise keep empty/other
+    return c or ""
+
+
+# =========================================================
+# EXCEL INGESTION (openpyxl read-only, single streaming pass)
+# =========================================================
+@dataclass(frozen=True)
+class RowError:
+    sheet: str
+    row: int            # 1-based Excel row number
+    field: str
+    message: str
+
+    def as_dict(self) -> dict:
+        return {"sheet": self.sheet, "row": self.row, "field": self.field, "message": self.message}
+
+
+@dataclass
+class IngestResult:
+    menu: dict = field(default_factory=dict)
+    branches: list = field(default_factory=list)
+    errors: list = field(default_factory=list)      # RowError: row rejected or suspicious
+    sheets: list = field(default_factory=list)      # sheets that had a usable header
+
+
+def _cell_str(v) -> str:
+    if v is None:
+        return ""
+    if isinstance(v, float) and v.is_integer():
+        v = int(v)
+    return str(v).strip()
+
+
+def _iter_sheet_rows(path: str):
+    """Yield (sheet_name, excel_row_number, values_tuple) without loading whole sheets."""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for ws in wb.worksheets:
+            for n, values in enumerate(ws.iter_rows(values_only=True), start=1):
+                yield ws.title, n, values
+    finally:
+        wb.close()
+
+
+def ingest_menu(path: str = MENU_FILE, result: IngestResult = None) -> IngestResult:
+    """Stream every sheet once; the first row holding name_en + price is that sheet's header."""
+    result = result or IngestResult()
+    menu = result.menu
+    ids_seen = {}
+    header = None
+    current_sheet = None
+
+    for sheet, n, values in _iter_sheet_rows(path):
+        if sheet != current_sheet:
+            current_sheet, header = sheet, None
+
+        cells = [_cell_str(v) for v in values]
+        if header is None:
+            row_text = " ".join(c.lower() for c in cells if c)
+            if "name_en" in row_text and "price" in row_text:
+                header = {c.lower(): i for i, c in reversed(list(enumerate(cells))) if c}
+                result.sheets.append(sheet)
+            continue
+        if not any(cells):
+            continue
+
+        def col(name):
+            i = header.get(name)
+            return values[i] if i is not None and i < len(values) else None
+
+        en = _cell_str(col("name_en"))
+        if not en:
+            result.errors.append(RowError(sheet, n, "name_en", "missing name_en"))
+            continue
+
+        raw_price = col("price")
+        try:
+            price = float(raw_price)
+        except (TypeError, ValueError):
+            result.errors.append(RowError(sheet, n, "price", f"bad price {raw_price!r} for {en!r}"))
+            continue
+        if price != price or price < 0:
+            result.errors.append(RowError(sheet, n, "price", f"bad price {raw_price!r} for {en!r}"))
+            continue
+
+        excel_id = None
+        raw_id = col("id")
+        if raw_id not in (None, ""):
+            try:
+                excel_id = int(float(raw_id))
+            except (TypeError, ValueError):
+                result.errors.append(RowError(sheet, n, "id", f"bad id {raw_id!r} for {en!r}"))
+            else:
+                if excel_id in ids_seen:
+                    result.errors.append(RowError(
+                        sheet, n, "id", f"duplicate id {excel_id} (first used on row {ids_seen[excel_id]})"))
+                else:
+                    ids_seen[excel_id] = n
+
+        en_key = en.lower()
+        if en_key in menu:
+            result.errors.append(RowError(sheet, n, "name_en", f"duplicate name_en {en!r}; this row wins"))
+
+        ar = _cell_str(col("name_ar"))
+        menu[en_key] = {
+            "id": excel_id,
+            "price": price,
+            "category": canonical_category(_cell_str(col("category")), en).strip().lower(),
+            "name_en": en,
+            "name_ar": ar or en,
+        }
+
+    if not result.sheets:
+        result.errors.append(RowError("", 0, "header", "no sheet has a header row with 'name_en' and 'price'"))
+    return result
+
+
+def ingest_branches(path: str = BRANCHES_FILE, result: IngestResult = None) -> IngestResult:
+    """First sheet only; header is the first row mentioning both 'branch' and 'address'."""
+    result = result or IngestResult()
+    rows = []
+    header_at = None
+    first_sheet = None
+
+    for sheet, n, values in _iter_sheet_rows(path):
+        if first_sheet is None:
+            first_sheet = sheet
+        elif sheet != first_sheet:
+            break
+        cells = [_cell_str(v) for v in values]
+        if header_at is None:
+            low = [c.lower() for c in cells]
+            if any("branch" in c for c in low) and any("address" in c for c in low):
+                header_at = len(rows)
+        rows.append(cells)
+
+    if not rows:
+        return result
+    header_at = header_at or 0
+    header = [c.lower() for c in rows[header_at]]
+
+    def find(pred):
+        return next((i for i, c in enumerate(header) if c and pred(c)), None)
+
+    name_i = find(lambda c: "branch" in c)
+    addr_i = find(lambda c: "address" in c)
+    phone_i = find(lambda c: "phone" in c or "number" in c)
+
+    def get(cells, i):
+        return cells[i] if i is not None and i < len(cells) else ""
+
+    for cells in rows[header_at + 1:]:
+        b = {
+            "Branch Name": get(cells, name_i),
+            "Address / Area": get(cells, addr_i),
+            "Phone Number": get(cells, phone_i),
+        }
+        if b["Branch Name"] or b["Address / Area"] or b["Phone Number"]:
+            result.branches.append(b)
+    return result
+
+
+def read_menu_excel(path: str = MENU_FILE) -> dict:
+    return ingest_menu(path).menu
+
+
+def read_branches_excel(path: str = BRANCHES_FILE) -> list:
+    return ingest_branches(path).branches
+
+
+# =========================================================
+# ARTIFACT
+# =========================================================
+def source_digest(*paths) -> str:
+    h = hashlib.sha1()
+    for p in paths:
+        h.update(os.path.basename(p).encode("utf-8"))
+        try:
+            with open(p, "rb") as f:
+                h.update(f.read())
+        except OSError:
+            h.update(b"<missing>")
+    return h.hexdigest()
+
+
+def compile_artifact(menu_file: str = MENU_FILE, branches_file: str = BRANCHES_FILE,
+                     version: int = 1) -> dict:
+    result = ingest_menu(menu_file)
+    ingest_branches(branches_file, result)
+    for err in result.errors:
+        print(f"⚠ {os.path.basename(menu_file)} [{err.sheet}] row {err.row} {err.field}: {err.message}")
+    menu, branches = result.menu, result.branches
+    return {
+        "schema": SCHEMA_VERSION,
+        "version": version,
+        "source_digest": source_digest(menu_file, branches_file),
+        "currency": CURRENCY,
+        "items": [{"key": key, **info} for key, info in menu.items()],
+        "branches": branches,
+        "ingest_errors": [e.as_dict() for e in result.errors],
+    }
+
+
+def validate_artifact(art: dict) -> None:
+    """Raise MenuArtifactError if `art` does not match the compiled schema."""
+    if not isinstance(art, dict) or art.get("schema") != SCHEMA_VERSION:
+        raise MenuArtifactError(f"unsupported schema: {art.get('schema') if isinstance(art, dict) else type(art)}")
+
+    if not isinstance(art.get("version", 0), int):
+        raise MenuArtifactError("version must be an int")
+
+    items = art.get("items")
+    if not isinstance(items, list) or not items:
+        raise MenuArtifactError("items must be a non-empty list")
+
+    seen = set()
+    for i, it in enumerate(items):
+        if not isinstance(it, dict):
+            raise MenuArtifactError(f"items[{i}] is not an object")
+        key = it.get("key")
+        if not isinstance(key, str) or not key or key != key.strip().lower():
+            raise MenuArtifactError(f"items[{i}].key must be a lowercase non-empty string")
+        if key in seen:
+            raise MenuArtifactError(f"items[{i}].key duplicated: {key!r}")
+        seen.add(key)
+        if not isinstance(it.get("name_en"), str) or not it["name_en"].strip():
+            raise MenuArtifactError(f"items[{i}].name_en missing")
+        if not isinstance(it.get("name_ar"), str):
+            raise MenuArtifactError(f"items[{i}].name_ar must be a string")
+        if not isinstance(it.get("price"), (int, float)) or it["price"] < 0:
+            raise MenuArtifactError(f"items[{i}].price must be a non-negative number")
+        if not isinstance(it.get("category"), str):
+            raise MenuArtifactError(f"items[{i}].category must be a string")
+        if it.get("id") is not None and not isinstance(it["id"], int):
+            raise MenuArtifactError(f"items[{i}].id must be an int or null")
+
+    branches = art.get("branches")
+    if not isinstance(branches, list):
+        raise MenuArtifactError("branches must be a list")
+    for i, b in enumerate(branches):
+        if not isinstance(b, dict) or not all(isinstance(b.get(k), str) for k in ("Branch Name", "Address / Area", "Phone Number")):
+            raise MenuArtifactError(f"branches[{i}] is malformed")
+
+
+def write_artifact(art: dict, path: str = COMPILED_FILE) -> None:
+    """Atomic write: other processes never read a half-written file."""
+    validate_artifact(art)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".menu.", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(art, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, path)
+    except Exception:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def read_artifact(path: str = COMPILED_FILE) -> dict | None:
+    try:
+        with open(path, encoding="utf-8") as f:
+            art = json.load(f)
+        validate_artifact(art)
+        return art
+    except FileNotFoundError:
+        return None
+    except (ValueError, OSError) as e:
+        print(f"⚠ Ignoring invalid menu artifact {path}: {e}")
+        return None
+
+
+def load_compiled(menu_file: str = MENU_FILE, branches_file: str = BRANCHES_FILE,
+                  compiled_file: str = COMPILED_FILE, force: bool = False):
+    """Return (menu, branches, version), regenerating the artifact only when the Excel sources changed.
+
+    `version` is stored in the artifact and bumped on every recompile, so every
+    worker that loads the same artifact reports the same menu version.
+    When the Excel files are absent (e.g. a slim deploy), the artifact is used as-is.
+    """
+    prev = read_artifact(compiled_file)
+    art = None if force else prev
+    have_sources = os.path.exists(menu_file)
+
+    if art is not None and have_sources and art.get("source_digest") != source_digest(menu_file, branches_file):
+        print("ℹ Menu artifact is stale; recompiling from Excel.")
+        art = None
+
+    if art is None:
+        if not have_sources:
+            raise MenuArtifactError(f"no valid artifact and no source file at {menu_file}")
+        art = compile_artifact(menu_file, branches_file, version=int((prev or {}).get("version", 0)) + 1)
+        try:
+            write_artifact(art, compiled_file)
+            print(f"✅ Compiled menu artifact -> {compiled_file}")
+        except OSError as e:
+            # Read-only filesystem: still serve the freshly compiled data
+            print(f"⚠ Could not write menu artifact: {e}")
+            validate_artifact(art)
+
+    menu = {}
+    for it in art["items"]:
+        info = dict(it)
+        key = info.pop("key")
+        menu[key] = info
+    return menu, list(art["branches"]), int(art.get("version", 0))
+
+
+if __name__ == "__main__":
+    force = "--force" in sys.argv
+    m, b, v = load_compiled(force=force)
+    print(f"✅ Menu v{v}: {len(m)} menu items, {len(b)} branches in {COMPILED_FILE}")
@@ -0,0 +1,319 @@
+from dataclasses import dataclass
+
+from arabic_text import has_arabic, normalize, norm_text
+from term_matcher import AhoCorasick, is_word_char
+
+
+# =========================================================
+# AHO-CORASICK MENU MENTION EXTRACTOR
+# =========================================================
+@dataclass(frozen=True)
+class Mention:
+    start: int      # span in fold(text)
+    end: int
+    key: str        # MENU key
+    lang: str       # "en" / "ar"
+    kind: str       # "key" (MENU key), "en" (name_en), "ar" (name_ar)
+    text: str       # matched surface form
+
+
+def fold(text: str) -> str:
+    """arabic_text.normalize. Same length as `text` once it is arabic_text.clean()ed,
+    so mention spans can be used on either string."""
+    return normalize(text or "")
+
+
+def _english_forms(name: str):
+    yield name
+    yield name + "s"
+    if name.endswith(("s", "x", "z", "ch", "sh")):
+        yield name + "es"
+
+
+class MenuMatcher(AhoCorasick):
+    """Finds every menu-item mention in one linear pass over the message.
+
+    English forms (name, name+s, name+es) must sit on word boundaries, like the
+    old `\\bname s?\\b` regexes; Arabic forms keep the old containment semantics
+    and are matched on variant-folded text (أ/إ/آ→ا, ة→ه, ى→ي, برغر→برجر).
+    """
+
+    def __init__(self, entries):
+        super().__init__()
+        for e in entries:
+            if e.key.strip():
+                key = fold(e.key.strip())
+                if has_arabic(key):
+                    self._add(key, (e.key, "ar", "key"))
+                else:
+                    for form in _english_forms(key):
+                        self._add(form, (e.key, "en", "key"))
+            if e.en:
+                for form in _english_forms(fold(e.en)):
+                    self._add(form, (e.key, "en", "en"))
+            if e.ar:
+                self._add(fold(e.ar), (e.key, "ar", "ar"))
+        self._build_fail_links()
+
+    def find_all(self, text: str, folded: bool = False) -> list:
+        """All mentions (overlaps included), ordered by start then longest first."""
+        t = text if folded else fold(text)
+        found = []
+        for end, word, (key, lang, kind) in self._scan(t):
+            start = end - len(word)
+            if lang == "en":
+                if start > 0 and is_word_char(t[start - 1]):
+                    continue
+                if end < len(t) and is_word_char(t[end]):
+                    continue
+            found.append(Mention(start, end, key, lang, kind, word))
+        found.sort(key=lambda m: (m.start, -(m.end - m.start)))
+        return found
+
+
+# =========================================================
+# WHATSAPP BUTTON PAGES
+# =========================================================
+WA_BUTTON_TITLE_MAX = 20
+BUTTON_PAGE_SIZE = 2        # items per interactive message (+1 "More" button)
+CATEGORY_PAGE_SIZE = 8      # items per numbered text page
+
+# Mapping from Group ID (used in buttons/UI) -> raw categories in Excel/MENU
+CATEGORY_GROUPS = {
+    "burgers_meals": ["burgers", "meals"],
+    "sandwiches": ["sandwiches"],
+    "snacks_sides": ["sides"],
+    "drinks": ["drinks"],
+    "juices": ["juices"]
+}
+
+# kind -> (id prefix, "More" button id, "More" title per language)
+BUTTON_PICKERS = {
+    "burger": ("pick_burger_", "burger_more", {"en": "More", "ar": "المزيد"}),
+    "sandwich": ("pick_sandwich_", "sand_more", {"en": "More", "ar": "المزيد"}),
+    "item": ("item_", "more_items", {"en": "More items", "ar": "المزيد من الأصناف"}),
+}
+
+
+def wa_button_title(title: str) -> str:
+    title = str(title or "").strip() or "Button"
+    if len(title) > WA_BUTTON_TITLE_MAX:
+        title = title[:WA_BUTTON_TITLE_MAX - 3].rstrip() + "..."
+    return title
+
+
+@dataclass(frozen=True)
+class ButtonPage:
+    start: int          # index of the first item on this page
+    buttons: tuple      # ({"id", "title"}, ...) ready for send_whatsapp_quick_buttons
+    has_more: bool
+
+
+def _build_button_pages(items, kind: str, lang: str) -> tuple:
+    prefix, more_id, more_title = BUTTON_PICKERS[kind]
+    pages = []
+    for start in range(0, len(items), BUTTON_PAGE_SIZE):
+        buttons = []
+        for it in items[start:start + BUTTON_PAGE_SIZE]:
+            title = it["ar"] if lang == "ar" else it["en"].title()
+            buttons.append({"id": f"{prefix}{it['en']}", "title": wa_button_title(title)})
+        has_more = start + BUTTON_PAGE_SIZE < len(items)
+        if has_more:
+            buttons.append({"id": more_id, "title": wa_button_title(more_title[lang])})
+        pages.append(ButtonPage(start, tuple(buttons), has_more))
+    return tuple(pages)
+
+
+# =========================================================
+# MENU INDEX (built once per menu version)
+# =========================================================
+@dataclass(frozen=True)
+class MenuEntry:
+    key: str
+    category: str
+    en: str          # name_en lowercased (display/dedupe form)
+    ar: str          # name_ar lowercased, "" when missing
+    key_norm: str    # normalize(key)
+    en_norm: str     # normalize(name_en or key)
+    ar_norm: str
+    words: frozenset
+
+
+class MenuIndex:
+    """Read-only lookups over one MENU dict.
+
+    Everything the matchers need (normalized EN/AR names, word sets, category
+    buckets, the mention automaton) is computed here once, so per-message
+    helpers never renormalize menu strings.
+    """
+
+    def __init__(self, menu: dict):
+        self.menu = menu
+        entries = []
+        for key, info in menu.items():
+            en = (info.get("name_en") or "").strip().lower()
+            ar = (info.get("name_ar") or "").strip().lower()
+            if ar == "nan":
+                ar = ""
+            en_norm = normalize((info.get("name_en") or key).strip())
+            ar_norm = normalize((info.get("name_ar") or "").strip())
+            entries.append(MenuEntry(
+                key=key,
+                category=(info.get("category") or "").lower(),
+                en=en,
+                ar=ar,
+                key_norm=normalize(key),
+                en_norm=en_norm,
+                ar_norm=ar_norm,
+                words=frozenset(en_norm.split()) | frozenset(ar_norm.split()),
+            ))
+        self.entries = tuple(entries)
+        self.by_key = {e.key: e for e in self.entries}
+        self.position = {e.key: i for i, e in enumerate(self.entries)}
+
+        # Exact normalized EN/AR name -> key (first item in menu order wins)
+        self.exact = {}
+        for e in self.entries:
+            self.exact.setdefault(e.en_norm, e.key)
+            if e.ar_norm:
+                self.exact.setdefault(e.ar_norm, e.key)
+
+        # One entry per distinct English name, menu order
+        seen = set()
+        unique = []
+        for e in self.entries:
+            if e.en and e.en not in seen:
+                seen.add(e.en)
+                unique.append(e)
+        self.unique_entries = tuple(unique)
+        self.key_by_en = {}
+        for e in self.entries:
+            self.key_by_en.setdefault(e.en, e.key)
+
+        # Category buckets: [{"en", "ar"}] unique by English name
+        self.by_category = {}
+        seen_cat = {}
+        for e in self.entries:
+            en = (self.menu[e.key].get("name_en") or e.key).strip().lower()
+            cat = self.menu[e.key].get("category")
+            bucket_seen = seen_cat.setdefault(cat, set())
+            if not en or en in bucket_seen:
+                continue
+            bucket_seen.add(en)
+            ar = (self.menu[e.key].get("name_ar") or en).strip()
+            self.by_category.setdefault(cat, []).append({"en": en, "ar": ar})
+        self.by_category = {c: tuple(v) for c, v in self.by_category.items()}
+
+        # norm_text(name) -> key, as used by the free-text pickers in chat()
+        self.name_to_key = {}
+        self.all_names = set()
+        for key, info in menu.items():
+            for name in (norm_text(info.get("name_en") or ""), norm_text(info.get("name_ar") or "")):
+                if name:
+                    self.all_names.add(name)
+                    self.name_to_key[name] = key
+        self.all_names = frozenset(self.all_names)
+
+        # UI groups (get_items_by_category): [{"en", "ar"}], later duplicates overwrite
+        self.group_items = {}
+        for group in set(CATEGORY_GROUPS) | set(self.by_category):
+            targets = CATEGORY_GROUPS.get(group, [group])
+            items_map = {}
+            for key, info in menu.items():
+                if info.get("category") in targets:
+                    en = (info.get("name_en") or key).strip().lower()
+                    ar = (info.get("name_ar") or en).strip()
+                    items_map[en] = {"en": en, "ar": ar}
+            self.group_items[group] = tuple(items_map.values())
+
+        # Menu keys per category, for the numbered text pages
+        self.keys_by_category = {}
+        for key, info in menu.items():
+            c = (info.get("category") or "").strip().lower()
+            self.keys_by_category.setdefault(c, []).append(key)
+        self.keys_by_category = {c: tuple(v) for c, v in self.keys_by_category.items()}
+
+        # "1) name - price SAR" label per key and language
+        self.page_labels = {}
+        for key, info in menu.items():
+            for lang in ("en", "ar"):
+                nm = (info.get("name_ar") if lang == "ar" else info.get("name_en")) or key
+                price = info.get("price")
+                self.page_labels[(key, lang)] = f"{nm} - {price} SAR" if price is not None else f"{nm}"
+
+        # Pre-rendered interactive button pages per (kind, category, lang)
+        self.button_pages = {}
+        for lang in ("en", "ar"):
+            self.button_pages[("burger", "burgers_meals", lang)] = _build_button_pages(
+                self.items_in_category("burgers_meals"), "burger", lang)
+            self.button_pages[("sandwich", "sandwiches", lang)] = _build_button_pages(
+                self.items_in_category("sandwiches"), "sandwich", lang)
+            for group, items in self.group_items.items():
+                self.button_pages[("item", group, lang)] = _build_button_pages(items, "item", lang)
+        self._text_pages = {}
+
+        # Single-pass mention extractor over every EN/AR name form
+        self.matcher = MenuMatcher(self.entries)
+
+        # Lowercased English names, for intent detection in nlp_utils
+        self.names_en = tuple(str(info.get("name_en") or k).strip().lower() for k, info in menu.items())
+
+    def warm(self) -> "MenuIndex":
+        """Pre-render every unfiltered numbered category page, so nothing is built lazily after fork."""
+        for cat, keys in self.keys_by_category.items():
+            for lang in ("en", "ar"):
+                for page in range((len(keys) + CATEGORY_PAGE_SIZE - 1) // CATEGORY_PAGE_SIZE):
+                    self.category_page(cat, lang, page)
+        return self
+
+    def items_in_category(self, category: str) -> list:
+        return list(self.by_category.get(category, ()))
+
+    def mentions(self, text: str) -> list:
+        return self.matcher.find_all(text)
+
+    def items_for_group(self, group: str) -> list:
+        return list(self.group_items.get(group, ()))
+
+    def button_page(self, kind: str, category: str, lang: str, start: int = 0):
+        """ButtonPage holding items[start:start+2], wrapping to page 0 past the end; None if empty."""
+        lang = "ar" if lang == "ar" else "en"
+        pages = self.button_pages.get((kind, category, lang))
+        if pages is None:
+            pages = _build_button_pages(self.items_for_group(category), kind, lang)
+        if not pages:
+            return None
+        page_no = max(0, start) // BUTTON_PAGE_SIZE
+        return pages[page_no] if page_no < len(pages) else pages[0]
+
+    def category_page(self, cat: str, lang: str, page: int = 0,
+                      page_size: int = CATEGORY_PAGE_SIZE, exclude_items: list = None):
+        """(text, chunk_keys, total) for a numbered category page; cached when nothing is excluded."""
+        lang = "ar" if lang == "ar" else "en"
+        cat = (cat or "").strip().lower()
+        exclude = tuple(sorted({x.lower() for x in (exclude_items or []) if x}))
+        cache_key = (cat, lang, page, page_size, exclude)
+        hit = self._text_pages.get(cache_key)
+        if hit is not None:
+            return hit[0], list(hit[1]), hit[2]
+
+        keys = self.keys_by_category.get(cat, ())
+        if exclude:
+            keys = tuple(k for k in keys if k.lower() not in exclude)
+        if not keys:
+            return None, None, 0
+
+        start = page * page_size
+        chunk = list(keys[start:start + page_size])
+        lines = [f"{i}) {self.page_labels[(key, lang)]}" for i, key in enumerate(chunk, start=1)]
+
+        has_more = (start + page_size) < len(keys)
+        if lang == "ar":
+            footer = "\n\nاكتب الرقم أو الاسم. واكتب (more) لعرض المزيد." if has_more else "\n\nاكتب الرقم أو الاسم."
+        else:
+            footer = "\n\nType the number or name. Type (more) for next." if has_more else "\n\nType the number or name."
+
+        text = "\n".join(lines) + footer
+        if not exclude and chunk:
+            self._text_pages[cache_key] = (text, tuple(chunk), len(keys))
+        return text, chunk, len(keys)
@@ -0,0 +1,388 @@
+import contextvars
+import functools
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence, Set
+from dataclasses import dataclass, field
+
+from menu_index import MenuIndex
+
+
+# =========================================================
+# MENU SNAPSHOT (immutable, versioned)
+# =========================================================
+@dataclass(frozen=True)
+class MenuSnapshot:
+    """One fully built view of Menu.xlsx + Branches.xlsx.
+
+    A snapshot is never mutated after it is published; a reload builds a new
+    one and swaps the reference, so readers always see a consistent set.
+    """
+    version: int
+    signature: tuple
+    digest: str
+    menu: dict
+    branches: list
+    index: MenuIndex
+    built_at: float = field(default_factory=time.time)
+    # name -> value built from this snapshot once (prompt blocks, ...); see derived()
+    _derived: dict = field(default_factory=dict, repr=False, compare=False)
+
+    def derived(self, name: str, build):
+        """`build(self)`, computed once per snapshot and shared by every later call."""
+        try:
+            return self._derived[name]
+        except KeyError:
+            pass
+        return self._derived.setdefault(name, build(self))
+
+    @property
+    def name_to_key(self) -> dict:
+        return self.index.name_to_key
+
+    @property
+    def all_names_lower(self) -> frozenset:
+        return self.index.all_names
+
+
+def _file_signature(paths) -> tuple:
+    sig = []
+    for p in paths:
+        try:
+            st = os.stat(p)
+            sig.append((p, st.st_mtime_ns, st.st_size))
+        except OSError:
+            sig.append((p, None, None))
+    return tuple(sig)
+
+
+def _file_digest(paths) -> str:
+    h = hashlib.sha1()
+    for p in paths:
+        h.update(p.encode("utf-8"))
+        try:
+            with open(p, "rb") as f:
+                for chunk in iter(lambda: f.read(65536), b""):
+                    h.update(chunk)
+        except OSError:
+            h.update(b"<missing>")
+    return h.hexdigest()
+
+
+class MenuStore:
+    """Holds the current MenuSnapshot and rebuilds it when the source files change.
+
+    `builder()` returns (menu, branches) or (menu, branches, version); the
+    MenuIndex is built here. Change detection is cheap (os.stat, at most every
+    `check_interval` seconds); the content hash is only computed when mtime/size
+    moved, so a plain `touch` does not trigger a rebuild.
+
+    With `start_watcher()` the checks and rebuilds run on a background thread,
+    and `current()` never touches the filesystem on the request path.
+    """
+
+    def __init__(self, paths, builder, check_interval: float = 2.0):
+        self.paths = list(paths)
+        self.builder = builder
+        self.check_interval = check_interval
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._last_check = 0.0
+        self._rejected_signature = None
+        self._watcher = None
+
+    def current(self) -> MenuSnapshot:
+        snap = self._snapshot
+        if snap is None:
+            return self.reload()
+        if self._watcher is not None:
+            return snap
+        return self.refresh()
+
+    def refresh(self) -> MenuSnapshot:
+        """Rebuild if the files changed since the last check (rate-limited)."""
+        snap = self._snapshot
+        now = time.monotonic()
+        if snap is not None and now - self._last_check < self.check_interval:
+            return snap
+        self._last_check = now
+
+        if snap is None or self._changed(snap):
+            return self.reload()
+        return snap
+
+    def _changed(self, snap: MenuSnapshot) -> bool:
+        sig = _file_signature(self.paths)
+        return sig != snap.signature and sig != self._rejected_signature
+
+    def reload(self, force: bool = False) -> MenuSnapshot:
+        """Build and publish a new snapshot. On any failure the old one keeps serving."""
+        with self._lock:
+            old = self._snapshot
+            sig = _file_signature(self.paths)
+            if old is not None and not force and sig == old.signature:
+                return old
+
+            digest = _file_digest(self.paths)
+            if old is not None and not force and digest == old.digest:
+                # Same bytes, new mtime: keep the built data, remember the new stat.
+                self._snapshot = MenuSnapshot(
+                    version=old.version,
+                    signature=sig,
+                    digest=digest,
+                    menu=old.menu,
+                    branches=old.branches,
+                    index=old.index,
+                    built_at=old.built_at,
+                    _derived=old._derived,
+                )
+                return self._snapshot
+
+            t0 = time.perf_counter()
+            version = None
+            try:
+                built = self.builder()
+                menu, branches = built[0], built[1]
+                if len(built) > 2:
+                    version = built[2]
+                if not menu:
+                    raise ValueError("menu is empty")
+                index = MenuIndex(menu)
+            except Exception as e:
+                self.last_error = repr(e)
+                self._rejected_signature = sig
+                if old is not None:
+                    print(f"❌ Menu reload rejected ({e!r}); keeping version {old.version}")
+                    return old
+                print("❌ Menu snapshot build failed:", repr(e))
+                menu, branches, index = {}, [], MenuIndex({})
+
+            if version is None:
+                version = (old.version + 1) if old is not None else 1
+
+            snap = MenuSnapshot(
+                version=version,
+                # Taken after the build: the builder may rewrite files it also watches
+                signature=_file_signature(self.paths),
+                digest=_file_digest(self.paths),
+                menu=menu,
+                branches=branches,
+                index=index,
+            )
+            # Single reference assignment: readers see either the old or the new snapshot.
+            self._snapshot = snap
+            self._last_check = time.monotonic()
+            if menu:
+                self.last_error = None
+            print(
+                f"✅ Menu snapshot v{snap.version} ready "
+                f"({len(menu)} items, {len(branches)} branches, {(time.perf_counter() - t0) * 1000:.0f} ms)"
+            )
+            return snap
+
+    def start_watcher(self, interval: float = None):
+        """Poll the source files on a daemon thread and swap in new snapshots off the request path."""
+        if self._watcher is not None and self._watcher.is_alive():
+            return self._watcher
+        if interval is not None:
+            self.check_interval = interval
+
+        def loop():
+            print(f"🔄 Menu watcher started (checks every {self.check_interval:g} seconds)")
+            while True:
+                time.sleep(self.check_interval)
+                try:
+                    snap = self._snapshot
+                    if snap is None or self._changed(snap):
+                        self.reload()
+                except Exception as e:
+                    print(f"❌ Menu watcher error: {repr(e)}")
+
+        self._watcher = threading.Thread(target=loop, daemon=True)
+        self._watcher.start()
+        return self._watcher
+
+
+# =========================================================
+# DEFAULT STORE (shared by app.py and nlp_utils.py)
+# =========================================================
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def get_store() -> MenuStore:
+    """Process-wide store over data/Menu.xlsx + data/Branches.xlsx (compiled artifact)."""
+    global _default_store
+    if _default_store is None:
+        with _default_lock:
+            if _default_store is None:
+                import menu_build
+                _default_store = MenuStore(
+                    [menu_build.MENU_FILE, menu_build.BRANCHES_FILE, menu_build.COMPILED_FILE],
+                    menu_build.load_compiled,
+                )
+    return _default_store
+
+
+# =========================================================
+# TENANTS (one menu per WhatsApp phone_number_id)
+# =========================================================
+_TENANT_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class MenuRegistry:
+    """Menu stores keyed by tenant (the WhatsApp `phone_number_id` a message arrived on).
+
+    A tenant is a folder `tenants_dir/<tenant_id>/` holding its own Menu.xlsx
+    (and optionally Branches.xlsx; the shared one is used otherwise). Its store
+    is built on the first message for that tenant, and at most `max_tenants`
+    stores are kept: the least recently used one is dropped and simply rebuilt
+    from its compiled artifact if that tenant writes again.
+
+    Unknown or missing tenant ids are served by `default` (data/Menu.xlsx).
+    Tenant stores have no watcher thread; they re-check their files on use.
+    """
+
+    def __init__(self, tenants_dir: str, default: MenuStore, max_tenants: int = 8,
+                 check_interval: float = 5.0):
+        self.tenants_dir = tenants_dir
+        self.default = default
+        self.max_tenants = max(1, int(max_tenants))
+        self.check_interval = check_interval
+        self._stores = OrderedDict()   # tenant_id -> MenuStore, most recently used last
+        self._lock = threading.Lock()
+
+    def tenant_dir(self, tenant_id) -> str | None:
+        tenant_id = str(tenant_id or "").strip()
+        if not _TENANT_ID_RE.match(tenant_id):
+            return None
+        d = os.path.join(self.tenants_dir, tenant_id)
+        return d if os.path.isdir(d) else None
+
+    def _make_store(self, d: str) -> MenuStore:
+        import menu_build
+        menu_file = os.path.join(d, "Menu.xlsx")
+        branches_file = os.path.join(d, "Branches.xlsx")
+        if not os.path.exists(branches_file):
+            branches_file = menu_build.BRANCHES_FILE
+        compiled_file = os.path.join(d, "menu.compiled.json")
+        return MenuStore(
+            [menu_file, branches_file, compiled_file],
+            functools.partial(menu_build.load_compiled, menu_file, branches_file, compiled_file),
+            check_interval=self.check_interval,
+        )
+
+    def store_for(self, tenant_id) -> MenuStore:
+        d = self.tenant_dir(tenant_id)
+        if d is None:
+            return self.default
+        tenant_id = str(tenant_id).strip()
+        with self._lock:
+            store = self._stores.get(tenant_id)
+            if store is not None:
+                self._stores.move_to_end(tenant_id)
+                return store
+            store = self._make_store(d)
+            self._stores[tenant_id] = store
+            while len(self._stores) > self.max_tenants:
+                evicted, _ = self._stores.popitem(last=False)
+                print(f"ℹ Menu registry: evicted tenant {evicted} (max {self.max_tenants})")
+            return store
+
+    def snapshot_for(self, tenant_id) -> MenuSnapshot:
+        return self.store_for(tenant_id).current()
+
+    def loaded(self) -> list:
+        with self._lock:
+            return list(self._stores)
+
+
+# =========================================================
+# ACTIVE SNAPSHOT (per request / thread)
+# =========================================================
+_ACTIVE = contextvars.ContextVar("active_menu_snapshot", default=None)
+
+
+def activate(snap: MenuSnapshot | None) -> MenuSnapshot | None:
+    """Make `snap` the menu the current request/thread reads (None = default store)."""
+    _ACTIVE.set(snap)
+    return snap
+
+
+def active_snapshot() -> MenuSnapshot:
+    return _ACTIVE.get() or get_store().current()
+
+
+def current_index() -> MenuIndex:
+    return active_snapshot().index
+
+
+class _ActiveView:
+    """Read-only stand-in for one field of the active snapshot.
+
+    app.py keeps its module-level MENU / BRANCHES / NAME_TO_KEY names, but each
+    access resolves against the snapshot activated for this request, so two
+    tenants served by different threads never see each other's menu.
+    """
+    __slots__ = ("_field",)
+
+    def __init__(self, field_name: str):
+        self._field = field_name
+
+    def _target(self):
+        return getattr(active_snapshot(), self._field)
+
+    def __len__(self):
+        return len(self._target())
+
+    def __iter__(self):
+        return iter(self._target())
+
+    def __contains__(self, item):
+        return item in self._target()
+
+    def __repr__(self):
+        return f"<active {self._field}: {self._target()!r}>"
+
+
+class ActiveMapping(_ActiveView, Mapping):
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        return self._target()[key]
+
+    def get(self, key, default=None):
+        return self._target().get(key, default)
+
+    def keys(self):
+        return self._target().keys()
+
+    def values(self):
+        return self._target().values()
+
+    def items(self):
+        return self._target().items()
+
+
+class ActiveSequence(_ActiveView, Sequence):
+    __slots__ = ()
+
+    def __getitem__(self, i):
+        return self._target()[i]
+
+
+class ActiveSet(_ActiveView, Set):
+    __slots__ = ()
+
+
+class ActiveIndex:
+    """Attribute proxy for the active snapshot's MenuIndex."""
+    __slots__ = ()
+
+    def __getattr__(self, name):
+        return getattr(active_snapshot().index, name)
@@ -0,0 +1,153 @@
+"""Per-message analysis, computed once and shared by every helper.
+
+One inbound message goes through chat() / whatsapp_webhook and a few dozen
+helpers (is_cancel_text, looks_like_multi_item_text, find_menu_item, ...),
+most of them with the very same text. A MessageAnalysis holds the lowercased
+and normalized forms, tokens, digit spans, menu mentions, quantity candidates,
+language, intent and blocklist hit for one text, each computed on first use.
+
+Helpers decorated with `per_message` are memoized on the analysis of their
+text argument for the lifetime of the current request scope (`begin()`).
+Outside a scope (unit tests, scripts) they simply run.
+"""
+import re
+from contextvars import ContextVar
+from functools import cached_property, wraps
+
+import arabic_text
+import nlp_utils
+import quantity
+from menu_store import current_index
+
+_DIGITS_RE = re.compile(r"\d+")
+
+# Distinct texts analyzed per request; helpers on split parts add a few each
+MAX_PER_SCOPE = 256
+
+# text -> MessageAnalysis for the current request (None outside a request)
+_SCOPE = ContextVar("message_analysis_scope", default=None)
+
+
+class MessageAnalysis:
+    """Lazily computed views of one text. Every attribute is computed once."""
+
+    # TermMatcher for blocklist_hit (app.py sets IRRELEVANT_MATCHER)
+    blocklist = None
+
+    def __init__(self, text: str):
+        self.raw = text or ""
+        self._memo = {}
+
+    @cached_property
+    def lower(self) -> str:
+        return self.raw.lower()
+
+    @cached_property
+    def clean(self) -> str:
+        """Stripped, lowercased, Western digits, no tatweel/diacritics."""
+        return arabic_text.clean(self.raw.strip().lower())
+
+    @cached_property
+    def normalized(self) -> str:
+        """clean + Arabic letter folding (what the menu index matches against)."""
+        return arabic_text.fold(self.clean)
+
+    @cached_property
+    def tokens(self) -> tuple:
+        return tuple(self.clean.split())
+
+    @cached_property
+    def digit_spans(self) -> tuple:
+        """(start, end, value) of every digit run in `clean`."""
+        return tuple((m.start(), m.end(), int(m.group())) for m in _DIGITS_RE.finditer(self.clean))
+
+    @cached_property
+    def mentions(self) -> list:
+        """Menu mentions in `clean` (spans are valid on `clean`)."""
+        return current_index().mentions(self.clean)
+
+    @cached_property
+    def quantities(self) -> tuple:
+        """quantity.Quantity for every digit, number word and Arabic dual (see quantity.scan)."""
+        return quantity.scan(self.raw)
+
+    @cached_property
+    def has_arabic(self) -> bool:
+        return arabic_text.has_arabic(self.raw)
+
+    @cached_property
+    def language(self) -> str:
+        return nlp_utils.detect_language(self.raw)
+
+    @cached_property
+    def intent(self) -> str:
+        return nlp_utils.detect_intent(self.raw)
+
+    @cached_property
+    def blocklist_hit(self):
+        """First IRRELEVANT_TERMS / ABUSE_BLOCKLIST hit (TermHit) in the lowercased text, or None."""
+        if self.blocklist is None:
+            return None
+        return self.blocklist.first(self.raw.strip().lower())
+
+    def memo(self, fn, *args, **kwargs):
+        """fn(self.raw, *args, **kwargs), computed once per analysis."""
+        key = (fn, args, tuple(sorted(kwargs.items())))
+        try:
+            return self._memo[key]
+        except KeyError:
+            value = self._memo[key] = fn(self.raw, *args, **kwargs)
+            return value
+
+
+# =========================================================
+# REQUEST SCOPE
+# =========================================================
+def begin():
+    """Start a fresh scope (one per request; reused threads must not see old messages)."""
+    _SCOPE.set({})
+
+
+def end():
+    _SCOPE.set(None)
+
+
+def analyze(text: str) -> MessageAnalysis:
+    """The analysis of `text`: shared within the current scope, fresh outside one."""
+    text = text or ""
+    scope = _SCOPE.get()
+    if scope is None:
+        return MessageAnalysis(text)
+    a = scope.get(text)
+    if a is None:
+        a = MessageAnalysis(text)
+        if len(scope) < MAX_PER_SCOPE:
+            scope[text] = a
+    return a
+
+
+def remember(fn, text: str, value, *args, **kwargs):
+    """Record that `fn(text, *args)` is `value` for the rest of the current scope.
+
+    For results known without calling `fn`, e.g. corrected text corrects to
+    itself. No-op outside a scope.
+    """
+    if _SCOPE.get() is None:
+        return
+    fn = getattr(fn, "__wrapped__", fn)
+    analyze(text)._memo[(fn, args, tuple(sorted(kwargs.items())))] = value
+
+
+def per_message(fn):
+    """Memoize a pure `fn(text, *args)` on the analysis of `text` in the current scope.
+
+    Only for helpers that return immutable values and depend on nothing but
+    their arguments and the active menu (which is fixed for a request).
+    """
+    @wraps(fn)
+    def wrapper(text, *args, **kwargs):
+        if _SCOPE.get() is None:
+            return fn(text, *args, **kwargs)
+        return analyze(text).memo(fn, *args, **kwargs)
+
+    return wrapper
@@ -4,9 +4,11 @@
 # -----------------------------
 import os
 import re
-from difflib import get_close_matches
-
-import pandas as pd
+import weakref
+import arabic_text
+import fuzzy
+from menu_store import current_index
+from spell import Speller
 
 # -----------------------------
 # Paths
@@ -304,7 +306,7 @@ TYPO_CORRECTIONS = {
     "burgrer": "burger", "burgerr": "burger", "burrger": "burger", "buregr": "burger",
     "bruger": "burger", "brugr": "burger", "burher": "burger", "burgee": "burger",
     "buerger": "burger", "burgerd": "burger", "baerger": "burger", "burfer": "burger",
-    "bergur": "burger", "burgar's": "burger", "burgers": "burger",
+    "bergur": "burger", "burgar's": "burger", "burgers": "burger", "burgur": "burger",
     
     # ===== CHICKEN TYPOS =====
     "chicekn": "chicken", "chiken": "chicken", "chicke": "chicken", "chickn": "chicken",
@@ -314,7 +316,7 @@ TYPO_CORRECTIONS = {
     "chickon": "chicken", "ciken": "chicken", "chekcin": "chicken", "chikin": "chicken",
     "chickan": "chicken", "chckin": "chicken", "chickeen": "chicken", "chckn": "chicken",
     "chikenn": "chicken", "chckien": "chicken", "chiccken": "chicken", "shiken": "chicken",
-    "chickn": "chicken", "chekin": "chicken", "chkin": "chicken",
+    "chickn": "chicken", "chekin": "chicken", "chkin": "chicken", "checken": "chicken",
     
     # ===== BEEF TYPOS =====
     "beaf": "beef", "beeff": "beef", "beff": "beef", "beeef": "beef", "beaf": "beef",
@@ -341,6 +343,7 @@ TYPO_CORRECTIONS = {
     "totrilla": "tortilla", "tortiglia": "tortilla", "totilla": "tortilla",
     "tortella": "tortilla", "tortiia": "tortilla", "trtilla": "tortilla",
     "tortya": "tortilla", "turtilla": "tortilla", "tortiyya": "tortilla",
+    "wrasp": "wraps",
     
     # ===== SANDWICH TYPOS =====
     "sandwhich": "sandwich", "sandwitch": "sandwich", "sanwich": "sandwich",
@@ -352,6 +355,7 @@ TYPO_CORRECTIONS = {
     "sandwhichh": "sandwich", "sandwedge": "sandwich", "sandich": "sandwich",
     "sanwitch": "sandwich", "sandiwich": "sandwich", "snwich": "sandwich",
     "sandwitxh": "sandwich", "sanwdwich": "sandwich", "sandwitch": "sandwich",
+    "sandwish": "sandwich",
     
     # ===== JUICE TYPOS =====
     "jucie": "juice", "juce": "juice", "juic": "juice", "jucei": "juice",
@@ -364,6 +368,7 @@ TYPO_CORRECTIONS = {
     "pepci": "pepsi", "pespi": "pepsi", "bepsi": "pepsi", "bebsi": "pepsi",
     "bebbsi": "pepsi", "pepsy": "pepsi", "pepsie": "pepsi", "pepsei": "pepsi",
     "pepsii": "pepsi", "pepsey": "pepsi", "pipsee": "pepsi", "peepsi": "pepsi",
+    "pepi": "pepsi",
     
     # ===== ZINGER TYPOS =====
     "zingr": "zinger", "zinegr": "zinger", "zenge": "zinger", "zingger": "zinger",
@@ -568,9 +573,116 @@ TYPO_CORRECTIONS_AR = {
 }
 
 # ============================================
-# TYPO CORRECTION FUNCTION
+# PHRASE CORRECTIONS (applied after word-level fixes)
+# ============================================
+
+PHRASE_CORRECTIONS = {
+    # English phrases
+    "i wnat to order": "i want to order",
+    "i wan order": "i want to order",
+    "show menue": "show menu",
+    "can i oder": "can i order",
+    "cancle order": "cancel order",
+    "cancle my order": "cancel my order",
+    "finsh order": "finish order",
+    "chiken burger": "chicken burger",
+    "beff burger": "beef burger",
+    "french fris": "french fries",
+    "french fry": "french fries",
+    "onon ring": "onion rings",
+    "onon rings": "onion rings",
+    "hot dgo": "hot dog",
+    # Arabic phrases
+    "ابغا اطلب": "ابغى اطلب",
+    "ابي اطلب": "ابغى اطلب",
+    "وريني المنيوو": "وريني المنيو",
+    "الغي الطلب": "الغاء الطلب",
+}
+
+# ============================================
+# TYPO CORRECTION ENGINE
 # ============================================
 
+_NON_WORD_RE = re.compile(r'[^\w\u0600-\u06FF]')
+_ARABIC_RE = re.compile(r"[\u0600-\u06FF]")
+
+
+def _is_core_char(c: str) -> bool:
+    return c.isalnum() or '\u0600' <= c <= '\u06FF'
+
+
+class TypoEngine:
+    """Word + phrase typo corrections, compiled once.
+
+    Word pass: the message is lowercased and split once; each token is looked
+    up (punctuation stripped) in the EN map, or the merged EN+AR map for Arabic
+    text. Phrase pass: every phrase is found by one case-insensitive regex
+    (longest first), optionally on word boundaries.
+
+    `correct()` returns the text and the list of (wrong, right) that fired.
+    """
+
+    def __init__(self, words_en: dict = None, words_ar: dict = None,
+                 phrases: dict = None, phrase_boundaries: bool = False):
+        self.words_en = dict(words_en or {})
+        self.words_all = {**self.words_en, **(words_ar or {})}
+        self.has_words = bool(self.words_all)
+        self.phrases = {k.lower(): v for k, v in (phrases or {}).items()}
+        self._phrase_re = None
+        if self.phrases:
+            alts = "|".join(re.escape(k) for k in sorted(self.phrases, key=len, reverse=True))
+            pattern = rf"\b(?:{alts})\b" if phrase_boundaries else alts
+            self._phrase_re = re.compile(pattern, re.IGNORECASE)
+
+    def correct_words(self, text: str, language: str = "auto", fired: list = None) -> str:
+        if language == "auto":
+            language = "ar" if _ARABIC_RE.search(text) else "en"
+        table = self.words_all if language == "ar" else self.words_en
+
+        out = []
+        for word in text.lower().split():
+            word_clean = _NON_WORD_RE.sub('', word) if _NON_WORD_RE.search(word) else word
+            right = table.get(word_clean)
+            if right is None:
+                out.append(word)
+                continue
+            # Preserve any punctuation around the word
+            i = 0
+            while i < len(word) and not _is_core_char(word[i]):
+                i += 1
+            j = len(word)
+            while j > 0 and not _is_core_char(word[j - 1]):
+                j -= 1
+            out.append(word[:i] + right + word[j:])
+            if fired is not None:
+                fired.append((word_clean, right))
+        return " ".join(out)
+
+    def correct_phrases(self, text: str, fired: list = None) -> str:
+        if self._phrase_re is None:
+            return text
+
+        def fix(m):
+            wrong = m.group(0).lower()
+            if fired is not None:
+                fired.append((wrong, self.phrases[wrong]))
+            return self.phrases[wrong]
+
+        return self._phrase_re.sub(fix, text)
+
+    def correct(self, text: str, language: str = "auto"):
+        """(corrected text, [(wrong, right), ...]) for one message."""
+        fired = []
+        if not text:
+            return text, fired
+        if self.has_words:
+            text = self.correct_words(text, language, fired)
+        return self.correct_phrases(text, fired), fired
+
+
+TYPO_ENGINE = TypoEngine(TYPO_CORRECTIONS, TYPO_CORRECTIONS_AR, PHRASE_CORRECTIONS)
+
+
 def correct_typos(text: str, language: str = "auto") -> str:
     """
     Correct common typos in user input.
@@ -584,87 +696,21 @@ def correct_typos(text: str, language: str = "auto") -> str:
     """
     if not text:
         return text
-    
-    # Auto-detect language if needed
-    if language == "auto":
-        if re.search(r"[\u0600-\u06FF]", text):
-            language = "ar"
-        else:
-            language = "en"
-    
-    text_lower = text.lower()
-    words = text_lower.split()
-    corrected_words = []
-    
-    # Choose the appropriate dictionary
-    typo_dict = TYPO_CORRECTIONS_AR if language == "ar" else TYPO_CORRECTIONS
-    
-    # Also apply English corrections to Arabic text (for transliterated words)
-    combined_dict = {**TYPO_CORRECTIONS, **TYPO_CORRECTIONS_AR} if language == "ar" else TYPO_CORRECTIONS
-    
-    for word in words:
-        # Remove punctuation for matching
-        word_clean = re.sub(r'[^\w\u0600-\u06FF]', '', word)
-        
-        if word_clean in combined_dict:
-            # Preserve any punctuation
-            prefix = ""
-            suffix = ""
-            for i, c in enumerate(word):
-                if c.isalnum() or '\u0600' <= c <= '\u06FF':
-                    break
-                prefix += c
-            for i, c in enumerate(reversed(word)):
-                if c.isalnum() or '\u0600' <= c <= '\u06FF':
-                    break
-                suffix = c + suffix
-            
-            corrected_words.append(prefix + combined_dict[word_clean] + suffix)
-        else:
-            corrected_words.append(word)
-    
-    return " ".join(corrected_words)
-
-
-def correct_typos_advanced(text: str) -> str:
+    return TYPO_ENGINE.correct_words(text, language)
+
+
+def correct_typos_advanced(text: str, fired: list = None) -> str:
     """
     Advanced typo correction that also handles multi-word corrections
     and context-aware fixes.
+
+    Pass a list as `fired` to collect the (wrong, right) corrections applied.
     """
     if not text:
         return text
-    
-    # First, do basic word-level correction
-    corrected = correct_typos(text, "auto")
-    
-    # Then check for multi-word patterns (phrases that need fixing)
-    phrase_corrections = {
-        # English phrases
-        "i wnat to order": "i want to order",
-        "i wan order": "i want to order",
-        "show menue": "show menu",
-        "can i oder": "can i order",
-        "cancle order": "cancel order",
-        "cancle my order": "cancel my order",
-        "finsh order": "finish order",
-        "chiken burger": "chicken burger",
-        "beff burger": "beef burger",
-        "french fris": "french fries",
-        "hot dgo": "hot dog",
-        # Arabic phrases
-        "ابغا اطلب": "ابغى اطلب",
-        "ابي اطلب": "ابغى اطلب",
-        "وريني المنيوو": "وريني المنيو",
-        "الغي الطلب": "الغاء الطلب",
-    }
-    
-    corrected_lower = corrected.lower()
-    for wrong, right in phrase_corrections.items():
-        if wrong in corrected_lower:
-            # Case-insensitive replacement
-            pattern = re.compile(re.escape(wrong), re.IGNORECASE)
-            corrected = pattern.sub(right, corrected)
-    
+    corrected, hits = TYPO_ENGINE.correct(text)
+    if fired is not None:
+        fired.extend(hits)
     return corrected
 
 
@@ -690,49 +736,104 @@ INTENTS = {
               "غبي", "تافه", "لعنة", "اخرس"],
 }
 
-# --- Load Menu Items from Excel ---
-def load_menu_items():
-    """
-    Load English item names from the same Excel file the main app uses.
-    This is only for intent detection (is this message probably a menu item?).
-    """
-    try:
-        df_raw = pd.read_excel(MENU_FILE, header=None, sheet_name=0)
+# ============================================
+# COMPILED INTENT ENGINE
+# ============================================
+
+_PUNCT_RE = re.compile(r'[^\w\s\u0600-\u06FF]')
+
+
+def _clean_for_match(text: str) -> str:
+    """Lowercase text with punctuation removed (what detect_intent compares against)."""
+    return _PUNCT_RE.sub('', arabic_text.clean(text)).strip()
+
 
-        header_row_index = None
-        for i, row in df_raw.iterrows():
-            row_text = " ".join([str(x).strip().lower() for x in row.values if str(x) != "nan"])
-            if any(k in row_text for k in ("name_en", "english", "item")):
-                header_row_index = i
-                break
+def _any_of(patterns) -> re.Pattern:
+    """One regex that finds any of the literal `patterns` as a substring."""
+    literals = sorted({arabic_text.clean(p) for p in patterns}, key=len, reverse=True)
+    return re.compile("|".join(re.escape(p) for p in literals))
 
-        if header_row_index is None:
-            print("⚠ Could not find header row with name_en/english/item in menu Excel.")
-            return []
 
-        df = pd.read_excel(MENU_FILE, header=header_row_index, sheet_name=0)
-        df.columns = [str(c).strip().lower() for c in df.columns]
+class IntentEngine:
+    """detect_intent's pattern tables, normalized and compiled once at import.
 
-        english_col = next(
-            (c for c in df.columns if c == "name_en" or "english" in c or "item" in c),
-            None,
+    Each priority tier is a single regex over all of its patterns, so a message
+    costs one scan per tier instead of one substring test per pattern. Tiers are
+    checked in detect_intent's original order, so the precedence is unchanged.
+    """
+
+    def __init__(self):
+        # "hi" / "hi there": exact cleaned greeting, or one followed by a space
+        self.greetings = frozenset(
+            _clean_for_match(p.lower()) for p in GREETING_PATTERNS + GREETING_PATTERNS_AR
         )
-        if not english_col:
-            english_col = df.columns[0]
-            print("⚠ Could not find explicit English/item column; using first column instead.")
+        # (intent, regex, matched against cleaned text?) -- steps 2-6 of detect_intent
+        self.tiers = [
+            ("cancel", _any_of(p.lower() for p in CANCEL_ORDER_PATTERNS + CANCEL_ORDER_PATTERNS_AR), False),
+            ("finish", _any_of(p.lower() for p in FINISH_ORDER_PATTERNS + FINISH_ORDER_PATTERNS_AR), False),
+            ("delivery", _any_of(p.lower() for p in DELIVERY_PATTERNS + DELIVERY_PATTERNS_AR), False),
+            ("order_start", _any_of(p.lower() for p in ORDER_INTENT_PATTERNS + ORDER_INTENT_PATTERNS_AR), False),
+            ("menu", _any_of(_clean_for_match(p.lower()) for p in MENU_BROWSING_PATTERNS + MENU_BROWSING_PATTERNS_AR), True),
+            ("browse_category", _any_of(
+                kw.lower() for data in CATEGORY_KEYWORDS.values() for kw in data["keywords"]), False),
+        ]
+        # step 8: the remaining INTENTS, in dict order
+        self.late_tiers = [
+            (intent, _any_of(kw.lower() for kw in keywords))
+            for intent, keywords in INTENTS.items()
+            if intent not in ("greeting", "menu", "order_start", "cancel", "finish")
+        ]
+        # detect_category_from_text: first category (dict order) with a keyword hit
+        self.categories = [
+            (data["category_id"], _any_of(kw.lower() for kw in data["keywords"]))
+            for data in CATEGORY_KEYWORDS.values()
+        ]
+
+    def is_greeting(self, text_clean: str) -> bool:
+        if text_clean in self.greetings:
+            return True
+        i = text_clean.find(" ")
+        while i != -1:
+            if text_clean[:i] in self.greetings:
+                return True
+            i = text_clean.find(" ", i + 1)
+        return False
+
+    def keyword_intent(self, text_lower: str, text_clean: str) -> str | None:
+        for intent, rx, on_clean in self.tiers:
+            if rx.search(text_clean if on_clean else text_lower):
+                return intent
+        return None
+
+    def other_intent(self, text_lower: str) -> str | None:
+        for intent, rx in self.late_tiers:
+            if rx.search(text_lower):
+                return intent
+        return None
+
+    def category(self, text_lower: str) -> str | None:
+        for category_id, rx in self.categories:
+            if rx.search(text_lower):
+                return category_id
+        return None
+
+
+INTENT_ENGINE = IntentEngine()
 
-        items = [str(x).strip().lower() for x in df[english_col].dropna()]
-        print(f"✅ nlp_utils: loaded {len(items)} menu items for intent detection.")
-        return items
 
+# --- Menu Items (shared MenuIndex, see menu_store.py) ---
+def load_menu_items():
+    """
+    English item names from the same menu snapshot the main app uses.
+    This is only for intent detection (is this message probably a menu item?).
+    """
+    try:
+        return list(current_index().names_en)
     except Exception as e:
         print("⚠ Menu load failed in nlp_utils:", e)
         return []
 
 
-MENU_ITEMS = load_menu_items()
-
-
 # ============================================
 # FUZZY MATCHING (Levenshtein Distance)
 # ============================================
@@ -759,25 +860,8 @@ def levenshtein_distance(s1: str, s2: str) -> int:
 
 
 def fuzzy_match(text: str, patterns: list, threshold: float = 0.7) -> bool:
-    """Check if text matches any pattern with fuzzy matching."""
-    text_lower = text.lower().strip()
-    
-    for pattern in patterns:
-        pattern_lower = pattern.lower().strip()
-        
-        # Exact match
-        if text_lower == pattern_lower or pattern_lower in text_lower:
-            return True
-        
-        # Fuzzy match using Levenshtein
-        if len(text_lower) > 2 and len(pattern_lower) > 2:
-            max_len = max(len(text_lower), len(pattern_lower))
-            distance = levenshtein_distance(text_lower, pattern_lower)
-            similarity = 1 - (distance / max_len)
-            if similarity >= threshold:
-                return True
-    
-    return False
+    """Check if text matches any pattern with fuzzy matching (bounded, see fuzzy.py)."""
+    return fuzzy.fuzzy_match(text, patterns, threshold)
 
 
 # ============================================
@@ -807,69 +891,41 @@ def detect_intent(text: str) -> str:
         return "unknown"
     
     # Apply typo correction first
-    text_corrected = correct_typos_advanced(text)
-    text_lower = text_corrected.lower().strip()
+    typo_fixes = []
+    text_corrected = correct_typos_advanced(text, typo_fixes)
+    if typo_fixes:
+        print("🔤 Typo fixes:", ", ".join(f"{w!r}->{r!r}" for w, r in typo_fixes))
+    text_lower = arabic_text.clean(text_corrected.lower()).strip()
     
     # Remove punctuation for matching
-    text_clean = re.sub(r'[^\w\s\u0600-\u06FF]', '', text_lower).strip()
+    text_clean = _clean_for_match(text_lower)
     
     # 1) Check for greeting patterns first (highest priority for simple greetings)
     # Only match as greeting if it's a short message or explicit greeting
     if len(text_clean.split()) <= 5:
-        for pattern in GREETING_PATTERNS + GREETING_PATTERNS_AR:
-            pattern_clean = re.sub(r'[^\w\s\u0600-\u06FF]', '', pattern.lower()).strip()
-            if text_clean == pattern_clean or text_clean.startswith(pattern_clean + " "):
-                return "greeting"
+        if INTENT_ENGINE.is_greeting(text_clean):
+            return "greeting"
         
         # Fuzzy match for greetings with typos
         if fuzzy_match(text_clean, GREETING_PATTERNS[:20], threshold=0.8):
             return "greeting"
     
-    # 2) Check for cancel patterns
-    for pattern in CANCEL_ORDER_PATTERNS + CANCEL_ORDER_PATTERNS_AR:
-        if pattern.lower() in text_lower:
-            return "cancel"
-    
-    # 3) Check for finish/checkout patterns
-    for pattern in FINISH_ORDER_PATTERNS + FINISH_ORDER_PATTERNS_AR:
-        if pattern.lower() in text_lower:
-            return "finish"
-
-    # 3.5) Check for delivery patterns
-    for pattern in DELIVERY_PATTERNS + DELIVERY_PATTERNS_AR:
-        if pattern.lower() in text_lower:
-            return "delivery"
-    
-    # 4) Check for order intent patterns
-    for pattern in ORDER_INTENT_PATTERNS + ORDER_INTENT_PATTERNS_AR:
-        if pattern.lower() in text_lower:
-            return "order_start"
-    
-    # 5) Check for menu browsing patterns
-    for pattern in MENU_BROWSING_PATTERNS + MENU_BROWSING_PATTERNS_AR:
-        pattern_clean = re.sub(r'[^\w\s\u0600-\u06FF]', '', pattern.lower()).strip()
-        if pattern_clean in text_clean or text_clean == pattern_clean:
-            return "menu"
-    
-    # 6) Check for specific category mentions
-    for category, data in CATEGORY_KEYWORDS.items():
-        for keyword in data["keywords"]:
-            if keyword.lower() in text_lower:
-                return "browse_category"
+    # 2-6) cancel > finish > delivery > order_start > menu browsing > category mention
+    intent = INTENT_ENGINE.keyword_intent(text_lower, text_clean)
+    if intent:
+        return intent
     
     # 7) Check if message closely matches a menu item
-    if MENU_ITEMS:
-        match = get_close_matches(text_lower, MENU_ITEMS, n=1, cutoff=0.65)
+    menu_items = load_menu_items()
+    if menu_items:
+        match = fuzzy.close_matches(text_lower, menu_items, n=1, cutoff=0.65)
         if match:
             return "add_item"
     
-    # 8) Check other intents
-    for intent, keywords in INTENTS.items():
-        if intent in ["greeting", "menu", "order_start", "cancel", "finish"]:
-            continue  # Already checked above
-        for kw in keywords:
-            if kw.lower() in text_lower:
-                return intent
+    # 8) Check other intents (greeting/menu/order_start/cancel/finish already checked above)
+    intent = INTENT_ENGINE.other_intent(text_lower)
+    if intent:
+        return intent
     
     # 9) Fuzzy matching for common phrases with typos
     # Order variations with typos
@@ -885,6 +941,65 @@ def detect_intent(text: str) -> str:
     return "unknown"
 
 
+# ============================================
+# LOCAL ARABIC SPELLER (before any LLM correction)
+# ============================================
+
+# Everyday words in Arabic orders that are not menu words (numbers, fillers, sizes)
+AR_COMMON_WORDS = [
+    "واحد", "واحدة", "اثنين", "اثنان", "اتنين", "ثنين", "ثلاثة", "ثلاث", "اربعة", "اربع",
+    "خمسة", "خمس", "ستة", "سبعة", "ثمانية", "تسعة", "عشرة", "حبة", "حبات", "حبتين",
+    "قطعة", "قطع", "قطعتين", "مع", "بدون", "من", "في", "على", "لو", "سمحت", "فضلك",
+    "ابغى", "ابغا", "ابي", "اريد", "بدي", "عطني", "ممكن", "كمان", "زيادة", "بس", "او",
+    "ايضا", "حار", "عادي", "صغير", "كبير", "وسط", "شكرا", "نعم", "لا", "تمام", "طيب",
+    "هذا", "هذي", "كم", "سعر", "بكم", "الكل", "كل", "اي", "ايوه", "اوكي", "يعطيك", "العافية",
+    # everyday conversation (several are one letter away from a menu word)
+    "عندي", "عندك", "عندكم", "وصل", "وصلت", "الطلب", "طلبي", "سؤال", "متى", "وين", "ليش",
+    "كيف", "ايش", "وش", "شو", "انا", "انت", "احنا", "هل", "فيه", "مافي", "ما", "لسه",
+    "ليه", "تأخر", "تاخر", "متأخر", "وقت", "الحين", "اليوم", "بكرة", "مرة", "شي", "شيء",
+    "حساب", "فاتورة", "دفع", "كاش", "بطاقة", "استلام", "فرع", "عنوان", "رقم", "جوال",
+    "مشكلة", "ممتاز", "حلو", "زين", "خلاص", "بعد", "قبل", "كثير", "شوي", "يا", "اخوي",
+]
+
+_SPELLERS = weakref.WeakKeyDictionary()   # MenuIndex -> Speller
+
+
+def arabic_speller() -> Speller:
+    """Speller for the active menu: EN/AR item names, category keywords and typo tables.
+
+    Built once per menu snapshot (keyed by its MenuIndex) and reused for every message.
+    """
+    index = current_index()
+    speller = _SPELLERS.get(index)
+    if speller is None:
+        vocab = [e.en for e in index.entries] + [e.ar for e in index.entries]
+        for data in CATEGORY_KEYWORDS.values():
+            vocab += data["keywords"]
+        vocab += list(TYPO_CORRECTIONS.values()) + list(TYPO_CORRECTIONS_AR.values())
+        known = (AR_COMMON_WORDS + GREETING_PATTERNS_AR + MENU_BROWSING_PATTERNS_AR
+                 + ORDER_INTENT_PATTERNS_AR + CANCEL_ORDER_PATTERNS_AR + FINISH_ORDER_PATTERNS_AR
+                 + DELIVERY_PATTERNS_AR + [kw for kws in INTENTS.values() for kw in kws])
+        speller = Speller(vocab, {**TYPO_CORRECTIONS, **TYPO_CORRECTIONS_AR}, known)
+        _SPELLERS[index] = speller
+    return speller
+
+
+# Canned messages that walk every detect_intent branch once (EN + AR)
+WARM_UP_MESSAGES = [
+    "hi", "مرحبا", "show menu", "وريني المنيو", "i want to order", "ابغى اطلب",
+    "cancel order", "finish order", "delivery", "burgers", "beef burger",
+    "where is your branch", "i wnat to oder", "xyz",
+]
+
+
+def warm_up():
+    """Run the intent pipeline once so its regexes and menu names are ready (see gunicorn.conf.py)."""
+    for text in WARM_UP_MESSAGES:
+        detect_intent(text)
+        detect_category_from_text(text)
+    arabic_speller()
+
+
 def detect_category_from_text(text: str) -> str | None:
     """
     Detect which category the user is asking about.
@@ -893,14 +1008,7 @@ def detect_category_from_text(text: str) -> str | None:
     if not text:
         return None
     
-    text_lower = text.lower().strip()
-    
-    for category, data in CATEGORY_KEYWORDS.items():
-        for keyword in data["keywords"]:
-            if keyword.lower() in text_lower:
-                return data["category_id"]
-    
-    return None
+    return INTENT_ENGINE.category(arabic_text.clean(text.lower()).strip())
 
 
 def get_intent_details(text: str) -> dict:
@@ -0,0 +1,280 @@
+"""Rule-based order parser (EN + AR) for structured orders.
+
+"2 beef burger and 1 pepsi", "٣ برجر لحم حار و قهوتين", "5 burgers, 2 wraps"
+need no LLM: every word is a menu mention, a generic category word, a number,
+a spice word or filler. `parse(text, index)` returns the same shape as
+app.parse_intelligent_order plus a confidence in [0, 1]:
+
+    {"items": [{"type": "specific", "name": "Beef Burger", "qty": 2,
+                "category": "burgers_meals", "spicy": "any"},
+               {"type": "generic", "category": "drinks", "qty": 1}],
+     "confidence": 1.0}
+
+Adjacent item/category words of one clause name one item: "burger meals" and
+"وجبة برجر" are a meals item, "pepsi drink" is Pepsi, "beef burger meal" the
+Beef Burger Meal.
+
+Confidence is the share of tokens the grammar explained, capped at 0.5 when
+the structure is ambiguous (a number with no item, two numbers in a row,
+conflicting spice, a mention inside a longer word, adjacent words that do not
+combine). Unknown words (typos,
+questions, items not on the menu) lower it, so the caller can fall back to
+the LLM.
+"""
+import arabic_text
+import quantity
+
+# Generic category words -> category used by the generic queue in app.py
+GENERIC_WORDS = {
+    "burger": ["burger", "burgers", "برجر", "برغر"],
+    "sandwich": [
+        "sandwich", "sandwiches", "wrap", "wraps", "tortilla", "tortillas",
+        "ساندويتش", "سندويتش", "سندوتش", "تورتيلا", "تورتيا",
+    ],
+    "meals": ["meal", "meals", "وجبة", "وجبات"],
+    "juices": ["juice", "juices", "عصير", "عصيرات", "عصائر"],
+    "drinks": ["drink", "drinks", "soda", "مشروب", "مشروبات"],
+    "snacks_sides": ["side", "sides", "snack", "snacks"],
+}
+
+# Generic category -> menu category of its items
+MENU_CATEGORIES = {
+    "burger": "burgers_meals",
+    "sandwich": "sandwiches",
+    "meals": "meals",
+    "juices": "juices",
+    "drinks": "drinks",
+    "snacks_sides": "snacks_sides",
+}
+
+SPICY_WORDS = ["spicy", "hot", "حار", "حارة", "حارين"]
+NON_SPICY_WORDS = ["mild", "regular", "normal", "nonspicy", "عادي"]
+NEGATIONS = ["non", "no", "not", "without", "بدون", "غير"]
+
+# Arabic dual nouns that are units, not items ("حبتين برجر" = 2 burgers)
+UNIT_NOUNS = ["حبة", "قطعة", "علبة", "كوب"]
+
+# Words that carry no order information
+FILLER_WORDS = [
+    "i", "d", "m", "ll", "we", "want", "wanna", "need", "would", "like", "love",
+    "can", "could", "may", "get", "give", "me", "us", "add", "order", "have",
+    "take", "a", "an", "the", "of", "for", "to", "my", "also", "just", "more",
+    "another", "x", "pcs", "pc", "piece", "pieces",
+    "ابغى", "ابغا", "ابي", "ابى", "بغيت", "اريد", "أريد", "عطني", "عطيني",
+    "اعطني", "ممكن", "لو", "سمحت", "فضلك", "من", "ضيف", "اضف", "زيد", "كمان",
+    "ايضا", "ياريت", "لي", "حبة", "حبات", "قطعة", "قطع",
+]
+
+# Cap for parses whose structure is ambiguous
+AMBIGUOUS_CONFIDENCE = 0.5
+
+
+def _fold_all(words) -> set:
+    return {arabic_text.fold(w) for w in words}
+
+
+_GENERIC_BY_WORD = {arabic_text.fold(w): cat for cat, forms in GENERIC_WORDS.items() for w in forms}
+_SPICY = _fold_all(SPICY_WORDS)
+_NON_SPICY = _fold_all(NON_SPICY_WORDS)
+_NEGATIONS = _fold_all(NEGATIONS)
+_UNITS = _fold_all(UNIT_NOUNS)
+_FILLER = _fold_all(FILLER_WORDS)
+_VAGUE = {arabic_text.fold(w): v for w, v in quantity.VAGUE_QUANTITIES.items()}
+
+
+def _spice_of(text: str) -> str:
+    """Spice implied by a menu name ("Spicy Zinger Burger"), else "any"."""
+    words = set(arabic_text.fold(text.lower()).split())
+    if words & _NON_SPICY:
+        return "non-spicy"
+    if words & _SPICY:
+        return "spicy"
+    return "any"
+
+
+def _pick_mentions(mentions) -> list:
+    """Leftmost-longest, non-overlapping mentions (find_all sorts by start, longest first)."""
+    chosen = []
+    end = -1
+    for m in mentions:
+        if m.start >= end:
+            chosen.append(m)
+            end = m.end
+    return chosen
+
+
+def _combine(first, second, index):
+    """One (kind, payload) for two adjacent item/category words, or None if they do not combine."""
+    if first[0] == "generic" and second[0] == "generic":
+        if first[1] == second[1]:
+            return first
+        if "meals" in (first[1], second[1]):
+            return ("generic", "meals")       # "burger meal", "وجبة برجر"
+        return None
+    if first[0] == "item" and second[0] == "item":
+        return None
+    item, cat = (first, second[1]) if first[0] == "item" else (second, first[1])
+    key = item[1] if isinstance(item[1], str) else item[1].key
+    item_cat = (index.menu.get(key, {}).get("category") or "").strip().lower()
+    if cat == "meals" and item_cat != "meals":
+        meal = key + " meal"
+        return ("item", meal) if meal in index.menu else None
+    if MENU_CATEGORIES.get(cat) == item_cat:
+        return item                           # "pepsi drink"
+    return None
+
+
+# =========================================================
+# PARSER
+# =========================================================
+def parse(text: str, index) -> dict:
+    """Parse an order against a MenuIndex. See the module docstring for the shape."""
+    t = quantity.normalize_for_scan(text)
+    qtys, words = quantity.tokens(text)
+    if not t.strip() or index is None:
+        return {"items": [], "confidence": 0.0}
+
+    mentions = _pick_mentions(index.mentions(t))
+    ambiguous = False
+    unknown = 0
+
+    def covering(start, end):
+        for m in mentions:
+            if m.start < end and start < m.end:
+                return m
+        return None
+
+    # Elements in text order: (start, clause, kind, payload)
+    elements = []
+    clause_of_mention = {}
+    for word, clause, start in words:
+        end = start + len(word)
+        m = covering(start, end)
+        if m is not None:
+            if m.start > start + (1 if word.startswith("و") else 0) or (m.lang == "ar" and m.end < end):
+                ambiguous = True   # Arabic containment hit inside a longer word
+            clause_of_mention.setdefault(m, clause)
+            continue
+        if word in _GENERIC_BY_WORD:
+            elements.append((start, clause, "generic", _GENERIC_BY_WORD[word]))
+        elif word in _SPICY:
+            elements.append((start, clause, "spice", "spicy"))
+        elif word in _NON_SPICY:
+            elements.append((start, clause, "spice", "non-spicy"))
+        elif word in _NEGATIONS:
+            elements.append((start, clause, "negation", None))
+        elif word in _VAGUE:
+            elements.append((start, clause, "qty", _VAGUE[word]))
+        elif word not in _FILLER:
+            unknown += 1
+    for m, clause in clause_of_mention.items():
+        elements.append((m.start, clause, "item", m))
+
+    for q in qtys:
+        if covering(q.start, q.end) is not None:
+            continue                     # "chicken nuggets (8 pcs)"
+        if q.kind == "dual":
+            noun = arabic_text.fold(q.noun)
+            if noun in _UNITS:
+                elements.append((q.start, q.clause, "qty", 2))
+            elif noun in _GENERIC_BY_WORD:
+                elements.append((q.start, q.clause, "qty", 2))
+                elements.append((q.start, q.clause, "generic", _GENERIC_BY_WORD[noun]))
+            else:
+                key = index.exact.get(arabic_text.normalize(q.noun))
+                if key is None:
+                    unknown += 1
+                    continue
+                elements.append((q.start, q.clause, "qty", 2))
+                elements.append((q.start, q.clause, "item", key))
+        elif q.value <= 0:
+            ambiguous = True
+        else:
+            elements.append((q.start, q.clause, "qty", q.value))
+    elements.sort(key=lambda e: (e[0], e[2] != "qty"))
+
+    # Bind numbers and spice words to the item / category of their clause
+    groups = []          # [qty or None, ("item", key) | ("generic", cat), spice or None, clause]
+    pending_qty = pending_spice = None
+    negated = False
+    adjacent = False     # last element of this clause was an item/category word
+    clause = None
+    clause_start = 0
+
+    def close_clause():
+        nonlocal ambiguous, pending_qty, pending_spice, negated
+        in_clause = groups[clause_start:]
+        if pending_qty is not None:
+            if in_clause and in_clause[-1][0] is None:
+                in_clause[-1][0] = pending_qty        # "burger 2", "برجر لحم اثنين"
+            else:
+                ambiguous = True                      # "1 regular" with no item
+        if pending_spice is not None:
+            if in_clause and in_clause[-1][2] in (None, pending_spice):
+                in_clause[-1][2] = pending_spice      # "beef burger spicy"
+            else:
+                ambiguous = True
+        if negated:
+            ambiguous = True                          # "without onions"
+        pending_qty = pending_spice = None
+        negated = False
+
+    for start, c, kind, payload in elements:
+        if c != clause:
+            if clause is not None:
+                close_clause()
+            clause, clause_start = c, len(groups)
+            adjacent = False
+        if kind in ("item", "generic") and adjacent:
+            merged = _combine(groups[-1][1], (kind, payload), index)
+            if merged is not None:
+                groups[-1][1] = merged
+                continue
+            ambiguous = True                          # "burger sandwich"
+        adjacent = kind in ("item", "generic")
+        if kind == "qty":
+            if pending_qty is not None:
+                ambiguous = True
+            pending_qty = payload
+        elif kind == "negation":
+            negated = True
+        elif kind == "spice":
+            value = "non-spicy" if negated else payload
+            negated = False
+            if pending_spice not in (None, value):
+                ambiguous = True
+            pending_spice = value
+        else:
+            groups.append([pending_qty, (kind, payload), pending_spice, c])
+            pending_qty = pending_spice = None
+    if clause is not None:
+        close_clause()
+
+    items = []
+    for qty, (kind, payload), spice, _ in groups:
+        qty = qty or 1
+        if kind == "generic":
+            items.append({"type": "generic", "category": payload, "qty": qty})
+            continue
+        key = payload if isinstance(payload, str) else payload.key
+        info = index.menu.get(key, {})
+        name = str(info.get("name_en") or key).strip()
+        name_spice = _spice_of(name)
+        if spice and name_spice != "any" and spice != name_spice:
+            ambiguous = True                          # "non spicy spicy zinger"
+        items.append({
+            "type": "specific",
+            "name": name,
+            "qty": qty,
+            "category": (info.get("category") or "").strip().lower(),
+            "spicy": spice or name_spice,
+        })
+
+    if not items:
+        return {"items": [], "confidence": 0.0}
+
+    total = len(words) + len(qtys)
+    confidence = 1.0 - unknown / max(total, 1)
+    if ambiguous:
+        confidence = min(confidence, AMBIGUOUS_CONFIDENCE)
+    return {"items": items, "confidence": round(confidence, 3)}
@@ -0,0 +1,226 @@
+"""One-pass quantity extraction for order text (EN + AR).
+
+`scan(text)` tokenizes the message once and returns every quantity as a
+Quantity(value, start, end, kind, noun): digits (Eastern digits included),
+English and Arabic number words ("two", "ثلاثة", "وثلاثة") and Arabic dual
+forms of order nouns ("قهوتين" -> 2 قهوة). `noun` is the word the number
+belongs to: the word after it ("2 burgers", "ثلاثة برجر"), or the word before
+it when no word follows in the same clause ("meals 2", "برجر لحم اثنين").
+The helpers below (first quantity, quantity of a keyword, all quantities in
+order) all read that one scan, so they agree on the same message.
+"""
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+import arabic_text
+
+EN_NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+}
+
+AR_NUMBER_WORDS = {
+    "واحد": 1, "واحدة": 1,
+    "اثنان": 2, "اثنين": 2, "اثنتان": 2, "اثنتين": 2, "اتنين": 2, "ثنين": 2,
+    "ثلاثة": 3, "ثلاث": 3,
+    "أربعة": 4, "اربعة": 4, "أربع": 4, "اربع": 4,
+    "خمسة": 5, "خمس": 5,
+    "ستة": 6, "ست": 6,
+    "سبعة": 7, "سبع": 7,
+    "ثمانية": 8, "ثمان": 8,
+    "تسعة": 9, "تسع": 9,
+    "عشرة": 10, "عشر": 10,
+}
+
+# Order nouns whose Arabic dual means "2 of them" (قهوتين, برجرين, وجبتين, حبتين)
+DUAL_NOUNS = [
+    "برجر", "برغر", "ساندويتش", "سندويتش", "وجبة", "عصير", "قهوة", "شاي",
+    "مشروب", "بيبسي", "كرك", "حبة", "قطعة", "علبة", "كوب",
+]
+
+# Vague amounts, only used when no number is given (detect)
+VAGUE_QUANTITIES = {
+    "couple": 2, "few": 3, "some": 3, "several": 3, "بعض": 3,
+    "many": 5, "كثير": 5, "dozen": 12, "دزينة": 12,
+}
+
+# Words that end a clause: a number never belongs to a noun across them
+_SEPARATOR_WORDS = {"and", "then", "aur", "plus", "و", "ثم", "please", "pls", "plz"}
+
+_TOKEN_RE = re.compile(r"\d+|[^\W\d_]+|[,;،؛+&\n]")
+_DUAL_BY_FOLD = {arabic_text.fold(n): n for n in DUAL_NOUNS}
+
+
+@dataclass(frozen=True)
+class Quantity:
+    value: int
+    start: int       # span in normalize_for_scan(text)
+    end: int
+    kind: str        # "digit" | "word" | "dual"
+    noun: str        # word the number belongs to ("" when none)
+    clause: int      # index of the clause ("2 pepsi | and | a burger") it sits in
+
+
+def normalize_for_scan(text: str) -> str:
+    """The string Quantity spans refer to: lowercased, Western digits, no diacritics."""
+    return arabic_text.clean((text or "").lower())
+
+
+def _dual_noun(word: str):
+    f = arabic_text.fold(word)
+    for suffix in ("تين", "تان"):
+        if f.endswith(suffix) and f[:-3] + "ه" in _DUAL_BY_FOLD:
+            return _DUAL_BY_FOLD[f[:-3] + "ه"]
+    for suffix in ("ين", "ان"):
+        if f.endswith(suffix) and f[:-2] in _DUAL_BY_FOLD:
+            return _DUAL_BY_FOLD[f[:-2]]
+    return None
+
+
+def _number(word: str):
+    """(value, kind, noun, offset) for one word token, or None. offset skips a leading و (and)."""
+    if word in EN_NUMBER_WORDS:
+        return EN_NUMBER_WORDS[word], "word", None, 0
+    candidates = [(word, 0)]
+    if word.startswith("و") and len(word) > 2:
+        candidates.append((word[1:], 1))
+    for w, offset in candidates:
+        if w in AR_NUMBER_WORDS:
+            return AR_NUMBER_WORDS[w], "word", None, offset
+        noun = _dual_noun(w)
+        if noun:
+            return 2, "dual", noun, offset
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _scan(t: str) -> tuple:
+    """(quantities, words): words are (folded word, clause, start) for every non-number word."""
+    toks = []   # (type, text, start, end); type: "num" | "word" | "sep"
+    for m in _TOKEN_RE.finditer(t):
+        s = m.group()
+        if s.isdigit():
+            toks.append(("num", s, m.start(), m.end()))
+        elif not s[0].isalpha() or s in _SEPARATOR_WORDS:
+            toks.append(("sep", s, m.start(), m.end()))
+        else:
+            toks.append(("word", s, m.start(), m.end()))
+
+    out = []
+    clause = 0
+    clauses = []
+    for i, (typ, s, start, end) in enumerate(toks):
+        if typ == "sep":
+            clause += 1
+        clauses.append(clause)
+        if typ == "num":
+            value, kind, noun, offset = int(s), "digit", None, 0
+        elif typ == "word":
+            hit = _number(s)
+            if hit is None:
+                continue
+            value, kind, noun, offset = hit
+        else:
+            continue
+        if noun is None:
+            prev_word = toks[i - 1][1] if i > 0 and toks[i - 1][0] == "word" else None
+            next_word = toks[i + 1][1] if i + 1 < len(toks) and toks[i + 1][0] == "word" else None
+            noun = next_word or prev_word
+        if typ == "word":
+            toks[i] = ("num", s, start, end)   # a number word is not a noun for its neighbours
+        out.append(Quantity(value, start + offset, end, kind, noun or "", clause))
+    words = tuple((arabic_text.fold(s), c, start) for (typ, s, start, _), c in zip(toks, clauses) if typ == "word")
+    return tuple(out), words
+
+
+# =========================================================
+# QUESTIONS ASKED BY app.py
+# =========================================================
+def scan(text: str) -> tuple:
+    """Every quantity in `text`, in order of appearance."""
+    return _scan(normalize_for_scan(text))[0]
+
+
+def as_digits(text: str) -> str:
+    """normalize_for_scan(text) with every quantity written as digits
+    ("two burgers" -> "2 burgers", "اثنين برجر" -> "2 برجر", "قهوتين" -> "2 قهوة")."""
+    t = normalize_for_scan(text)
+    out, last = [], 0
+    for q in _scan(t)[0]:
+        out.append(t[last:q.start])
+        if q.start > 0 and t[q.start - 1].isalpha():
+            out.append(" ")      # "وثلاثة" -> "و 3"
+        out.append(f"{q.value} {q.noun}" if q.kind == "dual" else str(q.value))
+        last = q.end
+    out.append(t[last:])
+    return "".join(out)
+
+
+def tokens(text: str) -> tuple:
+    """(quantities, words) of one scan; words are (folded word, clause, start)
+    for every word that is not a number, spans in normalize_for_scan(text)."""
+    return _scan(normalize_for_scan(text))
+
+
+def values(text: str) -> list:
+    """Positive quantities in order ("1 spicy 2 non spicy" -> [1, 2])."""
+    return [q.value for q in scan(text) if q.value > 0]
+
+
+def first(text: str, max_value: int = None):
+    """First positive quantity (at most `max_value`), else None."""
+    for q in scan(text):
+        if q.value > 0 and (max_value is None or q.value <= max_value):
+            return q.value
+    return None
+
+
+def _keys(forms) -> set:
+    keys = set()
+    for f in forms:
+        parts = arabic_text.fold(f.lower()).split()
+        if parts:
+            keys.update((parts[0], parts[-1]))   # "2 soft drinks" -> noun "soft"
+    return keys
+
+
+def has_word(text: str, forms) -> bool:
+    """True if one of the keyword `forms` is a word of `text`."""
+    keys = _keys(forms)
+    return any(w[0] in keys for w in _scan(normalize_for_scan(text))[1])
+
+
+def near(text: str, forms):
+    """Quantity of one of the keyword `forms`, else None.
+
+    A number attached to the keyword wins ("4 meals", "meals 4", "وجبتين");
+    otherwise a number in the keyword's own clause, before it ("2 beef burgers")
+    or closing the clause ("برجر لحم اثنين"), but not "2 pepsi and a burger"
+    or "burgers 3 meals".
+    """
+    keys = _keys(forms)
+    qtys, words = _scan(normalize_for_scan(text))
+    for q in qtys:
+        if q.value > 0 and arabic_text.fold(q.noun) in keys:
+            return q.value
+    for word, clause, start in words:
+        if word not in keys:
+            continue
+        for q in qtys:
+            if q.value <= 0 or q.clause != clause:
+                continue
+            if q.start < start or not any(c == clause and st > q.start for _, c, st in words):
+                return q.value
+    return None
+
+
+def detect(text: str, default: int = 1) -> int:
+    """First quantity, else a vague amount ("a few" -> 3), else `default`."""
+    q = first(text)
+    if q:
+        return q
+    for word in normalize_for_scan(text).split():
+        if word in VAGUE_QUANTITIES:
+            return VAGUE_QUANTITIES[word]
+    return default
@@ -0,0 +1,170 @@
+"""Local spelling correction (symmetric delete, SymSpell-style).
+
+Every vocabulary word is indexed under all strings reachable by deleting up
+to `max_distance` characters. A token is looked up by generating its own
+deletes, so candidates within edit distance 1-2 are found with a handful of
+dict lookups instead of comparing against the whole vocabulary; candidates
+are then verified with the bounded edit distance from fuzzy.py.
+"""
+import re
+from dataclasses import dataclass, field
+
+from arabic_text import normalize as fold
+from fuzzy import bounded_levenshtein
+
+_TOKEN_RE = re.compile(r"(\s+)")
+_EDGE_PUNCT = "،؛؟.,!?:;\"'()[]{}-_*"
+# Attached Arabic prefixes tried when the whole token is not a word (و = and, ال = the, ب = with)
+_AR_PREFIXES = ("وال", "بال", "و", "ال", "ب")
+
+
+def _deletes(word: str, max_distance: int) -> set:
+    out = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        nxt = set()
+        for w in frontier:
+            if len(w) <= 1:
+                continue
+            for i in range(len(w)):
+                nxt.add(w[:i] + w[i + 1:])
+        out |= nxt
+        frontier = nxt
+    return out
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    term: str        # canonical spelling to write back
+    distance: int
+    count: int
+
+
+class SymSpell:
+    """Symmetric-delete index: folded word -> canonical spelling, with a frequency count."""
+
+    def __init__(self, max_distance: int = 2):
+        self.max_distance = max_distance
+        self.words = {}      # folded -> (canonical, count)
+        self._deletes = {}   # delete string -> set of folded words
+
+    def add(self, word: str, count: int = 1, canonical: str = None):
+        key = fold(word.strip())
+        if not key:
+            return
+        prev = self.words.get(key)
+        if prev is None:
+            self.words[key] = (canonical or word.strip(), count)
+            for d in _deletes(key, self.max_distance):
+                self._deletes.setdefault(d, set()).add(key)
+        else:
+            self.words[key] = (prev[0], prev[1] + count)
+
+    def __contains__(self, word: str) -> bool:
+        return fold(word) in self.words
+
+    def lookup(self, token: str, max_distance: int = None) -> list:
+        """Suggestions within `max_distance`, closest (then most frequent) first."""
+        max_distance = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        t = fold(token)
+        hit = self.words.get(t)
+        if hit is not None:
+            return [Suggestion(hit[0], 0, hit[1])]
+
+        seen = set()
+        out = []
+        for d in _deletes(t, max_distance):
+            for key in self._deletes.get(d, ()):
+                if key in seen:
+                    continue
+                seen.add(key)
+                dist = bounded_levenshtein(t, key, max_distance)
+                if dist <= max_distance:
+                    canonical, count = self.words[key]
+                    out.append(Suggestion(canonical, dist, count))
+        out.sort(key=lambda s: (s.distance, -s.count, s.term))
+        return out
+
+
+@dataclass
+class SpellResult:
+    text: str
+    confident: bool                              # every token known or fixed unambiguously
+    fixes: list = field(default_factory=list)    # (token, replacement)
+    unsure: list = field(default_factory=list)   # tokens left for the LLM
+
+
+class Speller:
+    """Token-level corrector over a SymSpell index plus an exact typo table.
+
+    A token is left alone when it is short, numeric, a known word or a vocabulary
+    word; fixed when the typo table has it, or when it is at least `min_fix_length`
+    long and exactly one vocabulary word is closest; otherwise it is "unsure" and
+    the whole message is not confident. Short everyday words ("وصل", "عندي") sit
+    one edit away from menu words ("بصل", "عادي"), so they are never rewritten by
+    edit distance; `known_words` should list the common ones.
+    """
+
+    def __init__(self, vocabulary, typo_map: dict = None, known_words=(), max_distance: int = 2,
+                 min_length: int = 3, min_fix_length: int = 5):
+        self.index = SymSpell(max_distance)
+        for w in vocabulary:
+            for part in str(w).split():
+                self.index.add(part.strip(_EDGE_PUNCT))
+        self.typos = {}
+        for wrong, right in (typo_map or {}).items():
+            if " " not in wrong and " " not in right:
+                self.typos[fold(wrong)] = right
+        self.known = {fold(w.strip(_EDGE_PUNCT)) for text in known_words for w in str(text).split()}
+        self.min_length = min_length
+        self.min_fix_length = min_fix_length
+
+    def _is_known(self, folded: str) -> bool:
+        return folded in self.index.words or folded in self.known
+
+    def correct_token(self, token: str):
+        """(replacement or None, unsure: bool) for one bare token."""
+        t = fold(token)
+        if len(t) < self.min_length or t.isdigit() or self._is_known(t):
+            return None, False
+        if t in self.typos:
+            return self.typos[t], False
+        for p in _AR_PREFIXES:
+            if t.startswith(p) and len(t) - len(p) >= self.min_length:
+                stem = t[len(p):]
+                if self._is_known(stem):
+                    return None, False
+                if stem in self.typos:
+                    return token[:len(p)] + self.typos[stem], False
+
+        if len(t) < self.min_fix_length:
+            return None, True
+        max_distance = 1 if len(t) <= 5 else 2
+        suggestions = self.index.lookup(t, max_distance)
+        if not suggestions:
+            return None, True
+        best = suggestions[0].distance
+        closest = {s.term for s in suggestions if s.distance == best}
+        if len(closest) != 1:
+            return None, True
+        return suggestions[0].term, False
+
+    def correct(self, text: str) -> SpellResult:
+        parts = _TOKEN_RE.split(text or "")
+        result = SpellResult(text=text, confident=True)
+        for i, part in enumerate(parts):
+            if not part or part.isspace():
+                continue
+            core = part.strip(_EDGE_PUNCT)
+            if not core:
+                continue
+            replacement, unsure = self.correct_token(core)
+            if unsure:
+                result.confident = False
+                result.unsure.append(core)
+            elif replacement and replacement != core:
+                start = part.index(core)
+                parts[i] = part[:start] + replacement + part[start + len(core):]
+                result.fixes.append((core, replacement))
+        result.text = "".join(parts)
+        return result
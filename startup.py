@@ -0,0 +1,114 @@
+import importlib
+import os
+import threading
+import time
+
+_T0 = time.perf_counter()
+_last = _T0
+PHASES = []   # [(name, ms)] in boot order
+
+# Cold-start target on the PaaS (scale-from-zero must answer the WhatsApp webhook in time)
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "1000"))
+
+
+# =========================================================
+# PHASE TIMING
+# =========================================================
+def mark(name: str) -> float:
+    """Close the phase that started at the previous mark (or at import of this module)."""
+    global _last
+    now = time.perf_counter()
+    ms = (now - _last) * 1000
+    PHASES.append((name, ms))
+    _last = now
+    return ms
+
+
+def total_ms() -> float:
+    return (_last - _T0) * 1000
+
+
+def report() -> str:
+    """importtime-style table of the boot phases, printed once at the end of app.py."""
+    total = total_ms()
+    lines = ["startup time: self [ms] | cumulative | phase"]
+    cum = 0.0
+    for name, ms in PHASES:
+        cum += ms
+        lines.append(f"startup time: {ms:9.1f} | {cum:10.1f} | {name}")
+    text = "\n".join(lines)
+    print(text)
+    if total > STARTUP_BUDGET_MS:
+        print(f"⚠ Startup took {total:.0f} ms (budget {STARTUP_BUDGET_MS:.0f} ms)")
+    else:
+        print(f"✅ Startup in {total:.0f} ms (budget {STARTUP_BUDGET_MS:.0f} ms)")
+    return text
+
+
+# =========================================================
+# LAZY IMPORTS / CLIENTS
+# =========================================================
+class LazyModule:
+    """Stand-in for `import name` that imports on first attribute access.
+
+    `requests.post(...)` and `except requests.exceptions.Timeout` keep working;
+    the import cost moves from boot to the first call.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+
+class LazyClient:
+    """Builds its client with `factory()` on first attribute access.
+
+    Truthiness answers "is this client configured?" without building it, so
+    `if not client:` guards stay cheap.
+    """
+
+    def __init__(self, factory=None):
+        self._factory = factory
+        self._client = None
+        self._lock = threading.Lock()
+
+    def __bool__(self):
+        return self._factory is not None
+
+    def load(self):
+        if self._client is None and self._factory is not None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._factory()
+        return self._client
+
+    def __getattr__(self, attr):
+        client = self.load()
+        if client is None:
+            raise AttributeError(f"LLM client is not configured ({attr})")
+        return getattr(client, attr)
+
+
+def prefetch(*targets):
+    """Load LazyModule/LazyClient targets on a daemon thread, off the boot path."""
+    def run():
+        for t in targets:
+            try:
+                t.load()
+            except Exception as e:
+                print(f"⚠ Prefetch failed: {e!r}")
+
+    th = threading.Thread(target=run, daemon=True)
+    th.start()
+    return th
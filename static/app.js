@@ -676,73 +676,33 @@ const englishNumberWords = {
   'eighty': '80', 'ninety': '90', 'hundred': '100'
 };
 
-// Arabic number word mappings (exact forms from speech recognition)
-const arabicNumberWords = {
-  'واحد': '1', 'واحدة': '1', 'اثنين': '2', 'اثنتين': '2', 'اتنين': '2',
-  'ثلاثة': '3', 'ثلاث': '3', 'أربعة': '4', 'أربع': '4', 'اربعة': '4',
-  'خمسة': '5', 'خمس': '5', 'ستة': '6', 'ست': '6', 'سبعة': '7', 'سبع': '7',
-  'ثمانية': '8', 'ثمان': '8', 'تسعة': '9', 'تسع': '9', 'عشرة': '10', 'عشر': '10'
-};
-
-// Convert Arabic dual forms to "2 <item>" (e.g., قهوتين → 2 قهوة)
-function convertArabicDualForms(text) {
+// Convert English number words to digits.
+// Arabic speech is sent as-is: the server reads Arabic number words, duals
+// ("برجرين") and Eastern digits as quantities (quantity.py) for typed and
+// spoken messages alike.
+function convertNumberWordsToDigits(text) {
   if (!text) return text;
   
-  // Common dual form patterns (ـان، ـين، ـتان، ـتين)
-  // This converts: برجران → 2 برجر, قهوتين → 2 قهوة, مشروبان → 2 مشروب
   let result = text;
   
-  // Match words ending with dual markers
-  result = result.replace(/(\S+?)(ان|ين|تان|تين)\b/g, (match, base, ending) => {
-    // Don't convert if already has a number before it
-    const beforeMatch = text.substring(0, text.indexOf(match));
-    if (/\d\s*$/.test(beforeMatch)) {
-      return match; // Keep original if number already present
-    }
-    return `2 ${base}`; // Convert dual to "2 <base>"
+  Object.keys(englishNumberWords).forEach(word => {
+    const digit = englishNumberWords[word];
+    // Case-insensitive replacement for English
+    const regex = new RegExp('\\b' + word + '\\b', 'gi');
+    result = result.replace(regex, digit);
   });
   
-  return result;
-}
-
-// Convert number words to digits
-function convertNumberWordsToDigits(text, isArabic = false) {
-  if (!text) return text;
-  
-  let result = text;
-  
-  if (isArabic) {
-    // First, handle dual forms (برجران → 2 برجر)
-    result = convertArabicDualForms(result);
-    
-    // Then convert Arabic number words
-    Object.keys(arabicNumberWords).forEach(word => {
-      const digit = arabicNumberWords[word];
-      // Use word boundaries for accurate replacement
-      const regex = new RegExp('\\b' + word + '\\b', 'g');
-      result = result.replace(regex, digit);
-    });
-  } else {
-    // English number conversion
-    Object.keys(englishNumberWords).forEach(word => {
-      const digit = englishNumberWords[word];
-      // Case-insensitive replacement for English
-      const regex = new RegExp('\\b' + word + '\\b', 'gi');
-      result = result.replace(regex, digit);
-    });
-    
-    // Handle compound numbers like "twenty one" → "21"
-    result = result.replace(/\b(\d+)\s+(\d)\b/g, (match, tens, ones) => {
-      const tensNum = parseInt(tens);
-      const onesNum = parseInt(ones);
-      if (tensNum >= 20 && tensNum <= 90 && tensNum % 10 === 0 && onesNum < 10) {
-        return String(tensNum + onesNum);
-      }
-      return match;
-    });
-  }
+  // Handle compound numbers like "twenty one" → "21"
+  result = result.replace(/\b(\d+)\s+(\d)\b/g, (match, tens, ones) => {
+    const tensNum = parseInt(tens);
+    const onesNum = parseInt(ones);
+    if (tensNum >= 20 && tensNum <= 90 && tensNum % 10 === 0 && onesNum < 10) {
+      return String(tensNum + onesNum);
+    }
+    return match;
+  });
   
-  console.log(`Number conversion (${isArabic ? 'AR' : 'EN'}): "${text}" → "${result}"`);
+  console.log(`Number conversion (EN): "${text}" → "${result}"`);
   return result;
 }
 
@@ -775,8 +735,7 @@ if ("webkitSpeechRecognition" in window) {
     if (hasArabicChars) {
       // Already real Arabic script
       langHint = "ar";
-      // Convert Arabic number words to digits
-      finalText = convertNumberWordsToDigits(rawSpeech, true);
+      finalText = rawSpeech;
     } else if (hasLatinChars && isPureRomanArabic(rawSpeech)) {
       // It's roman Arabic and we can transliterate every token safely.
       // Convert fully to Arabic, so NO roman stays in chat.
@@ -786,7 +745,7 @@ if ("webkitSpeechRecognition" in window) {
       // Everything else is treated as English.
       langHint = "en";
       // Convert English number words to digits
-      finalText = convertNumberWordsToDigits(rawSpeech, false);
+      finalText = convertNumberWordsToDigits(rawSpeech);
     }
 
     console.log("Processed speech (after conversion):", finalText);
@@ -0,0 +1,125 @@
+"""Independent steps of one inbound message, run on a shared thread pool.
+
+A webhook turn used to do everything on the request thread, one network call
+after another: customer upsert (GET + PATCH), message log (POST), voice echo
+(WhatsApp send), LLM understanding/parsing, reply send, reply log. Only a few
+of these depend on each other. A MessageTasks holds the steps started for the
+current request, by name; a step may wait for others (`after=`) and the
+request thread joins a step only where it needs its result:
+
+    tasks = task_graph.current()
+    tasks.start("customer", upsert_customer, phone, lang=lang)
+    tasks.start("log_in", log_inbound, after=("customer",))
+    ...
+    customer_id = tasks.result("customer")
+
+Steps run in a copy of the caller's context (menu snapshot, WhatsApp number,
+message analysis scope). Steps started with `outbound=True` send WhatsApp
+messages; `before_send()` makes later sends of the same request wait for them
+so the customer sees messages in order.
+
+Like message_analysis, the current MessageTasks is per request (`begin()`);
+outside a request `current()` still works but nothing joins leftover steps.
+"""
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_WORKERS = 16
+
+_workers = DEFAULT_WORKERS
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+# MessageTasks of the current request; True inside a step running on the pool
+_CURRENT = contextvars.ContextVar("message_tasks", default=None)
+_IN_TASK = contextvars.ContextVar("in_message_task", default=False)
+
+
+def configure(workers: int):
+    """Pool size; takes effect when the pool is (re)created."""
+    global _workers
+    _workers = max(1, int(workers))
+
+
+def pool() -> ThreadPoolExecutor:
+    """The shared pool, created on first use in each process (safe with gunicorn preload)."""
+    global _pool, _pool_pid
+    if _pool is not None and _pool_pid == os.getpid():
+        return _pool
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ThreadPoolExecutor(max_workers=_workers, thread_name_prefix="msg-task")
+            _pool_pid = os.getpid()
+    return _pool
+
+
+class MessageTasks:
+    """Named steps of one inbound message (futures on the shared pool)."""
+
+    def __init__(self):
+        self._futures = {}
+        self._outbound = []
+
+    def start(self, name: str, fn, *args, after=(), outbound: bool = False, **kwargs):
+        """Run fn(*args, **kwargs) on the pool once the steps in `after` are done."""
+        deps = [self._futures[n] for n in after if n in self._futures]
+
+        def run():
+            _IN_TASK.set(True)
+            for dep in deps:
+                dep.exception()         # wait; a failed dependency is reported by result()
+            return fn(*args, **kwargs)
+
+        fut = pool().submit(contextvars.copy_context().run, run)
+        self._futures[name] = fut
+        if outbound:
+            self._outbound.append(fut)
+        return fut
+
+    def result(self, name: str, default=None):
+        """Result of step `name` (waits for it); `default` if it was never started or failed."""
+        fut = self._futures.get(name)
+        if fut is None:
+            return default
+        try:
+            return fut.result()
+        except Exception as e:
+            print(f"❌ Message task '{name}' failed: {e!r}")
+            return default
+
+    def wait_outbound(self):
+        for fut in list(self._outbound):
+            fut.exception()
+
+
+def begin():
+    """Fresh MessageTasks for this request (reused threads must not see old steps)."""
+    _CURRENT.set(MessageTasks())
+
+
+def current() -> MessageTasks:
+    tasks = _CURRENT.get()
+    if tasks is None:
+        tasks = MessageTasks()
+        _CURRENT.set(tasks)
+    return tasks
+
+
+def result(name: str, default=None):
+    """Result of step `name` of the current request, or `default`."""
+    tasks = _CURRENT.get()
+    return tasks.result(name, default) if tasks is not None else default
+
+
+def before_send():
+    """Wait for this request's outbound steps before sending another message.
+
+    A no-op inside a step itself (the echo must not wait for itself).
+    """
+    tasks = _CURRENT.get()
+    if tasks is None or _IN_TASK.get():
+        return
+    tasks.wait_outbound()
@@ -0,0 +1,119 @@
+from dataclasses import dataclass
+
+
+# =========================================================
+# AHO-CORASICK AUTOMATON (shared by the term and menu matchers)
+# =========================================================
+def is_word_char(ch: str) -> bool:
+    """Same character class as regex `\\w` on str patterns."""
+    return ch.isalnum() or ch == "_"
+
+
+class AhoCorasick:
+    """Multi-pattern automaton: one linear scan reports every (overlapping) pattern hit."""
+
+    def __init__(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+
+    def _add(self, word: str, payload):
+        node = 0
+        for ch in word:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        if (word, payload) not in self._out[node]:
+            self._out[node].append((word, payload))
+
+    def _build_fail_links(self):
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                # Merge outputs so each state reports every pattern ending here
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def _scan(self, text: str):
+        """Yield (end, word, payload) for every hit; `end` is exclusive."""
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                for word, payload in out[node]:
+                    yield i + 1, word, payload
+
+
+# =========================================================
+# TERM MATCHER (IRRELEVANT_TERMS / ABUSE_BLOCKLIST)
+# =========================================================
+@dataclass(frozen=True)
+class TermHit:
+    term: str
+    start: int
+    end: int
+
+
+def _on_boundaries(text: str, start: int, end: int) -> bool:
+    """`\\b` before and after text[start:end], exactly as re evaluates it."""
+    left = is_word_char(text[start - 1]) if start > 0 else False
+    right = is_word_char(text[end]) if end < len(text) else False
+    return (left != is_word_char(text[start])) and (right != is_word_char(text[end - 1]))
+
+
+class TermMatcher(AhoCorasick):
+    """Word-list matcher with the semantics of the old per-term loop:
+
+        next((t for t in terms if (re.search(rf"\\b{re.escape(t)}\\b", text)
+                                   if re.search(r"[a-zA-Z]", t) else t in text)), None)
+
+    Terms containing a Latin letter must sit on word boundaries; other terms
+    (Arabic) match by containment. `first()` returns the earliest term in list
+    order, like the old loop, but the text is scanned once for all terms.
+    """
+
+    def __init__(self, terms):
+        super().__init__()
+        self.terms = []
+        seen = set()
+        for t in terms:
+            if not t or t in seen:
+                continue
+            seen.add(t)
+            bounded = any(ch.isascii() and ch.isalpha() for ch in t)
+            self._add(t, (len(self.terms), bounded))
+            self.terms.append(t)
+        self._build_fail_links()
+
+    def find_all(self, text: str) -> list:
+        """Every hit as (term index, TermHit), in text order."""
+        hits = []
+        for end, word, (idx, bounded) in self._scan(text or ""):
+            start = end - len(word)
+            if bounded and not _on_boundaries(text, start, end):
+                continue
+            hits.append((idx, TermHit(word, start, end)))
+        return hits
+
+    def first(self, text: str):
+        """The matching term that comes first in the term list (TermHit), or None."""
+        hits = self.find_all(text)
+        if not hits:
+            return None
+        return min(hits, key=lambda h: (h[0], h[1].start))[1]
@@ -0,0 +1,36 @@
+import os
+import sys
+
+sys.path.append(os.getcwd())
+
+import arabic_text
+
+
+def test_tables():
+    assert arabic_text.digits("٢ برجر و۳ بيبسي") == "2 برجر و3 بيبسي"
+    assert arabic_text.clean("أهلاً بـــك ٥") == "أهلا بك 5"
+    assert arabic_text.fold("أإآى مكرونة برغر") == "اااي مكرونه برجر"
+    assert arabic_text.normalize("Beef برغر مُكرونة ١") == "beef برجر مكرونه 1"
+    print("✅ translate tables ok")
+
+
+def test_fold_keeps_length():
+    text = "ابغى ٢ برغر دجاج وقهوة"
+    assert len(arabic_text.fold(text)) == len(text)
+    assert len(arabic_text.digits(text)) == len(text)
+    print("✅ fold keeps spans ok")
+
+
+def test_text_helpers():
+    assert arabic_text.squash("  Two   MEALS\n٣ ") == "two meals 3"
+    assert arabic_text.norm_text(" Beef-Burger!! ٣ ") == "beefburger 3"
+    assert arabic_text.digits(None) == ""
+    long_text = "برغر " * 40
+    assert arabic_text.normalize(long_text) == "برجر " * 40
+    print("✅ text helpers ok")
+
+
+if __name__ == "__main__":
+    test_tables()
+    test_fold_keeps_length()
+    test_text_helpers()
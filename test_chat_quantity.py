@@ -0,0 +1,44 @@
+import os
+import sys
+
+sys.path.append(os.getcwd())
+
+import app
+import message_analysis
+import quantity
+import startup
+
+# Local parsing only: no LLM round trips, whatever keys the environment has
+app.client = startup.LazyClient()
+
+
+def _chat(message: str) -> dict:
+    try:
+        r = app.app.test_client().post("/api/chat", json={"message": message, "is_voice": True})
+    finally:
+        message_analysis.end()      # before_request opened it; don't leak it into other tests
+    assert r.status_code == 200, r.status_code
+    return r.get_json()
+
+
+def test_spoken_arabic_numbers_are_quantities():
+    d = _chat("اثنين برجر لحم")        # used to open the burgers category
+    assert d.get("action") != "open_category", d
+    assert "2 beef burger" in d["reply"], d["reply"]
+
+    d = _chat("برجرين لحم")
+    assert d.get("action") != "open_category", d
+    assert "2 برجر" in d["reply"], d["reply"]
+    print("✅ spoken Arabic quantities via /api/chat ok")
+
+
+def test_as_digits():
+    assert quantity.as_digits("two burgers") == "2 burgers"
+    assert quantity.as_digits("اثنين برجر لحم") == "2 برجر لحم"
+    assert quantity.as_digits("قهوتين و وثلاثة بيبسي") == "2 قهوة و و 3 بيبسي"
+    print("✅ as_digits ok")
+
+
+if __name__ == "__main__":
+    test_spoken_arabic_numbers_are_quantities()
+    test_as_digits()
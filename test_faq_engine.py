@@ -0,0 +1,58 @@
+import os
+import sys
+
+sys.path.append(os.getcwd())
+
+from faq_engine import FaqEngine
+from menu_index import MenuIndex
+
+MENU = {
+    "beef burger": {"name_en": "Beef Burger", "name_ar": "برجر لحم", "category": "burgers_meals", "price": 9.5},
+    "beef burger meal": {"name_en": "Beef Burger Meal", "name_ar": "وجبة برجر لحم", "category": "meals", "price": 14.5},
+    "pepsi": {"name_en": "Pepsi", "name_ar": "بيبسي", "category": "drinks", "price": 2.5},
+}
+
+BRANCHES = [{"Branch Name": "Al Malqa District", "Address / Area": "Al Dahmaa Street"}]
+
+FACTS = {
+    "en": {"branch_name": "JOANA", "open_time": "12:00 AM", "close_time": "11:59 PM", "open_status": "Open"},
+    "ar": {"branch_name": "جوانا", "open_time": "12:00 ص", "close_time": "11:59 م", "open_status_ar": "مفتوح"},
+}
+
+FAQ = FaqEngine.load(os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "faq.json"))
+
+
+def test_price_slot_resolves_against_menu():
+    idx = MenuIndex(MENU)
+    m = FAQ.match("What is the price of the Pepsi?", idx)
+    assert (m.intent, m.slots) == ("price_single_item", {"item_name": "pepsi"}), m
+    assert FAQ.match("كم سعر برغر لحم؟", idx).slots == {"item_name": "beef burger"}
+    assert FAQ.match("What is the price of pizza?", idx) is None
+    print("✅ item slot ok")
+
+
+def test_answers_render_from_data():
+    idx = MenuIndex(MENU)
+    got = FAQ.answer("how much is pepsi please", "en", idx, BRANCHES, FACTS)
+    assert got == "Price of **Pepsi** is **2.5 SAR**.\nWould you like to add it to your order?", got
+    got = FAQ.answer("How much is beef burger meal?", "en", idx, BRANCHES, FACTS)
+    assert "**14.5 SAR**" in got and "**9.5 SAR**" in got, got
+    got = FAQ.answer("Working hours for Al Malqa District?", "en", idx, BRANCHES, FACTS)
+    assert got.startswith("Al Malqa District hours: **12:00 AM–11:59 PM**"), got
+    got = FAQ.answer("متى تفتحون؟", "ar", idx, BRANCHES, FACTS)
+    assert got.startswith("دوام جوانا"), got
+    print("✅ rendered answers ok")
+
+
+def test_no_answer_without_data():
+    idx = MenuIndex(MENU)
+    assert FAQ.answer("Do you deliver to Olaya?", "en", idx, BRANCHES, FACTS) is None
+    assert FAQ.answer("Where is my order?", "en", idx, BRANCHES, FACTS) is None
+    assert FAQ.answer("2 beef burgers", "en", idx, BRANCHES, FACTS) is None
+    print("✅ unanswerable questions fall through ok")
+
+
+if __name__ == "__main__":
+    test_price_slot_resolves_against_menu()
+    test_answers_render_from_data()
+    test_no_answer_without_data()
@@ -0,0 +1,29 @@
+import os
+import sys
+from difflib import get_close_matches
+
+sys.path.append(os.getcwd())
+
+from fuzzy import bounded_levenshtein, close_matches, fuzzy_match, levenshtein_many
+
+
+def test_bounded_levenshtein_stops_at_limit():
+    assert bounded_levenshtein("kitten", "sitting", 3) == 3
+    assert bounded_levenshtein("kitten", "sitting", 2) == 3      # over the limit -> limit + 1
+    assert bounded_levenshtein("hi", "a very long message", 2) == 3
+    assert levenshtein_many("kitten", ["sitting", "", "kitten"]) == [3, 6, 0]
+    print("✅ bounded levenshtein ok")
+
+
+def test_drop_in_matchers():
+    assert fuzzy_match("helo", ["hello", "hey"], threshold=0.8)
+    assert not fuzzy_match("bye", ["hello", "hey"], threshold=0.8)
+    names = ["beef burger %d" % i for i in range(40)] + ["chicken burger", "pepsi"]
+    for word in ("chiken burger", "pepsii", "beef burgr 7", "xyz"):
+        assert close_matches(word, names, n=1, cutoff=0.65) == get_close_matches(word, names, n=1, cutoff=0.65)
+    print("✅ drop-in matchers ok")
+
+
+if __name__ == "__main__":
+    test_bounded_levenshtein_stops_at_limit()
+    test_drop_in_matchers()
@@ -0,0 +1,29 @@
+import os
+import sys
+
+sys.path.append(os.getcwd())
+
+from nlp_utils import INTENT_ENGINE, detect_category_from_text, detect_intent
+
+
+def test_tier_precedence():
+    # cancel beats order_start, order_start beats menu, menu beats category
+    assert detect_intent("i want to order but cancel order") == "cancel"
+    assert detect_intent("i want to order from the menu") == "order_start"
+    assert detect_intent("show me the menu of burgers") == "menu"
+    assert detect_intent("burgers please") == "browse_category"
+    print("✅ intent precedence ok")
+
+
+def test_greeting_prefix_and_other_intents():
+    assert INTENT_ENGINE.is_greeting("hi there")
+    assert not INTENT_ENGINE.is_greeting("history")
+    assert detect_intent("hello!") == "greeting"
+    assert detect_intent("where is the branch") == "branch"
+    assert detect_category_from_text("one pepsi please") == "drinks"
+    print("✅ greeting + late intents ok")
+
+
+if __name__ == "__main__":
+    test_tier_precedence()
+    test_greeting_prefix_and_other_intents()
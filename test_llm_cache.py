@@ -0,0 +1,59 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.getcwd())
+
+from llm_cache import LLMCache, cache_key
+
+MSGS = [{"role": "system", "content": "Parse orders"}, {"role": "user", "content": "2 Burgers"}]
+
+
+def test_key_normalizes_user_text_only():
+    k = cache_key("order_parse", "m", 3, MSGS, temperature=0)
+    same = [{"role": "system", "content": "Parse orders"}, {"role": "user", "content": " 2  burgers "}]
+    assert cache_key("order_parse", "m", 3, same, temperature=0) == k
+    assert cache_key("order_parse", "m", 4, MSGS, temperature=0) != k          # new menu version
+    assert cache_key("arabic_typos", "m", 3, MSGS, temperature=0) != k         # other call site
+    other_prompt = [{"role": "system", "content": "Parse Orders"}, MSGS[1]]
+    assert cache_key("order_parse", "m", 3, other_prompt, temperature=0) != k
+    print("✅ cache keys ok")
+
+
+def test_lru_ttl_and_metrics():
+    c = LLMCache(max_entries=2, ttl=60)
+    c.put("a", "A", "s1")
+    c.put("b", "B", "s1")
+    assert c.get("a", "s1") == "A"          # a is now most recent
+    c.put("c", "C", "s2")                   # evicts b
+    assert c.get("b", "s1") is None
+    assert c.get("c", "s2") == "C"
+    m = c.metrics()
+    assert m["entries"] == 2
+    assert m["sites"]["s1"] == {"hits": 1, "disk_hits": 0, "misses": 1, "stores": 2}
+    assert m["hit_ratio"] == round(2 / 3, 3)
+
+    short = LLMCache(ttl=0.01)
+    short.put("k", "v")
+    time.sleep(0.02)
+    assert short.get("k") is None
+    print("✅ lru/ttl/metrics ok")
+
+
+def test_disk_tier_shared_between_instances():
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "llm.sqlite")
+        LLMCache(path=path).put("k", "from worker 1", "order_parse")
+        other = LLMCache(path=path)          # another worker, empty memory
+        assert other.get("k", "order_parse") == "from worker 1"
+        assert other.get("k", "order_parse") == "from worker 1"
+        assert other.metrics()["sites"]["order_parse"]["disk_hits"] == 1
+        assert other.metrics()["sites"]["order_parse"]["hits"] == 1
+    print("✅ disk tier ok")
+
+
+if __name__ == "__main__":
+    test_key_normalizes_user_text_only()
+    test_lru_ttl_and_metrics()
+    test_disk_tier_shared_between_instances()
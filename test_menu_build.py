@@ -0,0 +1,80 @@
+import os
+import sys
+import tempfile
+
+sys.path.append(os.getcwd())
+
+from menu_build import MenuArtifactError, ingest_menu, read_artifact, validate_artifact, write_artifact
+
+
+def _artifact():
+    return {
+        "schema": 1,
+        "source_digest": "x",
+        "currency": "SAR",
+        "items": [{"key": "beef burger", "id": 2, "price": 9.5, "category": "burgers_meals",
+                   "name_en": "Beef Burger", "name_ar": "برجر لحم"}],
+        "branches": [{"Branch Name": "A", "Address / Area": "B", "Phone Number": "1"}],
+    }
+
+
+def test_artifact_roundtrip():
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "menu.compiled.json")
+        write_artifact(_artifact(), path)
+        assert read_artifact(path) == _artifact()
+        print("✅ artifact roundtrip ok")
+
+
+def test_artifact_rejects_bad_rows():
+    bad = _artifact()
+    bad["items"].append(dict(bad["items"][0]))
+    try:
+        validate_artifact(bad)
+        assert False, "duplicate key accepted"
+    except MenuArtifactError:
+        pass
+
+    bad = _artifact()
+    bad["items"][0]["price"] = "9.5"
+    try:
+        validate_artifact(bad)
+        assert False, "string price accepted"
+    except MenuArtifactError:
+        pass
+    print("✅ artifact validation ok")
+
+
+def test_ingest_reports_row_errors():
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Main"
+    ws.append(["Joana menu"])
+    ws.append(["category", "name_en", "name_ar", "price", "id"])
+    ws.append(["Burgers", "Beef Burger", "برجر لحم", 9.5, 2])
+    ws.append(["Burgers", None, "بدون اسم", 9.5, 3])
+    ws.append(["Drinks", "Pepsi", "بيبسي", "free", 4])
+    ws.append(["Drinks", "Water", "ماء", 1, 2])
+    seasonal = wb.create_sheet("Seasonal")
+    seasonal.append(["name_en", "price", "category"])
+    seasonal.append(["Mango Juice", "7", "juices"])
+
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "Menu.xlsx")
+        wb.save(path)
+        result = ingest_menu(path)
+
+    assert sorted(result.menu) == ["beef burger", "mango juice", "water"], sorted(result.menu)
+    assert result.menu["mango juice"]["price"] == 7.0
+    assert result.sheets == ["Main", "Seasonal"]
+    problems = sorted((e.row, e.field) for e in result.errors)
+    assert problems == [(4, "name_en"), (5, "price"), (6, "id")], problems
+    print("✅ ingest row errors ok")
+
+
+if __name__ == "__main__":
+    test_artifact_roundtrip()
+    test_artifact_rejects_bad_rows()
+    test_ingest_reports_row_errors()
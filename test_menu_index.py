@@ -0,0 +1,41 @@
+import os
+import sys
+
+sys.path.append(os.getcwd())
+
+from menu_index import MenuIndex
+
+MENU = {
+    "beef burger": {"name_en": "Beef Burger", "name_ar": "برجر لحم", "category": "burgers_meals", "price": 9.5},
+    "egg sandwich": {"name_en": "Egg Sandwich", "name_ar": "ساندويتش بيض", "category": "sandwiches", "price": 5.0},
+    "pepsi": {"name_en": "Pepsi", "name_ar": "بيبسي", "category": "drinks", "price": 2.0},
+}
+
+
+def test_mentions_spans_and_plurals():
+    idx = MenuIndex(MENU)
+    text = "2 beef burgers and 3 egg sandwiches"
+    found = [(m.key, text[m.start:m.end]) for m in idx.mentions(text) if m.kind == "en"]
+    assert found == [("beef burger", "beef burgers"), ("egg sandwich", "egg sandwiches")], found
+    assert not idx.mentions("roastbeef burgerx")
+    print("✅ english mentions ok")
+
+
+def test_mentions_arabic_variants():
+    idx = MenuIndex(MENU)
+    keys = [m.key for m in idx.mentions("ابي برغر لحم وبيبسي") if m.lang == "ar"]
+    assert keys == ["beef burger", "pepsi"], keys
+    print("✅ arabic mentions ok")
+
+
+def test_exact_and_category_lookups():
+    idx = MenuIndex(MENU)
+    assert idx.exact["برجر لحم"] == "beef burger"
+    assert idx.items_in_category("drinks") == [{"en": "pepsi", "ar": "بيبسي"}]
+    print("✅ index lookups ok")
+
+
+if __name__ == "__main__":
+    test_mentions_spans_and_plurals()
+    test_mentions_arabic_variants()
+    test_exact_and_category_lookups()
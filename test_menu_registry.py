@@ -0,0 +1,59 @@
+import os
+import sys
+import tempfile
+
+sys.path.append(os.getcwd())
+
+from menu_store import ActiveMapping, MenuRegistry, MenuStore, activate
+
+
+def _default():
+    return MenuStore([], lambda: ({"pepsi": {"name_en": "Pepsi", "price": 2.0}}, []), check_interval=60)
+
+
+def _registry(d, max_tenants=2):
+    reg = MenuRegistry(d, _default(), max_tenants=max_tenants)
+    reg._make_store = lambda path: MenuStore(
+        [], lambda: ({os.path.basename(path): {"name_en": os.path.basename(path), "price": 1.0}}, []),
+        check_interval=60,
+    )
+    return reg
+
+
+def test_registry_lazy_load_and_lru():
+    with tempfile.TemporaryDirectory() as d:
+        for t in ("111", "222", "333"):
+            os.makedirs(os.path.join(d, t))
+        reg = _registry(d)
+        assert reg.loaded() == []
+
+        assert "111" in reg.snapshot_for("111").menu
+        reg.snapshot_for("222")
+        reg.snapshot_for("111")          # 111 is now most recent
+        reg.snapshot_for("333")          # evicts 222
+        assert reg.loaded() == ["111", "333"], reg.loaded()
+
+        # unknown / unsafe ids fall back to the default menu
+        assert reg.store_for("999") is reg.default
+        assert reg.store_for("../111") is reg.default
+        assert reg.store_for(None) is reg.default
+        print("✅ registry lazy load + LRU ok")
+
+
+def test_active_mapping_follows_activation():
+    with tempfile.TemporaryDirectory() as d:
+        os.makedirs(os.path.join(d, "111"))
+        reg = _registry(d)
+        menu = ActiveMapping("menu")
+
+        activate(reg.snapshot_for("111"))
+        assert list(menu) == ["111"] and menu.get("111")["price"] == 1.0
+        activate(reg.snapshot_for(None))
+        assert "pepsi" in menu and "111" not in menu
+        activate(None)
+        print("✅ active mapping ok")
+
+
+if __name__ == "__main__":
+    test_registry_lazy_load_and_lru()
+    test_active_mapping_follows_activation()
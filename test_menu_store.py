@@ -0,0 +1,94 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.getcwd())
+
+from menu_store import MenuStore
+
+
+def _store(path, calls):
+    def builder():
+        calls.append(1)
+        with open(path, encoding="utf-8") as f:
+            names = [x.strip() for x in f if x.strip()]
+        menu = {n: {"name_en": n, "price": 1.0} for n in names}
+        return menu, []
+    return MenuStore([path], builder, check_interval=0)
+
+
+def test_snapshot_rebuilds_only_on_change():
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "menu.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("beef burger\n")
+
+        calls = []
+        store = _store(path, calls)
+        s1 = store.current()
+        assert store.current() is s1
+        assert len(calls) == 1 and s1.version == 1
+
+        # touch only -> same bytes, no rebuild, same version
+        os.utime(path, (time.time() + 5, time.time() + 5))
+        s2 = store.current()
+        assert len(calls) == 1 and s2.version == 1
+
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("beef burger\npepsi\n")
+        os.utime(path, (time.time() + 10, time.time() + 10))
+        s3 = store.current()
+        assert len(calls) == 2 and s3.version == 2
+        assert "pepsi" in s3.menu and "pepsi" not in s1.menu
+        print("✅ snapshot rebuild ok")
+
+
+def test_derived_values_are_built_once_per_snapshot():
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "menu.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("beef burger\n")
+
+        store = _store(path, [])
+        builds = []
+
+        def names(snap):
+            builds.append(snap.version)
+            return ",".join(snap.menu)
+
+        s1 = store.current()
+        assert s1.derived("names", names) is s1.derived("names", names)
+
+        # same bytes, new mtime: the derived values carry over
+        os.utime(path, (time.time() + 5, time.time() + 5))
+        assert store.current().derived("names", names) == "beef burger"
+        assert builds == [1]
+
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("beef burger\npepsi\n")
+        os.utime(path, (time.time() + 10, time.time() + 10))
+        assert store.current().derived("names", names) == "beef burger,pepsi"
+        assert builds == [1, 2]
+        print("✅ derived values ok")
+
+
+def test_empty_rebuild_keeps_old_snapshot():
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "menu.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("beef burger\n")
+
+        store = _store(path, [])
+        s1 = store.current()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n")
+        os.utime(path, (time.time() + 5, time.time() + 5))
+        assert store.current() is s1
+        print("✅ empty rebuild rejected")
+
+
+if __name__ == "__main__":
+    test_snapshot_rebuilds_only_on_change()
+    test_derived_values_are_built_once_per_snapshot()
+    test_empty_rebuild_keeps_old_snapshot()
@@ -0,0 +1,87 @@
+import os
+import sys
+
+sys.path.append(os.getcwd())
+
+import message_analysis
+from message_analysis import MessageAnalysis, analyze, per_message
+from term_matcher import TermMatcher
+
+
+def test_fields():
+    a = MessageAnalysis("  ابغى ٢ برغر و three Pepsi ")
+    assert a.clean == "ابغى 2 برغر و three pepsi"
+    assert a.normalized == "ابغي 2 برجر و three pepsi"
+    assert a.digit_spans == ((5, 6, 2),)
+    assert [(q.value, q.noun) for q in a.quantities] == [(2, "برغر"), (3, "pepsi")]
+    assert a.has_arabic and a.language == "ar"
+    print("✅ analysis fields ok")
+
+
+def test_blocklist_hit():
+    old = MessageAnalysis.blocklist
+    MessageAnalysis.blocklist = TermMatcher(["weather", "غبي"])
+    try:
+        hit = MessageAnalysis("What is the WEATHER?").blocklist_hit
+        assert (hit.term, hit.start) == ("weather", 12)
+        assert MessageAnalysis("2 burgers").blocklist_hit is None
+    finally:
+        MessageAnalysis.blocklist = old
+    print("✅ blocklist hit ok")
+
+
+def test_per_message_memo_is_request_scoped():
+    calls = []
+
+    @per_message
+    def helper(text, lang="en"):
+        calls.append((text, lang))
+        return len(text)
+
+    helper("abc")
+    helper("abc")
+    assert len(calls) == 2          # no scope: plain call
+
+    message_analysis.begin()
+    try:
+        assert analyze("abc") is analyze("abc")
+        helper("abc")
+        helper("abc")
+        helper("abc", lang="ar")
+        assert len(calls) == 4, calls
+    finally:
+        message_analysis.end()
+
+    message_analysis.begin()        # next request starts empty
+    helper("abc")
+    message_analysis.end()
+    assert len(calls) == 5
+    print("✅ per-message memo ok")
+
+
+def test_remember_seeds_the_memo():
+    calls = []
+
+    @per_message
+    def fix(text):
+        calls.append(text)
+        return text.replace("برغر", "برجر")
+
+    message_analysis.remember(fix, "برجر", "برجر")     # outside a scope: ignored
+    message_analysis.begin()
+    try:
+        fixed = fix("برغر لحم")
+        message_analysis.remember(fix, fixed, fixed)
+        assert fix(fixed) == fixed
+        assert fix("برغر لحم") == fixed
+        assert calls == ["برغر لحم"], calls
+    finally:
+        message_analysis.end()
+    print("✅ remember ok")
+
+
+if __name__ == "__main__":
+    test_fields()
+    test_blocklist_hit()
+    test_per_message_memo_is_request_scoped()
+    test_remember_seeds_the_memo()
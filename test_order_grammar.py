@@ -0,0 +1,78 @@
+import os
+import sys
+
+sys.path.append(os.getcwd())
+
+import order_grammar
+from menu_index import MenuIndex
+
+MENU = {
+    "beef burger": {"name_en": "Beef Burger", "name_ar": "برجر لحم", "category": "burgers_meals", "price": 9.5},
+    "beef burger meal": {"name_en": "Beef Burger Meal", "name_ar": "وجبة برجر لحم", "category": "meals", "price": 14.5},
+    "spicy zinger burger": {"name_en": "Spicy Zinger Burger", "name_ar": "برجر زنجر حار", "category": "burgers_meals", "price": 11.0},
+    "egg sandwich": {"name_en": "Egg Sandwich", "name_ar": "ساندويتش بيض", "category": "sandwiches", "price": 5.0},
+    "pepsi": {"name_en": "Pepsi", "name_ar": "بيبسي", "category": "drinks", "price": 2.0},
+    "coffee": {"name_en": "Coffee", "name_ar": "قهوة", "category": "drinks", "price": 3.0},
+}
+
+
+def _short(parsed):
+    return [(it.get("name") or it["category"], it["qty"], it.get("spicy")) for it in parsed["items"]]
+
+
+def test_structured_orders_are_confident():
+    idx = MenuIndex(MENU)
+    got = order_grammar.parse("2 beef burger and 1 pepsi please", idx)
+    assert got["confidence"] == 1.0
+    assert _short(got) == [("Beef Burger", 2, "any"), ("Pepsi", 1, "any")], got
+
+    got = order_grammar.parse("ابغى ٣ برجر لحم حار و قهوتين", idx)
+    assert got["confidence"] == 1.0
+    assert _short(got) == [("Beef Burger", 3, "spicy"), ("Coffee", 2, "any")], got
+
+    got = order_grammar.parse("5 burgers, 2 wraps and 3 coffees", idx)
+    assert _short(got) == [("burger", 5, None), ("sandwich", 2, None), ("Coffee", 3, "any")], got
+    assert got["items"][0] == {"type": "generic", "category": "burger", "qty": 5}
+    print("✅ structured orders ok")
+
+
+def test_spice_binding():
+    idx = MenuIndex(MENU)
+    got = order_grammar.parse("1 non spicy beef burger and 2 spicy zinger burgers", idx)
+    assert _short(got) == [("Beef Burger", 1, "non-spicy"), ("Spicy Zinger Burger", 2, "spicy")], got
+    got = order_grammar.parse("beef burger 2 spicy", idx)
+    assert _short(got) == [("Beef Burger", 2, "spicy")], got
+    print("✅ spice binding ok")
+
+
+def test_adjacent_words_name_one_item():
+    idx = MenuIndex(MENU)
+    cases = {
+        "2 burger meals": [("meals", 2, None)],
+        "sandwich meal": [("meals", 1, None)],
+        "وجبة برجر": [("meals", 1, None)],
+        "pepsi drink": [("Pepsi", 1, "any")],
+        "beef burger meal": [("Beef Burger Meal", 1, "any")],
+    }
+    for text, want in cases.items():
+        got = order_grammar.parse(text, idx)
+        assert _short(got) == want and got["confidence"] == 1.0, (text, got)
+    assert order_grammar.parse("burger sandwich", idx)["confidence"] <= 0.5
+    assert order_grammar.parse("pepsi juice", idx)["confidence"] <= 0.5
+    print("✅ adjacent words ok")
+
+
+def test_ambiguous_orders_fall_back():
+    idx = MenuIndex(MENU)
+    assert order_grammar.parse("2 burgurs and cofee plz", idx)["confidence"] < 0.95
+    assert order_grammar.parse("what is the price of beef burger", idx)["confidence"] < 0.95
+    assert order_grammar.parse("one spicy egg sandwich and one regular", idx)["confidence"] <= 0.5
+    assert order_grammar.parse("hello", idx) == {"items": [], "confidence": 0.0}
+    print("✅ ambiguous orders ok")
+
+
+if __name__ == "__main__":
+    test_structured_orders_are_confident()
+    test_spice_binding()
+    test_adjacent_words_name_one_item()
+    test_ambiguous_orders_fall_back()
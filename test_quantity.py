@@ -0,0 +1,41 @@
+import os
+import sys
+
+sys.path.append(os.getcwd())
+
+import quantity
+
+
+def test_scan_kinds_and_nouns():
+    got = [(q.value, q.kind, q.noun) for q in quantity.scan("ابغى ثلاثة برجر وقهوتين و ٢ بيبسي")]
+    assert got == [(3, "word", "برجر"), (2, "dual", "قهوة"), (2, "digit", "بيبسي")], got
+
+    got = [(q.value, q.noun) for q in quantity.scan("2beef burger, meals 4")]
+    assert got == [(2, "beef"), (4, "meals")], got
+    assert quantity.scan("استلام الطلب") == ()
+    print("✅ quantity scan ok")
+
+
+def test_near_keyword():
+    assert quantity.near("two meals and 3 juices", ["meal", "meals"]) == 2
+    assert quantity.near("two meals and 3 juices", ["juice", "juices"]) == 3
+    assert quantity.near("burgers 3 meals", ["burgers"]) is None
+    assert quantity.near("2 beef burgers", ["burgers"]) == 2
+    assert quantity.near("2 pepsi and a burger", ["burger"]) is None
+    assert quantity.near("وجبتين", ["وجبة"]) == 2
+    print("✅ quantity near ok")
+
+
+def test_first_values_detect():
+    assert quantity.values("1 spicy, two non spicy") == [1, 2]
+    assert quantity.first("order 2025 then 3", max_value=999) == 3
+    assert quantity.detect("2 pepsi and a burger") == 2
+    assert quantity.detect("a few burgers") == 3
+    assert quantity.detect("burger please") == 1
+    print("✅ quantity first/values/detect ok")
+
+
+if __name__ == "__main__":
+    test_scan_kinds_and_nouns()
+    test_near_keyword()
+    test_first_values_detect()
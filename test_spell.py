@@ -0,0 +1,70 @@
+import os
+import sys
+
+sys.path.append(os.getcwd())
+
+import nlp_utils
+from spell import Speller, SymSpell
+
+
+def _speller():
+    return Speller(
+        vocabulary=["برجر لحم", "كباب دجاج", "بيبسي", "تورتيلا زنجر", "بطاطس", "Beef Burger"],
+        typo_map={"برقر": "برجر", "بطاطا": "بطاطس"},
+        known_words=["ابغى", "واحد", "مع"],
+    )
+
+
+def test_symspell_lookup():
+    index = SymSpell(max_distance=2)
+    for w in ["كباب", "كبة", "برجر"]:
+        index.add(w)
+    assert index.lookup("كباب")[0].distance == 0
+    best = index.lookup("كبابب")[0]
+    assert (best.term, best.distance) == ("كباب", 1), best
+    assert index.lookup("شاورما") == []
+    print("✅ symspell lookup ok")
+
+
+def test_speller_fixes_and_keeps():
+    sp = _speller()
+    r = sp.correct("ابغى برقر لحم واحد مع وبيبسي")
+    assert r.text == "ابغى برجر لحم واحد مع وبيبسي", r.text
+    assert r.confident and r.fixes == [("برقر", "برجر")]
+
+    r = sp.correct("كبابب دجاج، تورتيلا")
+    assert r.text == "كباب دجاج، تورتيلا", r.text
+    assert r.confident
+    print("✅ speller fixes ok")
+
+
+def test_speller_defers_unknown_words():
+    r = _speller().correct("ابغى شاورما")
+    assert not r.confident and r.unsure == ["شاورما"]
+    assert r.text == "ابغى شاورما"
+    print("✅ speller defers unknown words ok")
+
+
+def test_everyday_words_are_not_rewritten_into_menu_words():
+    # "وصل" (arrived) and "عندي" (I have) are one letter from "بصل" (onion) and "عادي" (regular)
+    vocab = ["بصل", "عادي", "برجر لحم", "تورتيلا دجاج", "كباب دجاج"]
+    bare = Speller(vocab)
+    r = bare.correct("الطلب وصل")
+    assert r.text == "الطلب وصل" and not r.confident, r
+    r = bare.correct("عندي سؤال")
+    assert r.text == "عندي سؤال" and not r.confident, r
+
+    sp = Speller(vocab, known_words=nlp_utils.AR_COMMON_WORDS)
+    for text in ["الطلب وصل", "عندي سؤال", "وين الطلب"]:
+        r = sp.correct(text)
+        assert r.text == text and r.fixes == [], r
+    r = sp.correct("تورتيا دجاج")
+    assert r.text == "تورتيلا دجاج" and r.confident, r
+    print("✅ everyday words kept ok")
+
+
+if __name__ == "__main__":
+    test_symspell_lookup()
+    test_speller_fixes_and_keeps()
+    test_speller_defers_unknown_words()
+    test_everyday_words_are_not_rewritten_into_menu_words()
@@ -0,0 +1,31 @@
+import os
+import sys
+
+sys.path.append(os.getcwd())
+
+from startup import LazyClient, LazyModule
+
+
+def test_lazy_module_imports_on_first_use():
+    mod = LazyModule("colorsys")
+    assert mod._module is None
+    assert mod.rgb_to_hsv(1, 0, 0)[0] == 0
+    assert mod._module is not None
+    print("✅ lazy module ok")
+
+
+def test_lazy_client_builds_once():
+    built = []
+    client = LazyClient(lambda: built.append(1) or {"ready": True})
+    assert client and not built          # truthiness does not build it
+    assert client.get("ready") and client.get("ready")   # proxied to the dict
+    assert len(built) == 1
+
+    missing = LazyClient()
+    assert not missing and missing.load() is None
+    print("✅ lazy client ok")
+
+
+if __name__ == "__main__":
+    test_lazy_module_imports_on_first_use()
+    test_lazy_client_builds_once()
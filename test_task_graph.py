@@ -0,0 +1,59 @@
+import contextvars
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.getcwd())
+
+import task_graph
+
+TENANT = contextvars.ContextVar("tenant", default=None)
+
+
+def test_steps_overlap_and_join_on_dependencies():
+    task_graph.begin()
+    tasks = task_graph.current()
+    order = []
+    t0 = time.time()
+    tasks.start("customer", lambda: (time.sleep(0.1), order.append("customer"), 7)[-1])
+    tasks.start("log", lambda: order.append(("log", tasks.result("customer"))), after=("customer",))
+    tasks.start("other", lambda: (time.sleep(0.1), order.append("other")))
+    assert task_graph.result("customer") == 7
+    tasks.result("log")
+    tasks.result("other")
+    assert time.time() - t0 < 0.18, "independent steps should overlap"
+    assert order.index("customer") < order.index(("log", 7)), order
+    print("✅ overlap + dependencies ok")
+
+
+def test_failures_and_missing_steps_give_default():
+    task_graph.begin()
+    tasks = task_graph.current()
+    tasks.start("boom", lambda: 1 / 0)
+    assert tasks.result("boom", default="x") == "x"
+    assert task_graph.result("never started") is None
+    print("✅ defaults ok")
+
+
+def test_context_and_send_order():
+    task_graph.begin()
+    tasks = task_graph.current()
+    TENANT.set("branch-2")
+    sent = []
+
+    def send(text):
+        task_graph.before_send()        # inside a step: must not wait for itself
+        time.sleep(0.05)
+        sent.append((text, TENANT.get(), threading.current_thread().name.startswith("msg-task")))
+
+    tasks.start("echo", send, "echo", outbound=True)
+    send("reply")                       # request thread: waits for the echo
+    assert sent == [("echo", "branch-2", True), ("reply", "branch-2", False)], sent
+    print("✅ context + send order ok")
+
+
+if __name__ == "__main__":
+    test_steps_overlap_and_join_on_dependencies()
+    test_failures_and_missing_steps_give_default()
+    test_context_and_send_order()
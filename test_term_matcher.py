@@ -0,0 +1,27 @@
+import os
+import sys
+
+sys.path.append(os.getcwd())
+
+from term_matcher import TermMatcher
+
+
+def test_first_term_in_list_order_with_span():
+    m = TermMatcher(["weather", "rain", "كلب"])
+    hit = m.first("is it rain or weather today")
+    assert hit.term == "weather" and (hit.start, hit.end) == (14, 21), hit
+    assert m.first("no match here") is None
+    print("✅ term order + span ok")
+
+
+def test_english_boundaries_arabic_containment():
+    m = TermMatcher(["sun", "كلب"])
+    assert m.first("sunday brunch") is None          # "sun" needs word boundaries
+    assert m.first("sun!").term == "sun"
+    assert m.first("ياكلبي").term == "كلب"            # Arabic: containment
+    print("✅ boundaries ok")
+
+
+if __name__ == "__main__":
+    test_first_term_in_list_order_with_span()
+    test_english_boundaries_arabic_containment()
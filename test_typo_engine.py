@@ -0,0 +1,29 @@
+import os
+import sys
+
+sys.path.append(os.getcwd())
+
+from nlp_utils import TYPO_ENGINE, TypoEngine, correct_typos_advanced
+
+
+def test_words_then_phrases_with_report():
+    text, fired = TYPO_ENGINE.correct("Show Menue, please!")
+    assert text == "show menu, please!", text
+    assert ("menue", "menu") in fired          # word pass fixed it before the phrase pass
+    fired = []
+    assert correct_typos_advanced("ابي اطلب", fired) == "ابغى اطلب"
+    assert fired, fired
+    # entries that used to live in a second engine in app.py
+    assert correct_typos_advanced("2 Burgur, onon rings + french fry") == "2 burger, onion rings + french fries"
+    print("✅ word + phrase corrections ok")
+
+
+def test_bounded_phrases_keep_case():
+    engine = TypoEngine(phrases={"beff": "beef"}, phrase_boundaries=True)
+    assert engine.correct("Two BEFF burgers, no beffy")[0] == "Two beef burgers, no beffy"
+    print("✅ bounded phrases ok")
+
+
+if __name__ == "__main__":
+    test_words_then_phrases_with_report()
+    test_bounded_phrases_keep_case()
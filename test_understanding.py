@@ -0,0 +1,65 @@
+import json
+import os
+import sys
+
+sys.path.append(os.getcwd())
+
+import understanding
+
+
+def _reply(**over):
+    data = {
+        "intent": "food_order",
+        "is_irrelevant": False,
+        "polite_response": None,
+        "corrected_text": "ابغى برجر لحم و قهوة",
+        "items": [
+            {"type": "specific", "name": "Beef Burger", "category": "burgers_meals", "qty": 2, "spicy": "spicy"},
+            {"type": "generic", "name": None, "category": "drinks", "qty": 1, "spicy": "any"},
+        ],
+    }
+    data.update(over)
+    return json.dumps(data, ensure_ascii=False)
+
+
+def test_valid_reply_is_normalized():
+    u = understanding.parse("```json\n" + _reply() + "\n```", "ابغى برجر لحمم و قهوه")
+    assert u["intent"] == "food_order" and u["is_irrelevant"] is False
+    assert u["corrected_text"] == "ابغى برجر لحم و قهوة"
+    assert u["items"] == [
+        {"type": "specific", "category": "burgers_meals", "qty": 2, "name": "Beef Burger", "spicy": "spicy"},
+        {"type": "generic", "category": "drinks", "qty": 1},
+    ], u["items"]
+    print("✅ valid reply ok")
+
+
+def test_bad_fields_are_dropped_or_defaulted():
+    u = understanding.parse(_reply(
+        corrected_text="",
+        polite_response="ignored when relevant",
+        items=[{"type": "specific", "name": "", "qty": 1}, {"type": "combo"}, {"type": "generic", "category": "juices", "qty": "x"},
+               {"type": "specific", "name": "Pepsi", "qty": 0, "spicy": "very"}],
+    ), "2 pepsi")
+    assert u["corrected_text"] == "2 pepsi"
+    assert u["polite_response"] is None
+    assert u["items"] == [{"type": "specific", "category": "", "qty": 1, "name": "Pepsi", "spicy": "any"}], u["items"]
+
+    u = understanding.parse(_reply(intent="other", is_irrelevant=True, polite_response=" Sorry 😊 ", items=[]))
+    assert (u["is_irrelevant"], u["polite_response"]) == (True, "Sorry 😊")
+    print("✅ field validation ok")
+
+
+def test_unusable_replies_return_none():
+    assert understanding.parse("") is None
+    assert understanding.parse("FOOD_ORDER") is None
+    assert understanding.parse('{"intent": "buy"}') is None
+    assert understanding.parse(_reply(items="2 burgers")) is None
+    assert understanding.response_format("groq") == {"type": "json_object"}
+    assert understanding.response_format("openai")["json_schema"]["schema"] is understanding.SCHEMA
+    print("✅ unusable replies ok")
+
+
+if __name__ == "__main__":
+    test_valid_reply_is_normalized()
+    test_bad_fields_are_dropped_or_defaulted()
+    test_unusable_replies_return_none()
@@ -0,0 +1,114 @@
+"""One structured LLM call that understands a whole inbound message.
+
+Instead of four round trips (intent classifier, relevance check, Arabic typo
+correction, order parser), the model returns one JSON object:
+
+    {
+      "intent": "food_order" | "menu_question" | "greeting" | "other",
+      "is_irrelevant": bool,
+      "polite_response": str | null,
+      "corrected_text": str,
+      "items": [{"type", "name", "category", "qty", "spicy"}, ...]
+    }
+
+OpenAI enforces SCHEMA through `response_format`; Groq only guarantees a JSON
+object, so `parse()` validates every reply locally and returns None for
+anything malformed (the call sites then use their own prompts).
+"""
+import json
+
+INTENTS = ("food_order", "menu_question", "greeting", "other")
+SPICE = ("spicy", "non-spicy", "any")
+
+_ITEM = {
+    "type": "object",
+    "properties": {
+        "type": {"type": "string", "enum": ["specific", "generic"]},
+        "name": {"type": ["string", "null"]},
+        "category": {"type": "string"},
+        "qty": {"type": "integer"},
+        "spicy": {"type": "string", "enum": list(SPICE)},
+    },
+    "required": ["type", "name", "category", "qty", "spicy"],
+    "additionalProperties": False,
+}
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "intent": {"type": "string", "enum": list(INTENTS)},
+        "is_irrelevant": {"type": "boolean"},
+        "polite_response": {"type": ["string", "null"]},
+        "corrected_text": {"type": "string"},
+        "items": {"type": "array", "items": _ITEM},
+    },
+    "required": ["intent", "is_irrelevant", "polite_response", "corrected_text", "items"],
+    "additionalProperties": False,
+}
+
+
+def response_format(provider: str) -> dict:
+    """`response_format` argument for the chat completion of `provider`."""
+    if provider == "openai":
+        return {"type": "json_schema", "json_schema": {"name": "understanding", "strict": True, "schema": SCHEMA}}
+    return {"type": "json_object"}
+
+
+def _item(it):
+    if not isinstance(it, dict):
+        return None
+    kind = str(it.get("type") or "").strip().lower()
+    if kind not in ("specific", "generic"):
+        return None
+    try:
+        qty = max(int(it.get("qty") or 1), 1)
+    except (TypeError, ValueError):
+        return None
+    out = {"type": kind, "category": str(it.get("category") or "").strip().lower(), "qty": qty}
+    if kind == "specific":
+        name = str(it.get("name") or "").strip()
+        if not name:
+            return None
+        spicy = str(it.get("spicy") or "any").strip().lower()
+        out["name"] = name
+        out["spicy"] = spicy if spicy in SPICE else "any"
+    elif not out["category"]:
+        return None
+    return out
+
+
+def parse(raw: str, original: str = ""):
+    """Validated understanding from the model's reply, or None.
+
+    Items without a usable type, name or quantity are dropped; an empty or
+    missing corrected_text falls back to `original`.
+    """
+    if not raw:
+        return None
+    first, last = raw.find("{"), raw.rfind("}")
+    if first == -1 or last <= first:
+        return None
+    try:
+        data = json.loads(raw[first:last + 1])
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    intent = str(data.get("intent") or "").strip().lower()
+    if intent not in INTENTS:
+        return None
+    items = data.get("items")
+    if items is None:
+        items = []
+    if not isinstance(items, list):
+        return None
+    is_irrelevant = data.get("is_irrelevant") is True
+    polite = data.get("polite_response")
+    corrected = data.get("corrected_text")
+    return {
+        "intent": intent,
+        "is_irrelevant": is_irrelevant,
+        "polite_response": polite.strip() if is_irrelevant and isinstance(polite, str) and polite.strip() else None,
+        "corrected_text": corrected.strip() if isinstance(corrected, str) and corrected.strip() else original,
+        "items": [x for x in (_item(it) for it in items) if x is not None],
+    }